@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import StageProfiler as stageProfiler
+import StormRules as stormRules
+from TrackKernel import haversineKm, stormOffsets, trackSegments, reduceSegments, \
+                        uniformGrid, gridBrackets, greatCircleInterpolate
+
+# create a list to name columns of the aggregated dataset, one row per hurricane (per ID)
+aggrColumnNames = ['ID', 'Name', \
+                   'initialDate', 'endDate', 'duration', \
+                   'netDistanceKm', 'totalDistanceKm', \
+                   'maxLandSpeed', 'minLandSpeed', 'meanLandSpeed', \
+                   'pressureMean', 'pressureStDev',  'pressureMin', \
+                   'pressure25Pct', 'pressureMedian', 'pressure75Pct', \
+                   'pressureMax', 'pressureDelta', 'windMean', 'windStDev', \
+                   'windMin', 'wind25Pct', 'windMedian', 'wind50Pct', \
+                   'windMax', 'windDelta', 'maxCategory', 'landfallBool', \
+                   'landfallTimeDelta', 'landfallDatetime', \
+                   'landfallCategory', 'landfallLong', 'landfallLat']
+
+def describeColumn(grouped, column, prefix):
+    # same statistics as Series.describe().iloc[1:8], plus the delta between max and min
+    stats = grouped[column].agg(['mean', 'std', 'min', 'max'])
+    quantiles = grouped[column].quantile([0.25, 0.5, 0.75]).unstack().reindex(columns = [0.25, 0.5, 0.75])
+    return pd.DataFrame({prefix[0]: stats['mean'],
+                         prefix[1]: stats['std'],
+                         prefix[2]: stats['min'],
+                         prefix[3]: quantiles[0.25],
+                         prefix[4]: quantiles[0.5],
+                         prefix[5]: quantiles[0.75],
+                         prefix[6]: stats['max'],
+                         prefix[7]: stats['max'] - stats['min']})
+
+@stageProfiler.profiled
+def aggregateStorms(data, step_hours = None):
+    ### Create aggregated dataset per hurricane (per ID)
+    ## identify variables such as distance moved (change in long/lat), duration (change in datetime), change in windspeed/pressure/etc.
+    # with step_hours, the distance and speed variables follow the track resampled every step_hours from
+    # each storm's first fix to its last (TrackKernel.uniformGrid with endpoints) instead of the irregular
+    # fixes, so both distances cover the whole storm; step_hours must be positive (ValueError otherwise)
+
+    # sort once; every storm is then a contiguous block of rows
+    data = data.sort_values(by = ['ID', 'Datetime'], kind = 'mergesort').reset_index(drop = True)
+    offsets = stormOffsets(data['ID'].to_numpy())
+    starts, ends = offsets[:-1], offsets[1:] - 1
+    storm = np.repeat(np.arange(len(starts)), np.diff(offsets))
+
+    latitude = data['Latitude'].to_numpy(dtype = float)
+    longitude = data['Longitude'].to_numpy(dtype = float)
+    datetime = data['Datetime'].to_numpy()
+
+    # missing readings (<NA> after StormRules.replaceSentinels) become NaN
+    numeric = pd.DataFrame({'storm': storm,
+                            'pressure': stormRules.floatValues(data['Minimum Pressure']),
+                            'wind': stormRules.floatValues(data['Maximum Wind']),
+                            'category': stormRules.floatValues(data['Category'])})
+    grouped = numeric.groupby('storm', sort = True)
+
+    aggr = pd.DataFrame({'ID': data['ID'].to_numpy()[starts],
+                         'Name': data['Name'].to_numpy()[starts]})
+
+    ## 'Duration' variables (3)
+    # initial date, final date, duration in hours
+    aggr['initialDate'] = datetime[starts]
+    aggr['endDate'] = datetime[ends]
+    aggr['duration'] = (aggr['endDate'] - aggr['initialDate']).dt.total_seconds() / 3600
+
+    ## 'Distance Traveled' and 'Landspeed' variables (5)
+    # every consecutive pair of fixes within a storm is a segment, in km and km/h
+    if step_hours is None:
+        distance, speed, segmentOffsets = trackSegments(latitude, longitude, datetime, offsets)
+        endpoints = (latitude[starts], longitude[starts], latitude[ends], longitude[ends])
+    else:
+        gridTimes, gridOffsets = uniformGrid(datetime, offsets, step_hours, endpoints = True)
+        before, after, fraction = gridBrackets(datetime, offsets, gridTimes, gridOffsets)
+        gridLatitude, gridLongitude = greatCircleInterpolate(latitude, longitude, before, after, fraction)
+        distance, speed, segmentOffsets = trackSegments(gridLatitude, gridLongitude, gridTimes, gridOffsets)
+        # net distance between the ends of the same track, which are the first and last fix
+        # (the last of several fixes at one time, as gridBrackets takes)
+        endpoints = (gridLatitude[gridOffsets[:-1]], gridLongitude[gridOffsets[:-1]],
+                     gridLatitude[gridOffsets[1:] - 1], gridLongitude[gridOffsets[1:] - 1])
+    validSpeed = ~np.isnan(speed)
+    speedCount = reduceSegments(validSpeed.astype(float), segmentOffsets, np.add)
+
+    # total distance follows the whole track, net distance is between the first and the last fix
+    aggr['netDistanceKm'] = haversineKm(*endpoints)
+    aggr['totalDistanceKm'] = np.nan_to_num(reduceSegments(distance, segmentOffsets, np.add))
+    aggr['maxLandSpeed'] = reduceSegments(speed, segmentOffsets, np.fmax)
+    aggr['minLandSpeed'] = reduceSegments(speed, segmentOffsets, np.fmin)
+    with np.errstate(invalid = 'ignore'):
+        aggr['meanLandSpeed'] = reduceSegments(np.where(validSpeed, speed, 0.0), segmentOffsets, np.add) / speedCount
+
+    ## 'Minimum Pressure' and 'Maximum Wind' summary stats (8 each)
+    # mean, standard deviation, min, 25th/50th/75th percentiles, max and the max - min delta
+    pressure = describeColumn(grouped, 'pressure', aggrColumnNames[10:18])
+    wind = describeColumn(grouped, 'wind', aggrColumnNames[18:26])
+    aggr = pd.concat([aggr, pressure.reset_index(drop = True), wind.reset_index(drop = True)], axis = 1)
+
+    ## 'Category' variable, 'maxCategory' (1)
+    aggr['maxCategory'] = grouped['category'].max().to_numpy()
+
+    ## 'Landfall' variables (6)
+    # the first landfall fix of each storm, as rows are sorted by datetime
+    landfallRows = np.flatnonzero((data['Event'] == 'L').to_numpy())
+    landfallStorms, first = np.unique(storm[landfallRows], return_index = True)
+    landfallRows = landfallRows[first]
+
+    aggr['landfallBool'] = False
+    aggr.loc[landfallStorms, 'landfallBool'] = True
+    aggr['landfallDatetime'] = pd.Series(pd.NaT, index = aggr.index, dtype = 'datetime64[ns]')
+    aggr.loc[landfallStorms, 'landfallDatetime'] = datetime[landfallRows]
+    aggr['landfallTimeDelta'] = aggr['landfallDatetime'] - aggr['initialDate']
+    aggr['landfallCategory'] = np.nan
+    aggr.loc[landfallStorms, 'landfallCategory'] = numeric['category'].to_numpy()[landfallRows]
+    aggr['landfallLong'] = np.nan
+    aggr.loc[landfallStorms, 'landfallLong'] = longitude[landfallRows]
+    aggr['landfallLat'] = np.nan
+    aggr.loc[landfallStorms, 'landfallLat'] = latitude[landfallRows]
+
+    return aggr[aggrColumnNames]
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import pandas as pd
+import CleanData as cleanData
+from AggregateData import *
+from ReferenceLoops import aggregateStormsLoop
+
+
+class AggregateDataTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = cleanData.loadTracks("pacific.csv")
+
+    # test that the aggregate table has one row per storm and the expected columns
+    def test_aggregateStormsColumns(self):
+        aggr = aggregateStorms(self.data)
+
+        assert list(aggr.columns) == aggrColumnNames
+        assert len(aggr) == self.data['ID'].nunique()
+        assert aggr['ID'].is_unique
+
+    # test that the groupby engine matches the per-ID loop, storm by storm
+    def test_aggregateStormsMatchesLoop(self):
+        expected = aggregateStormsLoop(self.data.copy())
+        result = aggregateStorms(self.data)
+        # the loop describes the nullable wind column, so a missing standard deviation is <NA> there
+        for column in result.columns[result.dtypes == float]:
+            expected[column] = expected[column].to_numpy(dtype = float, na_value = np.nan)
+
+        pd.testing.assert_frame_equal(result, expected, check_dtype = False)
+
+    # test that aggregating does not depend on the input row order
+    def test_aggregateStormsUnsorted(self):
+        shuffled = self.data.sample(frac = 1, random_state = 0)
+
+        pd.testing.assert_frame_equal(aggregateStorms(shuffled), aggregateStorms(self.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import asyncio
+import argparse
+import threading
+import contextlib
+import functools
+import http.server
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import CleanData as cleanData
+import StageProfiler as stageProfiler
+
+# sources read at the same time unless told otherwise; downloads mostly wait on the network
+DEFAULT_CONCURRENCY = 8
+# seconds a download may stall before it fails
+DEFAULT_TIMEOUT = 60
+
+
+def isUrl(source):
+    return urllib.parse.urlparse(str(source)).scheme in ('http', 'https', 'file')
+
+def sourceBasin(source):
+    # basin of a source named after it, e.g. 'data/pacific.csv' or 'http://host/atlantic.csv' -> 'pacific', 'atlantic'
+    path = urllib.parse.urlparse(source).path if isUrl(source) else source
+    return os.path.splitext(os.path.basename(path))[0]
+
+def sourceBasins(sources):
+    # {basin: source} of a list of sources named after their basins; two sources named after the same
+    # basin would share its rows, so they are refused
+    basins = [sourceBasin(source) for source in sources]
+    duplicates = sorted(set(basin for basin in basins if basins.count(basin) > 1))
+    if duplicates:
+        raise ValueError('several sources are named after basin ' + ', '.join(duplicates) +
+                         '; pass a {basin: source} dict to name them')
+    return dict(zip(basins, sources))
+
+def tagBasin(data, basin):
+    # the 'Basin' column of a frame whose rows all come from one basin, as a one-category categorical
+    data['Basin'] = pd.Categorical.from_codes(np.zeros(len(data), dtype = np.int8), [basin])
+    return data
+
+@contextlib.contextmanager
+def openSource(source, timeout = DEFAULT_TIMEOUT):
+    # binary stream of a local file or of a URL's response body; the parser reads straight from it,
+    # so a download is never written to a temporary file or held whole in memory
+    if isUrl(source):
+        stream = urllib.request.urlopen(source, timeout = timeout)
+    else:
+        stream = open(source, 'rb')
+    with stream:
+        yield stream
+
+def readSource(source, basin, clean = False, engine = 'c', timeout = DEFAULT_TIMEOUT):
+    # worker task: parse one source into typed rows (CleanData.readTracks), cleaned with clean = True, and
+    # tag every row with its basin; module level, so it runs on a process pool as well as on threads
+    with openSource(source, timeout) as stream:
+        data = cleanData.readTracks(stream, engine)
+    if clean:
+        data = cleanData.cleanTracks(data)
+    return tagBasin(data, basin)
+
+def concatBasins(frames):
+    # one frame of the per-source frames, in source order; categorical columns stay categorical
+    # (pd.concat would turn columns with different categories into objects)
+    frames = [frame for frame in frames if len(frame.columns)]
+    if not frames:
+        return pd.DataFrame()
+    data = pd.concat(frames, ignore_index = True)
+    for column in frames[0].columns:
+        if isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            data[column] = pd.api.types.union_categoricals([frame[column] for frame in frames], sort_categories = True)
+    return data
+
+async def ingestSources(sources, pool = 'thread', workers = None, concurrency = DEFAULT_CONCURRENCY,
+                        clean = False, engine = 'c', timeout = DEFAULT_TIMEOUT):
+    # read every source (local paths or http(s)/file URLs, or a {basin: source} dict) concurrently and return
+    # their rows in one frame with a 'Basin' column; parsing runs on a thread pool ('thread', where the
+    # parser streams from the open download) or a process pool ('process', where each worker opens its own
+    # source), with at most `concurrency` sources open at once
+    if not isinstance(sources, dict):
+        sources = sourceBasins(sources)
+    Executor = ThreadPoolExecutor if pool == 'thread' else ProcessPoolExecutor
+    limit = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    with Executor(max_workers = workers or min(len(sources), concurrency) or 1) as executor:
+        async def ingest(basin, source):
+            async with limit:
+                task = functools.partial(readSource, source, basin, clean, engine, timeout)
+                return await loop.run_in_executor(executor, task)
+
+        with stageProfiler.stage('ingestSources') as record:
+            frames = await asyncio.gather(*[ingest(basin, source) for basin, source in sources.items()])
+            data = concatBasins(frames)
+            record['rowsOut'] = len(data)
+    return data
+
+def ingest(sources, **kwargs):
+    # ingestSources from synchronous code
+    return asyncio.run(ingestSources(sources, **kwargs))
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    # no log line per request, and `delay` seconds before every response, as a distant server would take
+    delay = 0
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+@contextlib.contextmanager
+def localServer(directory, delay = 0):
+    # stand-in for the download server: serves `directory` over HTTP on a free local port, yields its base URL
+    handler = functools.partial(type('DelayedHandler', (QuietHandler,), {'delay': delay}), directory = directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    try:
+        yield 'http://127.0.0.1:' + str(server.server_address[1]) + '/'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Read several basin best-track files or URLs concurrently.')
+    parser.add_argument('sources', nargs = '+', help = 'csv files or http(s) URLs, named after their basin')
+    parser.add_argument('--pool', choices = ['thread', 'process'], default = 'thread')
+    parser.add_argument('--workers', type = int, default = None, help = 'pool size (default: one per source)')
+    parser.add_argument('--concurrency', type = int, default = DEFAULT_CONCURRENCY,
+                        help = 'sources open at once (default: %(default)s)')
+    parser.add_argument('--clean', action = 'store_true', help = 'run the cleaning pipeline in the workers too')
+    parser.add_argument('--engine', choices = ['c', 'pyarrow'], default = 'c')
+    parser.add_argument('--out', help = 'write the rows to this parquet file')
+    args = parser.parse_args()
+
+    data = ingest(args.sources, pool = args.pool, workers = args.workers, concurrency = args.concurrency,
+                  clean = args.clean, engine = args.engine)
+    print(data.groupby('Basin', observed = True).size().to_string())
+    if args.out:
+        data.to_parquet(args.out, index = False)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import urllib.error
+import pandas as pd
+import CleanData as cleanData
+import SyntheticTracks as syntheticTracks
+from BasinIngest import *
+
+
+class BasinIngestTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # pacific.csv and two synthetic basins, served from one directory
+        cls.tmp = tempfile.mkdtemp()
+        shutil.copy('pacific.csv', cls.tmp)
+        syntheticTracks.generateTracks(os.path.join(cls.tmp, 'atlantic.csv'), storms = 300, basin = 'AL', seed = 1)
+        syntheticTracks.generateTracks(os.path.join(cls.tmp, 'central.csv'), storms = 200, basin = 'CP', seed = 2)
+        cls.names = ['pacific', 'atlantic', 'central']
+        cls.paths = [os.path.join(cls.tmp, name + '.csv') for name in cls.names]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def serialRead(self, clean = False):
+        # one readTracks call after the other, as before
+        frames = []
+        for name, path in zip(self.names, self.paths):
+            data = cleanData.loadTracks(path) if clean else cleanData.readTracks(path)
+            frames.append(data.assign(Basin = name))
+        return frames
+
+    def assertSameRows(self, data, frames):
+        self.assertEqual(data['Basin'].astype(str).tolist(), sum([frame['Basin'].tolist() for frame in frames], []))
+        expected = pd.concat(frames, ignore_index = True)
+        # categories differ between files, so compare values
+        for column in expected.columns:
+            self.assertEqual(data[column].astype(object).tolist(), expected[column].astype(object).tolist(), column)
+
+    # test that reading a local directory concurrently gives the serial rows, tagged and in source order
+    def test_localDirectory(self):
+        data = ingest(self.paths)
+        self.assertSameRows(data, self.serialRead())
+        self.assertIsInstance(data['ID'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(data['Basin'].cat.categories), sorted(self.names))
+
+    # test that the same rows are streamed from the local HTTP stand-in
+    def test_localServer(self):
+        with localServer(self.tmp) as url:
+            data = ingest([url + name + '.csv' for name in self.names], concurrency = 2)
+        pd.testing.assert_frame_equal(data, ingest(self.paths))
+
+    # test that cleaning on a process pool gives the rows of loadTracks, with basins named by the caller
+    def test_processPool(self):
+        with localServer(self.tmp) as url:
+            data = ingest({'EP': url + 'pacific.csv', 'AL': self.paths[1]}, pool = 'process', workers = 2, clean = True)
+        frames = self.serialRead(clean = True)[:2]
+        frames[0]['Basin'], frames[1]['Basin'] = 'EP', 'AL'
+        self.assertSameRows(data, frames)
+
+    # test that a missing source fails the ingestion
+    def test_missingSource(self):
+        with localServer(self.tmp) as url:
+            with self.assertRaises(urllib.error.HTTPError):
+                ingest([url + 'pacific.csv', url + 'indian.csv'])
+        with self.assertRaises(FileNotFoundError):
+            ingest([os.path.join(self.tmp, 'indian.csv')])
+
+    # test that two sources with the same basename are not merged into one basin
+    def test_duplicateBasin(self):
+        other = os.path.join(self.tmp, 'other')
+        os.makedirs(other, exist_ok = True)
+        shutil.copy(self.paths[0], other)
+        with self.assertRaises(ValueError):
+            ingest([self.paths[0], os.path.join(other, 'pacific.csv')])
+        data = ingest({'EP': self.paths[0], 'EP2': os.path.join(other, 'pacific.csv')})
+        self.assertEqual(data['Basin'].value_counts().tolist(), [len(data) // 2] * 2)
+
+    def test_sourceBasin(self):
+        self.assertEqual(sourceBasin('data/pacific.csv'), 'pacific')
+        self.assertEqual(sourceBasin('https://example.org/hurdat/atlantic.csv?version=2'), 'atlantic')
+
+
+if __name__ == '__main__':
+    unittest.main()
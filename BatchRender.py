@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+# non-interactive backend, set before pyplot is imported by proj1_visualization
+import matplotlib
+matplotlib.use('Agg')
+import HeatMap as hm
+import proj1_visualization as viz
+import StageProfiler as stageProfiler
+
+MANIFEST_NAME = 'manifest.json'
+
+# cleaned tracks and aggregates of the dataset, loaded once per worker process
+workerData = None
+
+
+def loadWorker(dataset_path):
+    global workerData
+    workerData = viz.loadVisualizationData(dataset_path)
+
+def renderArtifact(name, out_dir):
+    # worker task: build one figure or map and write it to out_dir
+    start, cpu = time.perf_counter(), time.process_time()
+    path = os.path.join(out_dir, name)
+    with stageProfiler.stage('render ' + name, len(workerData[0])):
+        viz.saveArtifact(viz.artifacts[name](*workerData), path)
+    return {'artifact': name,
+            'path': name,
+            'bytes': os.path.getsize(path),
+            'seconds': time.perf_counter() - start,
+            'cpuSeconds': time.process_time() - cpu,
+            'pid': os.getpid()}
+
+def writeManifest(manifest, out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent = 2)
+    os.replace(path + '.tmp', path)
+    return path
+
+def renderAll(dataset_path, out_dir, workers = None, names = None):
+    # render the report artifacts (all of proj1_visualization.artifacts by default) into out_dir on a
+    # process pool, without opening windows or browser tabs, and write a manifest with one timing entry
+    # per artifact; entries are in the order of `names`, whatever order the workers finish in
+    names = list(viz.artifacts) if names is None else list(names)
+    os.makedirs(out_dir, exist_ok = True)
+    start = time.perf_counter()
+    # fill the track cache once, so the workers only read it
+    hm.loadData(dataset_path)
+
+    if workers == 1:
+        loadWorker(dataset_path)
+        entries = [renderArtifact(name, out_dir) for name in names]
+    else:
+        with ProcessPoolExecutor(max_workers = workers, initializer = loadWorker, initargs = (dataset_path,)) as executor:
+            entries = list(executor.map(renderArtifact, names, [out_dir] * len(names)))
+
+    manifest = {'dataset': dataset_path,
+                'workers': workers or os.cpu_count(),
+                'seconds': time.perf_counter() - start,
+                'artifacts': entries}
+    writeManifest(manifest, out_dir)
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Render every figure and map of the report into a directory, headless.')
+    parser.add_argument('dataset', nargs = '?', default = 'atlantic.csv')
+    parser.add_argument('--out', default = 'render', help = 'output directory (default: %(default)s)')
+    parser.add_argument('--workers', type = int, default = None, help = 'worker processes (default: one per core)')
+    parser.add_argument('--only', nargs = '+', choices = list(viz.artifacts), help = 'render only these artifacts')
+    args = parser.parse_args()
+
+    manifest = renderAll(args.dataset, args.out, args.workers, args.only)
+    for entry in manifest['artifacts']:
+        print(entry['artifact'].ljust(45) + str(round(entry['seconds'], 2)).rjust(6) + " s")
+    print(str(len(manifest['artifacts'])) + " artifacts in " + str(round(manifest['seconds'], 2)) + " s, manifest in " + \
+          os.path.join(args.out, MANIFEST_NAME))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import matplotlib
+from BatchRender import *
+
+
+class BatchRenderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    # test that every figure and map is written by the worker pool and listed in the manifest, in order
+    def test_renderAll(self):
+        manifest = renderAll("pacific.csv", self.tmp, workers = 2)
+
+        with open(os.path.join(self.tmp, MANIFEST_NAME)) as f:
+            self.assertEqual(json.load(f), manifest)
+        self.assertEqual([entry['artifact'] for entry in manifest['artifacts']], list(viz.artifacts))
+        for entry in manifest['artifacts']:
+            path = os.path.join(self.tmp, entry['path'])
+            self.assertEqual(os.path.getsize(path), entry['bytes'])
+            self.assertGreater(entry['seconds'], 0)
+        self.assertEqual(sorted(os.listdir(self.tmp)), sorted(list(viz.artifacts) + [MANIFEST_NAME]))
+
+    # test that rendering uses the non-interactive backend and never opens a browser or a window
+    def test_headless(self):
+        self.assertEqual(matplotlib.get_backend().lower(), 'agg')
+        with mock.patch('webbrowser.open_new_tab', side_effect = AssertionError("browser opened")), \
+             mock.patch('matplotlib.pyplot.show', side_effect = AssertionError("window shown")):
+            manifest = renderAll("pacific.csv", self.tmp, workers = 1,
+                                 names = ['hurricaneCategoryHistogram.png', 'landfall.html'])
+        self.assertEqual(len(manifest['artifacts']), 2)
+        self.assertEqual(len({entry['pid'] for entry in manifest['artifacts']}), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+import CleanData as cleanData
+from AggregateData import aggregateStorms
+
+
+def timeCall(func, *args, repeat = 1):
+    # best wall time in seconds over `repeat` runs
+    best = float('inf')
+    for r in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def measureInChild(statement, setup = ''):
+    # wall time and peak RSS growth (MB) of one statement, run in a fresh interpreter after its imports
+    code = ("import resource, time\n"
+            "import CleanData as cleanData\n"
+            + setup + "\n"
+            "base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "start = time.perf_counter()\n"
+            + statement + "\n"
+            "print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base)")
+    output = subprocess.run([sys.executable, '-c', code], capture_output = True, text = True, check = True,
+                            cwd = os.path.dirname(os.path.abspath(__file__))).stdout.split()
+    return float(output[0]), float(output[1]) / 1024
+
+def replicateCsv(dataset_path, factor, out_path):
+    # write the rows of dataset_path `factor` times, with a distinct ID prefix per copy
+    # the prefix goes in front of the basin letters rather than over them: EP011949 and CP011949 would
+    # otherwise be one storm with rows in two places, which ChunkedClean refuses
+    with open(dataset_path) as source:
+        header = source.readline()
+        rows = [row.rstrip('\n') + '\n' for row in source]
+    with open(out_path, 'w') as target:
+        target.write(header)
+        for k in range(factor):
+            prefix = chr(65 + k // 26) + chr(65 + k % 26)
+            target.writelines(prefix + row for row in rows)
+    return out_path
+
+def benchmarkAggregation(dataset_path):
+    # per-ID loop (before) against the groupby engine (after)
+    from ReferenceLoops import aggregateStormsLoop
+
+    data = cleanData.loadTracks(dataset_path)
+    before = timeCall(aggregateStormsLoop, data.copy())
+    after = timeCall(aggregateStorms, data, repeat = 5)
+    print(dataset_path + ": " + str(data['ID'].nunique()) + " storms, " + str(len(data)) + " fixes")
+    print("  per-ID loop:     " + str(round(before, 3)) + " s")
+    print("  groupby engine:  " + str(round(after, 3)) + " s (" + str(round(before / after)) + "x)")
+
+def benchmarkIngest(dataset_path):
+    # untyped read of all 22 columns + condense + strip, against the typed readers
+    variants = [('readData', "cleanData.removeWhitespace(cleanData.condenseData(cleanData.readData(%r)))"),
+                ('readTracks, c', "cleanData.condenseData(cleanData.readTracks(%r))"),
+                ('readTracks, pyarrow', "cleanData.condenseData(cleanData.readTracks(%r, 'pyarrow'))")]
+    size = os.path.getsize(dataset_path) / 2**20
+    print(dataset_path + ": " + str(round(size, 1)) + " MB")
+    for name, statement in variants:
+        seconds, peak = measureInChild(statement % os.path.abspath(dataset_path))
+        print("  " + name.ljust(20) + str(round(seconds, 3)) + " s, peak +" + str(round(peak, 1)) + " MB")
+
+def benchmarkMemory(dataset_path):
+    # footprint of the cleaned frame before and after normalizeDtypes, from the untyped and typed readers
+    data = cleanData.readData(dataset_path)
+    data = cleanData.removeWhitespace(cleanData.condenseData(data))
+    data = cleanData.createAdditionalColumns(cleanData.processMaxWind(data))
+    print(dataset_path + ", readData:")
+    cleanData.normalizeDtypes(data, report = True)
+    print(dataset_path + ", readTracks:")
+    cleanData.loadTracks(dataset_path, report = True)
+
+def benchmarkChunked(dataset_path, chunksize = 20000):
+    # peak memory of the in-memory pipeline against ChunkedClean writing parquet output
+    setup = ("import os, tempfile\n"
+             "from AggregateData import aggregateStorms\n"
+             "from ChunkedClean import cleanChunked\n"
+             "tmp = tempfile.mkdtemp()")
+    variants = [('in memory', "aggregateStorms(cleanData.loadTracks(%r))"),
+                ('chunked', "cleanChunked(%r, os.path.join(tmp, 't.parquet'), os.path.join(tmp, 'a.parquet'), "
+                            + str(chunksize) + ")")]
+    size = os.path.getsize(dataset_path) / 2**20
+    print(dataset_path + ": " + str(round(size, 1)) + " MB, chunks of " + str(chunksize) + " rows")
+    for name, statement in variants:
+        seconds, peak = measureInChild(statement % os.path.abspath(dataset_path), setup)
+        print("  " + name.ljust(20) + str(round(seconds, 3)) + " s, peak +" + str(round(peak, 1)) + " MB")
+
+def benchmarkSpatial(dataset_path, queries = 200, radius_km = 200):
+    # radius queries around random fixes through SpatialIndex.TrackIndex, against a haversine scan of every fix
+    import numpy as np
+    from SpatialIndex import TrackIndex
+    from TrackKernel import haversineKm
+
+    data = cleanData.loadTracks(dataset_path)
+    latitude = data['Latitude'].to_numpy(dtype = float)
+    longitude = data['Longitude'].to_numpy(dtype = float)
+    centers = np.random.default_rng(0).choice(len(data), queries)
+
+    def scan():
+        for i in centers:
+            data['ID'][haversineKm(latitude[i], longitude[i], latitude, longitude) <= radius_km].unique()
+
+    def indexed():
+        for i in centers:
+            index.stormsNear(latitude[i], longitude[i], radius_km)
+
+    build = timeCall(lambda: TrackIndex(data), repeat = 3)
+    index = TrackIndex(data)
+    before = timeCall(scan, repeat = 3) / queries
+    after = timeCall(indexed, repeat = 3) / queries
+    print(dataset_path + ": " + str(len(data)) + " fixes, index built in " + str(round(build * 1000, 1)) + " ms")
+    print("  full scan:       " + str(round(before * 1000, 3)) + " ms/query")
+    print("  grid index:      " + str(round(after * 1000, 3)) + " ms/query (" + str(round(before / after)) + "x)")
+
+def benchmarkQuery(dataset_path):
+    # one dashboard page of filtered top-10 queries: mask + full sort per query, against StormQuery
+    # on a fresh engine (sorted orders built on first use) and on a warm one (results cached)
+    from StormQuery import StormQuery
+
+    aggr = aggregateStorms(cleanData.loadTracks(dataset_path))
+    year = aggr['initialDate'].dt.year
+    page = [(order_by, ascending, decade, landfall) for order_by, ascending in
+            [('windMax', False), ('pressureMin', True), ('totalDistanceKm', False), ('duration', False)]
+            for decade in range(1970, 2020, 10) for landfall in [None, True]]
+
+    def fullSort():
+        for order_by, ascending, decade, landfall in page:
+            rows = aggr[(year >= decade) & (year <= decade + 9) & ((aggr['landfallBool'] == landfall) if landfall is not None else True)]
+            rows[['ID', 'Name', order_by]].sort_values(by = [order_by], ascending = ascending).head(10)
+
+    def engineQueries(engine):
+        for order_by, ascending, decade, landfall in page:
+            engine.top(order_by, 10, ascending, years = (decade, decade + 9), landfall = landfall)
+
+    before = timeCall(fullSort, repeat = 3)
+    cold = timeCall(lambda: engineQueries(StormQuery(aggr)), repeat = 3)
+    engine = StormQuery(aggr)
+    engineQueries(engine)
+    warm = timeCall(engineQueries, engine, repeat = 3)
+    print(dataset_path + ": " + str(len(aggr)) + " storms, " + str(len(page)) + " queries per page")
+    print("  full sort:       " + str(round(before * 1000, 2)) + " ms/page")
+    print("  StormQuery cold: " + str(round(cold * 1000, 2)) + " ms/page")
+    print("  StormQuery warm: " + str(round(warm * 1000, 2)) + " ms/page")
+
+def benchmarkHeatmap(dataset_path):
+    # page size and build + save time of the heat map with every raw point, against the binned cells
+    import folium
+    from folium import plugins
+    import HeatMap as hm
+
+    def rawPoints(data):
+        map_hurricane = folium.Map(location = [25.7617, -80.191788], zoom_start = 13)
+        map_hurricane.add_child(plugins.HeatMap(data[["Latitude", "Longitude"]], radius = 15))
+        return map_hurricane
+
+    data = cleanData.loadTracks(dataset_path)
+    print(dataset_path + ": " + str(len(data)) + " fixes")
+    with tempfile.TemporaryDirectory() as tmp:
+        map_path = os.path.join(tmp, 'map.html')
+        for name, build in [('raw points', rawPoints), ('binned cells', hm.buildHeatMap)]:
+            seconds = timeCall(lambda: build(data).save(map_path))
+            print("  " + name.ljust(20) + str(round(seconds, 3)) + " s, " + str(round(os.path.getsize(map_path) / 2**20, 2)) + " MB")
+
+def benchmarkPercentiles(dataset_path, percentiles = tuple(range(5, 100, 5))):
+    # duration percentile maps drawn as before (imread + one DataFrame.plot per category group, per map)
+    # against proj1_visualization.renderDurationPercentiles (basemap drawn once, one scatter collection for all thresholds)
+    import matplotlib
+    matplotlib.use('Agg')
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import proj1_visualization as viz
+
+    def groupedMap(atlantic_df, atlantic_df_aggr, percentile, path):
+        top = atlantic_df_aggr[atlantic_df_aggr.duration >= atlantic_df_aggr.duration.quantile(percentile / 100)]
+        top = pd.merge(atlantic_df[atlantic_df.ID.isin(top.ID.tolist())], top, on = ['ID', 'Name'])
+        top['categoryStr'] = ['Category ' + str(cat)[0] for cat in top.Category]
+        boundaries = viz.mapBoundaries(atlantic_df)
+        hurricane_map = plt.imread(viz.BASEMAP_PATH)
+        fig, ax = plt.subplots(figsize = (8, 8))
+        for cat, category in top.groupby('categoryStr'):
+            category.plot(ax = ax, kind = 'scatter', x = 'Longitude', y = 'Latitude',
+                          label = cat, color = viz.c0[cat], alpha = 0.375, s = 5)
+        ax.set_xlim(boundaries[0], boundaries[1])
+        ax.set_ylim(boundaries[2], boundaries[3])
+        ax.grid(linestyle = ':', linewidth = 1.25, color = 'grey')
+        ax.imshow(hurricane_map, zorder = 0, extent = boundaries, aspect = 'auto')
+        fig.savefig(path)
+        plt.close(fig)
+
+    atlantic_df, atlantic_df_aggr = viz.loadVisualizationData(dataset_path)
+    print(dataset_path + ": " + str(len(atlantic_df)) + " fixes")
+    with tempfile.TemporaryDirectory() as tmp:
+        for thresholds in [[95], list(percentiles)]:
+            before = timeCall(lambda: [groupedMap(atlantic_df, atlantic_df_aggr, p, os.path.join(tmp, 'g.png')) for p in thresholds])
+            after = timeCall(viz.renderDurationPercentiles, atlantic_df, atlantic_df_aggr, thresholds, tmp)
+            print("  " + (str(len(thresholds)) + " map(s):").ljust(12) + "per-category plots " + str(round(before, 2)) + \
+                  " s, shared figure " + str(round(after, 2)) + " s")
+
+def benchmarkResample(dataset_path, steps = (1, 3, 6)):
+    # per-storm np.interp loop (before) against TrackResample.resampleStorms, one pass over all storms (after)
+    from TrackResample import resampleStorms
+    from ReferenceLoops import resampleStormsLoop
+
+    data = cleanData.loadTracks(dataset_path)
+    print(dataset_path + ": " + str(data['ID'].nunique()) + " storms, " + str(len(data)) + " fixes")
+    for step_hours in steps:
+        before = timeCall(resampleStormsLoop, data, step_hours)
+        after = timeCall(resampleStorms, data, step_hours, repeat = 3)
+        print("  " + (str(step_hours) + " h grid:").ljust(12) + "per-storm loop " + str(round(before, 2)) + \
+              " s, one pass " + str(round(after, 3)) + " s (" + str(round(before / after)) + "x)")
+
+def benchmarkAnimation(dataset_path):
+    # animated track map with one timestamped Point feature per fix (before) against TrackAnimation's compact
+    # tracks (after): build + save time, page size, and the time node takes to turn the page's data into
+    # GeoJSON (JSON.parse, plus decodeStormTracks for the compact tracks) when node is installed
+    import json
+    import shutil
+    import folium
+    from folium import plugins
+    import StormRules as stormRules
+    import TrackAnimation as trackAnimation
+
+    def pointFeatures(data):
+        return {'type': 'FeatureCollection',
+                'features': [{'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [longitude, latitude]},
+                              'properties': {'times': [time.isoformat()], 'tooltip': storm + ' ' + name.strip(),
+                                             'icon': 'circle',
+                                             'iconstyle': {'color': stormRules.CATEGORY_COLORS[category], 'radius': 2}}}
+                             for storm, name, time, latitude, longitude, category in
+                             zip(data['ID'].astype(str), data['Name'].astype(str), data['Datetime'],
+                                 data['Latitude'].astype(float), data['Longitude'].astype(float), data['Category'])]}
+
+    def perPoint(data):
+        map_tracks = folium.Map()
+        plugins.TimestampedGeoJson(pointFeatures(data), period = 'PT6H', duration = trackAnimation.DEFAULT_DURATION,
+                                   auto_play = False).add_to(map_tracks)
+        return map_tracks
+
+    def decodeSeconds(script, payload):
+        # best of three in node, of the statement in `script` on the data read from stdin
+        code = trackAnimation.DECODE_JS + "var text = require('fs').readFileSync(0, 'utf8'), best = Infinity;\n" \
+               "for (var r = 0; r < 3; r++) { var start = process.hrtime.bigint(); " + script + \
+               "; best = Math.min(best, Number(process.hrtime.bigint() - start) / 1e9); }\nconsole.log(best);"
+        return float(subprocess.run(['node', '-e', code], input = payload, capture_output = True, text = True, check = True).stdout)
+
+    data = cleanData.loadTracks(dataset_path)
+    print(dataset_path + ": " + str(data['ID'].nunique()) + " storms, " + str(len(data)) + " fixes")
+    with tempfile.TemporaryDirectory() as tmp:
+        map_path = os.path.join(tmp, 'animation.html')
+        for name, build, payloadOf, script in [
+                ('per-point features', perPoint, lambda: json.dumps(pointFeatures(data)), "JSON.parse(text)"),
+                ('compact tracks', trackAnimation.buildAnimatedMap,
+                 lambda: json.dumps(trackAnimation.stormTracks(data), separators = (',', ':')),
+                 "decodeStormTracks(JSON.parse(text))")]:
+            seconds = timeCall(lambda: build(data).save(map_path))
+            line = "  " + name.ljust(20) + str(round(seconds, 3)) + " s, " + str(round(os.path.getsize(map_path) / 2**20, 2)) + " MB"
+            if shutil.which('node'):
+                line += ", " + str(round(decodeSeconds(script, payloadOf()) * 1000, 1)) + " ms to GeoJSON in node"
+            print(line)
+
+def benchmarkFetch(dataset_path, sources = 4, delays = (0, 0.5)):
+    # `sources` basin files (the dataset and synthetic ones of the same size) read one readTracks call after
+    # the other (before) against BasinIngest.ingest on a thread pool (after), from a local directory and from
+    # the local HTTP stand-in with `delay` seconds before each response
+    import shutil
+    import BasinIngest as basinIngest
+    import SyntheticTracks as syntheticTracks
+
+    storms = cleanData.readTracks(dataset_path)['ID'].nunique()
+    with tempfile.TemporaryDirectory() as tmp:
+        names = ['basin' + str(k) + '.csv' for k in range(sources)]
+        shutil.copy(dataset_path, os.path.join(tmp, names[0]))
+        for k, name in enumerate(names[1:]):
+            syntheticTracks.generateTracks(os.path.join(tmp, name), storms = storms, seed = k)
+
+        def serial(paths):
+            for path in paths:
+                with basinIngest.openSource(path) as stream:
+                    cleanData.readTracks(stream)
+
+        paths = [os.path.join(tmp, name) for name in names]
+        print(dataset_path + " + " + str(sources - 1) + " synthetic basins, " + str(sources) + " files")
+        print("  local directory:    serial " + str(round(timeCall(serial, paths, repeat = 3), 3)) + " s, concurrent " + \
+              str(round(timeCall(basinIngest.ingest, paths, repeat = 3), 3)) + " s")
+        for delay in delays:
+            with basinIngest.localServer(tmp, delay) as url:
+                urls = [url + name for name in names]
+                print("  HTTP, " + (str(delay) + " s delay:").ljust(14) + "serial " + str(round(timeCall(serial, urls, repeat = 3), 3)) + \
+                      " s, concurrent " + str(round(timeCall(basinIngest.ingest, urls, repeat = 3), 3)) + " s")
+
+def benchmarkAnalogs(dataset_path, queries = 200, k = 10):
+    # top-k analogs of random storms by a pairwise loop over the feature vectors (before) against
+    # StormAnalogs.AnalogIndex's matrix kernel, one storm at a time and all storms in one batch (after)
+    import numpy as np
+    from StormAnalogs import AnalogIndex
+    from ReferenceLoops import analogsLoop
+
+    data = cleanData.loadTracks(dataset_path)
+    build = timeCall(lambda: AnalogIndex(data), repeat = 3)
+    index = AnalogIndex(data)
+    storms = np.random.default_rng(0).choice(index.ids, queries)
+    before = timeCall(lambda: [analogsLoop(index.ids, index.features, storm, k) for storm in storms[:20]]) / 20
+    after = timeCall(lambda: [index.analogs(storm, k) for storm in storms], repeat = 3) / queries
+    batch = timeCall(index.allAnalogs, k, repeat = 3)
+    print(dataset_path + ": " + str(len(index.ids)) + " storms, index built in " + str(round(build * 1000, 1)) + " ms")
+    print("  pairwise loop:   " + str(round(before * 1000, 2)) + " ms/query")
+    print("  matrix kernel:   " + str(round(after * 1000, 3)) + " ms/query (" + str(round(before / after)) + "x), all " + \
+          str(len(index.ids)) + " storms at once " + str(round(batch * 1000, 1)) + " ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Time the cleaning and aggregation pipeline.')
+    parser.add_argument('benchmark', choices = ['aggregate', 'ingest', 'memory', 'chunked', 'spatial', 'query', 'heatmap', 'percentiles', 'resample', 'animation', 'fetch', 'analogs'])
+    parser.add_argument('datasets', nargs = '*', default = ['atlantic.csv', 'pacific.csv'])
+    parser.add_argument('--replicate', type = int, default = 0,
+                        help = 'also run on a copy of each dataset with its rows repeated this many times')
+    args = parser.parse_args()
+
+    benchmark = {'aggregate': benchmarkAggregation, 'ingest': benchmarkIngest, 'memory': benchmarkMemory, 'chunked': benchmarkChunked,
+                 'spatial': benchmarkSpatial, 'query': benchmarkQuery,
+                 'heatmap': benchmarkHeatmap, 'percentiles': benchmarkPercentiles,
+                 'resample': benchmarkResample, 'animation': benchmarkAnimation,
+                 'fetch': benchmarkFetch, 'analogs': benchmarkAnalogs}[args.benchmark]
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in args.datasets:
+            if not os.path.exists(path):
+                print(path + ": not found, skipped")
+                continue
+            benchmark(path)
+            if args.replicate > 1:
+                name = os.path.splitext(os.path.basename(path))[0] + 'x' + str(args.replicate) + '.csv'
+                benchmark(replicateCsv(path, args.replicate, os.path.join(tmp, name)))
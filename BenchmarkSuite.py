@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import functools
+import CleanData as cleanData
+import HeatMap as hm
+import SyntheticTracks as syntheticTracks
+from AggregateData import aggregateStorms
+from Benchmark import timeCall
+
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_RESULTS_DIR = 'benchmarks'
+# reference run kept in the repository; runs are compared with it, never silently with themselves
+DEFAULT_BASELINE = os.path.join(DEFAULT_RESULTS_DIR, 'baseline.pacific.json')
+# a case fails when it is this much slower than its baseline...
+DEFAULT_THRESHOLD = 0.25
+# ...and by at least this many seconds, so timer noise on millisecond cases does not fail the run
+MIN_SLOWDOWN = 0.01
+# machineInfo entries that must match the baseline's for timings to be compared; the host name is left out,
+# so a baseline saved on one CI runner still holds for the other runners of its type
+MACHINE_KEYS = ('python', 'machine', 'processor', 'cpus')
+
+
+@functools.lru_cache(maxsize = None)
+def cleanedTracks(dataset_path):
+    # cleaned frame of a dataset, shared by the cases that start from it
+    return cleanData.loadTracks(dataset_path)
+
+# every case takes a dataset and a scratch directory, does its setup and returns the statement to time
+def caseReadData(dataset_path, tmp):
+    return lambda: cleanData.readData(dataset_path)
+
+def caseCreateAdditionalColumns(dataset_path, tmp):
+    # createAdditionalColumns changes its input, so every run gets a copy (included in the time)
+    data = cleanData.processMaxWind(cleanData.condenseData(cleanData.readTracks(dataset_path)))
+    return lambda: cleanData.createAdditionalColumns(data.copy())
+
+def caseAggregation(dataset_path, tmp):
+    # the aggregation step of proj1.main: sort by storm and time, then aggregate
+    tracks = cleanedTracks(dataset_path)
+    return lambda: aggregateStorms(tracks.sort_values(by = ['ID', 'Datetime'], ascending = True))
+
+def caseLandfall(dataset_path, tmp):
+    # both selections share one classification per frame, which is dropped so every run computes it
+    tracks = cleanedTracks(dataset_path)
+    return lambda: (hm.clearStormClasses(), hm.hurricaneLandFall(tracks), hm.hurricaneNoLandFall(tracks))
+
+def caseMapHurricane(dataset_path, tmp):
+    # heat map of every fix, written without opening a browser
+    tracks = cleanedTracks(dataset_path)
+    return lambda: hm.mapHurricane(tracks, os.path.join(tmp, 'map.html'), open_browser = False)
+
+cases = {'readData': caseReadData,
+         'createAdditionalColumns': caseCreateAdditionalColumns,
+         'aggregation': caseAggregation,
+         'landfall': caseLandfall,
+         'mapHurricane': caseMapHurricane}
+
+
+def resultKey(case, dataset_path, scale):
+    return case + '[' + os.path.splitext(os.path.basename(dataset_path))[0] + 'x' + str(scale) + ']'
+
+def syntheticScale(dataset_path, scale, out_path):
+    # SyntheticTracks file with `scale` times the storms of dataset_path and the same mean fixes per storm
+    ids = cleanData.readTracks(dataset_path)['ID']
+    storms = ids.nunique()
+    return syntheticTracks.generateTracks(out_path, storms = storms * scale, fixes = round(len(ids) / storms),
+                                          basin = str(ids.iloc[0])[:2])
+
+def runSuite(dataset_paths, scales = DEFAULT_SCALES, case_names = None, repeat = 3):
+    # best-of-`repeat` seconds of every case on every dataset scaled by every factor:
+    # {'case[datasetxN]': seconds}; scale 1 is the dataset itself, larger scales are synthetic files
+    # (syntheticScale) with that many times its storms
+    case_names = list(cases) if case_names is None else list(case_names)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for dataset_path in dataset_paths:
+            for scale in scales:
+                path = dataset_path if scale == 1 else \
+                    syntheticScale(dataset_path, scale, os.path.join(tmp, 'x' + str(scale) + '_' + os.path.basename(dataset_path)))
+                for name in case_names:
+                    key = resultKey(name, dataset_path, scale)
+                    results[key] = timeCall(cases[name](path, tmp), repeat = repeat)
+                    print(key.ljust(45) + str(round(results[key], 4)).rjust(10) + " s")
+                cleanedTracks.cache_clear()
+                if path != dataset_path:
+                    os.remove(path)
+    return results
+
+def compareResults(results, baseline, threshold = DEFAULT_THRESHOLD):
+    # cases slower than (1 + threshold) x their baseline: [(key, baseline seconds, seconds), ...]
+    # cases without a baseline are not compared
+    return [(key, baseline[key], seconds) for key, seconds in results.items()
+            if key in baseline and seconds > baseline[key] * (1 + threshold) and seconds - baseline[key] > MIN_SLOWDOWN]
+
+def machineInfo():
+    return {'python': platform.python_version(), 'machine': platform.machine(),
+            'processor': platform.processor(), 'cpus': os.cpu_count(), 'node': platform.node()}
+
+def machineMismatch(baseline):
+    # machineInfo entries of a stored run that differ from this machine: [(key, stored, here), ...];
+    # a run stored without machineInfo differs in all of them
+    stored, here = baseline.get('machineInfo', {}), machineInfo()
+    return [(key, stored.get(key), here[key]) for key in MACHINE_KEYS if stored.get(key) != here[key]]
+
+def mismatchMessage(baseline_path, mismatch):
+    return 'baseline at ' + baseline_path + ' was run on another machine (' + \
+           ', '.join(key + ' ' + repr(stored) + ' here ' + repr(here) for key, stored, here in mismatch) + \
+           '); save one on this machine with --save-baseline, or pass --other-machine'
+
+def readResults(path):
+    with open(path) as f:
+        return json.load(f)
+
+def writeResults(results, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'machineInfo': machineInfo(), 'results': results}, f, indent = 2)
+    os.replace(path + '.tmp', path)
+
+def checkRun(results, baseline_path = DEFAULT_BASELINE, results_dir = DEFAULT_RESULTS_DIR, threshold = DEFAULT_THRESHOLD,
+             save_baseline = False, other_machine = False):
+    # store the run as <results_dir>/latest.json and compare it with the baseline at baseline_path;
+    # returns the regressions. A run with save_baseline becomes the baseline instead; a missing
+    # baseline is an error, so a run is never compared with itself, and so is a baseline from another
+    # machine (machineMismatch) unless other_machine is set
+    writeResults(results, os.path.join(results_dir, 'latest.json'))
+    if save_baseline:
+        writeResults(results, baseline_path)
+        return []
+    if not os.path.exists(baseline_path):
+        raise FileNotFoundError('no baseline at ' + baseline_path + '; pass --baseline or save one with --save-baseline')
+    baseline = readResults(baseline_path)
+    mismatch = machineMismatch(baseline)
+    if mismatch and not other_machine:
+        raise ValueError(mismatchMessage(baseline_path, mismatch))
+    return compareResults(results, baseline['results'], threshold)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Time the pipeline on scaled copies of the datasets and fail on regressions.')
+    parser.add_argument('datasets', nargs = '*', default = ['pacific.csv'])
+    parser.add_argument('--scales', type = int, nargs = '+', default = list(DEFAULT_SCALES))
+    parser.add_argument('--cases', nargs = '+', choices = list(cases), help = 'run only these cases')
+    parser.add_argument('--repeat', type = int, default = 3, help = 'runs per case, the best one counts (default: %(default)s)')
+    parser.add_argument('--threshold', type = float, default = DEFAULT_THRESHOLD,
+                        help = 'allowed slowdown over the baseline, as a fraction (default: %(default)s)')
+    parser.add_argument('--results-dir', default = DEFAULT_RESULTS_DIR, help = 'where runs are stored (default: %(default)s)')
+    parser.add_argument('--baseline', default = DEFAULT_BASELINE, help = 'run to compare with (default: %(default)s)')
+    parser.add_argument('--save-baseline', action = 'store_true', help = 'write this run to --baseline instead of comparing')
+    parser.add_argument('--other-machine', action = 'store_true', help = 'compare with a baseline saved on another machine')
+    args = parser.parse_args()
+
+    # fail before the run, not after it
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        parser.error('no baseline at ' + args.baseline + '; pass --baseline or save one with --save-baseline')
+    if not args.save_baseline and not args.other_machine and machineMismatch(readResults(args.baseline)):
+        parser.error(mismatchMessage(args.baseline, machineMismatch(readResults(args.baseline))))
+    results = runSuite(args.datasets, args.scales, args.cases, args.repeat)
+    regressions = checkRun(results, args.baseline, args.results_dir, args.threshold, args.save_baseline, args.other_machine)
+    for key, before, after in regressions:
+        print("REGRESSION " + key + ": " + str(round(before, 4)) + " s -> " + str(round(after, 4)) + " s (" + \
+              str(round(after / before, 2)) + "x)")
+    sys.exit(1 if regressions else 0)
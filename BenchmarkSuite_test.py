@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from BenchmarkSuite import *
+
+
+class BenchmarkSuiteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    # test that only cases slower than the threshold, and by more than timer noise, are regressions
+    def test_compareResults(self):
+        baseline = {'a[px1]': 1.0, 'b[px1]': 0.001, 'c[px1]': 2.0}
+        results = {'a[px1]': 1.3, 'b[px1]': 0.004, 'c[px1]': 2.4, 'd[px1]': 9.0}
+        self.assertEqual(compareResults(results, baseline, 0.25), [('a[px1]', 1.0, 1.3)])
+        self.assertEqual(compareResults(results, baseline, 0.1), [('a[px1]', 1.0, 1.3), ('c[px1]', 2.0, 2.4)])
+
+    # test that every case runs on the dataset and on a scaled copy of it
+    def test_runSuite(self):
+        results = runSuite(['pacific.csv'], scales = [1, 2], repeat = 1)
+        self.assertEqual(sorted(results), sorted(resultKey(case, 'pacific.csv', scale) for case in cases for scale in [1, 2]))
+        self.assertTrue(all(seconds > 0 for seconds in results.values()))
+        self.assertIn('mapHurricane[pacificx2]', results)
+
+    # test that a missing baseline fails, that a saved one is kept and that a later slower run fails
+    def test_checkRun(self):
+        baseline = os.path.join(self.tmp, 'baseline.json')
+        with self.assertRaises(FileNotFoundError):
+            checkRun({'a[px1]': 1.0}, baseline, self.tmp)
+        self.assertFalse(os.path.exists(baseline))
+
+        self.assertEqual(checkRun({'a[px1]': 1.0}, baseline, self.tmp, save_baseline = True), [])
+        self.assertEqual(readResults(baseline)['results'], {'a[px1]': 1.0})
+
+        self.assertEqual(checkRun({'a[px1]': 2.0}, baseline, self.tmp), [('a[px1]', 1.0, 2.0)])
+        self.assertEqual(readResults(os.path.join(self.tmp, 'latest.json'))['results'], {'a[px1]': 2.0})
+        self.assertEqual(readResults(baseline)['results'], {'a[px1]': 1.0})
+
+        self.assertEqual(checkRun({'a[px1]': 2.0}, baseline, self.tmp, save_baseline = True), [])
+        self.assertEqual(checkRun({'a[px1]': 2.1}, baseline, self.tmp), [])
+
+    # test that a baseline from another machine, or without machine info, is refused unless asked for
+    def test_checkRunOtherMachine(self):
+        baseline = os.path.join(self.tmp, 'baseline.json')
+        checkRun({'a[px1]': 1.0}, baseline, self.tmp, save_baseline = True)
+        self.assertEqual(machineMismatch(readResults(baseline)), [])
+
+        stored = readResults(baseline)
+        stored['machineInfo']['cpus'] = (os.cpu_count() or 1) + 7
+        stored['machineInfo']['node'] = 'another-runner'
+        with open(baseline, 'w') as f:
+            json.dump(stored, f)
+        self.assertEqual(machineMismatch(stored), [('cpus', (os.cpu_count() or 1) + 7, os.cpu_count())])
+        with self.assertRaises(ValueError):
+            checkRun({'a[px1]': 2.0}, baseline, self.tmp)
+        self.assertEqual(checkRun({'a[px1]': 2.0}, baseline, self.tmp, other_machine = True), [('a[px1]', 1.0, 2.0)])
+
+        del stored['machineInfo']
+        self.assertEqual([key for key, _, _ in machineMismatch(stored)], list(MACHINE_KEYS))
+
+    # test that the repository's reference baseline covers every case at every default scale, and says
+    # which machine it was run on
+    def test_referenceBaseline(self):
+        self.assertTrue(set(MACHINE_KEYS) <= set(readResults(DEFAULT_BASELINE)['machineInfo']))
+        results = readResults(DEFAULT_BASELINE)['results']
+        self.assertEqual(sorted(results), sorted(resultKey(case, 'pacific.csv', scale) for case in cases for scale in DEFAULT_SCALES))
+
+    # test that scaled datasets are synthetic files with that many times the storms
+    def test_syntheticScale(self):
+        path = syntheticScale('pacific.csv', 2, os.path.join(self.tmp, 'x2.csv'))
+        ids = cleanData.readTracks(path)['ID']
+        self.assertEqual(ids.nunique(), 2 * cleanData.readTracks('pacific.csv')['ID'].nunique())
+        self.assertTrue(ids.astype(str).str.startswith('EP').all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import pandas as pd
+import CleanData as cleanData
+from AggregateData import aggregateStorms, aggrColumnNames
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    # without pyarrow the aggregates are still returned in memory, only the parquet outputs need it
+    pa = None
+    pq = None
+
+DEFAULT_CHUNKSIZE = 100000
+
+
+def chunkSchema(table):
+    # one schema for every chunk: each chunk has its own categories, so store them as int32-indexed dictionaries
+    fields = []
+    for field in table.schema:
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(pa.dictionary(pa.int32(), pa.string()))
+        fields.append(field)
+    return pa.schema(fields, metadata = table.schema.metadata)
+
+class ParquetAppender:
+    # appends frames to a parquet file, one row group each, casting every frame to the first one's schema
+    def __init__(self, path):
+        if pa is None:
+            raise ImportError("pyarrow is not installed, it is needed to write " + path)
+        self.path = path
+        self.writer = None
+
+    def write(self, data):
+        table = pa.Table.from_pandas(data, preserve_index = False)
+        if self.writer is None:
+            self.schema = chunkSchema(table)
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(table.cast(self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def cleanChunked(dataset_path, tracks_path = None, aggr_path = None, chunksize = DEFAULT_CHUNKSIZE):
+    # clean a best-track csv `chunksize` rows at a time and aggregate it per storm
+    # the rows of the last storm in a chunk are held back until the storm is complete, so every
+    # storm is aggregated exactly as aggregateStorms(loadTracks(dataset_path)) would
+    # rows of a storm must be contiguous in the file, as in the HURDAT releases
+    # cleaned fixes are appended to the parquet file tracks_path, aggregates to aggr_path, one row group
+    # per chunk; with aggr_path the aggregates are not kept in memory (readAggregates sorts them back by ID),
+    # without it the aggregate table is returned
+    tracks = ParquetAppender(tracks_path) if tracks_path is not None else None
+    aggrs = ParquetAppender(aggr_path) if aggr_path is not None else None
+    pending = None
+    finished = set()
+    aggregates = []
+
+    def emit(rows):
+        aggr = aggregateStorms(rows)
+        if aggrs is not None:
+            aggrs.write(aggr)
+        else:
+            aggregates.append(aggr)
+
+    try:
+        for chunk in cleanData.readTrackChunks(dataset_path, chunksize):
+            chunk = cleanData.cleanTracks(chunk).reset_index(drop = True)
+            if chunk.empty:
+                continue
+            if tracks is not None:
+                tracks.write(chunk)
+
+            # storms that already ended cannot show up again
+            ids = chunk['ID'].astype(str)
+            reopened = finished.intersection(ids.unique())
+            if reopened:
+                raise ValueError("rows of storm " + sorted(reopened)[0] + " are not contiguous in " + dataset_path)
+
+            if pending is not None:
+                chunk = pd.concat([pending, chunk], ignore_index = True)
+                ids = chunk['ID'].astype(str)
+
+            # everything but the last storm of the chunk is complete
+            complete = (ids != ids.iloc[-1]).to_numpy()
+            if complete.any():
+                emit(chunk[complete])
+                finished.update(ids[complete].unique())
+            pending = chunk[~complete]
+
+        if pending is not None:
+            emit(pending)
+    finally:
+        for appender in [tracks, aggrs]:
+            if appender is not None:
+                appender.close()
+
+    if aggrs is not None:
+        return None
+    return sortAggregates(pd.concat(aggregates, ignore_index = True) if aggregates \
+                          else pd.DataFrame(columns = aggrColumnNames))
+
+def sortAggregates(aggr):
+    return aggr.sort_values(by = ['ID'], kind = 'mergesort').reset_index(drop = True)
+
+def readAggregates(aggr_path):
+    # aggregate table written by cleanChunked, in the same order as aggregateStorms
+    return sortAggregates(pd.read_parquet(aggr_path))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Clean and aggregate a best-track csv file in bounded-size chunks.')
+    parser.add_argument('dataset', help = 'best-track csv file')
+    parser.add_argument('--tracks', help = 'parquet file for the cleaned fixes')
+    parser.add_argument('--aggregates', help = 'parquet file for the per-storm aggregate table')
+    parser.add_argument('--chunksize', type = int, default = DEFAULT_CHUNKSIZE,
+                        help = 'rows read per chunk (default: %(default)s)')
+    args = parser.parse_args()
+
+    aggr = cleanChunked(args.dataset, args.tracks, args.aggregates, args.chunksize)
+    if aggr is None:
+        aggr = readAggregates(args.aggregates)
+    print(str(len(aggr)) + " storms aggregated from " + args.dataset)
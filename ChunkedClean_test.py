@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+import CleanData as cleanData
+from AggregateData import aggregateStorms
+from ChunkedClean import *
+
+
+class ChunkedCleanTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = cleanData.loadTracks("pacific.csv")
+        cls.aggr = aggregateStorms(cls.data)
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    # test that chunked aggregation matches the in-memory table, whatever the chunk size
+    def test_cleanChunkedAggregates(self):
+        for chunksize in [997, 5000]:
+            aggr = cleanChunked("pacific.csv", chunksize = chunksize)
+            pd.testing.assert_frame_equal(aggr, self.aggr)
+
+    # test that the parquet outputs hold the same fixes and aggregates as the in-memory pipeline
+    def test_cleanChunkedOutputs(self):
+        tracks_path = os.path.join(self.tmp, 'tracks.parquet')
+        aggr_path = os.path.join(self.tmp, 'aggr.parquet')
+        assert cleanChunked("pacific.csv", tracks_path, aggr_path, chunksize = 4000) is None
+
+        tracks = pd.read_parquet(tracks_path)
+        strings = {column: object for column in ['ID', 'Name', 'Time', 'Event', 'Status']}
+        pd.testing.assert_frame_equal(tracks.astype(strings), self.data.reset_index(drop = True).astype(strings))
+        pd.testing.assert_frame_equal(readAggregates(aggr_path), self.aggr)
+
+    # test that without pyarrow the aggregates are still computed, and asking for parquet outputs fails early
+    def test_withoutPyarrow(self):
+        import ChunkedClean as chunkedClean
+        pyarrow = chunkedClean.pa
+        chunkedClean.pa = None
+        try:
+            pd.testing.assert_frame_equal(cleanChunked("pacific.csv", chunksize = 5000), self.aggr)
+            with self.assertRaises(ImportError):
+                cleanChunked("pacific.csv", os.path.join(self.tmp, 'tracks.parquet'))
+        finally:
+            chunkedClean.pa = pyarrow
+        self.assertEqual(os.listdir(self.tmp), [])
+
+    # test that a storm split across the file is rejected instead of aggregated twice
+    def test_cleanChunkedNotContiguous(self):
+        with open("pacific.csv") as source:
+            lines = source.readlines()
+        dataset_path = os.path.join(self.tmp, 'shuffled.csv')
+        with open(dataset_path, 'w') as target:
+            target.writelines([lines[0]] + lines[2000:4000] + lines[1000:2000] + lines[3000:3001])
+
+        with self.assertRaises(ValueError):
+            cleanChunked(dataset_path, chunksize = 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
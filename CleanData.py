@@ -1,6 +1,9 @@
 import numpy as np
 import pandas as pd
+import StageProfiler as stageProfiler
+import StormRules as stormRules
 
+@stageProfiler.profiled
 def readData(dataset_path):
     # read data
     atlantic_df = pd.read_csv(dataset_path)
@@ -9,6 +12,48 @@ def readData(dataset_path):
     atlantic_df = pd.DataFrame(atlantic_df)
     return atlantic_df
     
+# columns kept by condenseData, with the dtype each one is parsed as
+# strings are categorical, so trimming them only touches each distinct value once
+trackColumns = {'ID': 'category', 'Name': 'category', 'Date': 'int32', 'Time': 'int16', \
+                'Event': 'category', 'Status': 'category', 'Latitude': 'category', \
+                'Longitude': 'category', 'Maximum Wind': 'int16', 'Minimum Pressure': 'int16'}
+
+def stripCategories(column):
+    # str.strip() on the categories of a categorical column, merging the ones that become equal
+    stripped = column.cat.categories.str.strip()
+    categories = pd.Index(stripped.unique()).sort_values()
+    codes = categories.get_indexer(stripped)[column.cat.codes]
+    codes[column.cat.codes < 0] = -1
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index = column.index, name = column.name)
+
+@stageProfiler.profiled
+def readTracks(dataset_path, engine = 'c'):
+    # typed read of only the columns condenseData keeps; engine = 'pyarrow' uses the multithreaded parser
+    # blank 'Event' fields stay empty strings instead of becoming NaN
+    if engine == 'pyarrow':
+        data = pd.read_csv(dataset_path, usecols = list(trackColumns), dtype = trackColumns, \
+                           na_filter = False, engine = 'pyarrow')
+    else:
+        # the C parser drops leading whitespace while parsing, only trailing whitespace is left
+        data = pd.read_csv(dataset_path, usecols = list(trackColumns), dtype = trackColumns, \
+                           na_filter = False, skipinitialspace = True)
+    return stripTrackColumns(data)
+
+def readTrackChunks(dataset_path, chunksize):
+    # same as readTracks, but yields frames of at most `chunksize` rows (C engine only)
+    reader = pd.read_csv(dataset_path, usecols = list(trackColumns), dtype = trackColumns, \
+                         na_filter = False, skipinitialspace = True, chunksize = chunksize)
+    with reader:
+        for chunk in reader:
+            yield stripTrackColumns(chunk)
+
+def stripTrackColumns(data):
+    for column in data.columns:
+        if isinstance(data[column].dtype, pd.CategoricalDtype):
+            data[column] = stripCategories(data[column])
+    return data
+
+@stageProfiler.profiled
 def condenseData(atlantic_df):
     # only select hurricanes from 1950 onwards, when they began naming storms
     atlantic_df = atlantic_df[atlantic_df['Date'] > 19500000]
@@ -18,8 +63,14 @@ def condenseData(atlantic_df):
                                "Event", "Status", "Latitude", \
                                "Longitude", "Maximum Wind", \
                                "Minimum Pressure"]]
+
+    # drop the categories that only occurred before 1950
+    for column in atlantic_df.columns:
+        if isinstance(atlantic_df[column].dtype, pd.CategoricalDtype):
+            atlantic_df[column] = atlantic_df[column].cat.remove_unused_categories()
     return atlantic_df
     
+@stageProfiler.profiled
 def removeWhitespace(data):
     # using str.strip() method on all columns labeled 'object' to remove whitespace for easier sorting/querying later on
     # print(data.dtypes)
@@ -32,88 +83,65 @@ def removeWhitespace(data):
         
     return data
         
+@stageProfiler.profiled
 def processMaxWind(data):
     # process 'Maximum Wind' from int to float
-    data['Maximum Wind'] = [float(mw) for mw in data['Maximum Wind']]
+    data['Maximum Wind'] = data['Maximum Wind'].astype(float)
         
     return data 
     
+@stageProfiler.profiled
 def createAdditionalColumns(data):
     # process datetime
-    # start with turning time into strings, to enforce proper %H%M format
-    data['Time'].unique()
+    # ints under four digits when converted to strings need to be prepended with 4 - len() zeroes
+    data['Time'] = data['Time'].astype(str).str.zfill(4)
 
     ## convert longitude and latitude to decimal format for plotting
-    # initial datetime conversion in the same loop
-    for i in range(len(data)):
-        # time
-        # ints under four digits when converted to strings need to be prepended with 4 - len() zeroes
-        timeClean = data.iloc[i, data.columns.get_loc('Time')]
-        if len(str(timeClean)) == 4:
-            data.iloc[i, data.columns.get_loc('Time')] = str(timeClean)
-        else:
-            zeroes = '0' * (4 - len(str(timeClean)))
-            data.iloc[i, data.columns.get_loc('Time')] = zeroes + str(timeClean)
-        
-        # longitude
-        longClean = data.iloc[i, data.columns.get_loc('Longitude')]
-        if longClean[-1] == 'W':
-            data.iloc[i, data.columns.get_loc('Longitude')] = float(longClean.replace('W', '')) * -1
-        else:
-            data.iloc[i, data.columns.get_loc('Longitude')] = float(longClean.replace('E', ''))
-    
-        # latitude
-        latClean = data.iloc[i, data.columns.get_loc('Latitude')]
-        if latClean[-1] == 'N':
-            data.iloc[i, data.columns.get_loc('Latitude')] = float(latClean.replace('N', ''))
-        else:
-            data.iloc[i, data.columns.get_loc('Latitude')] = float(latClean.replace('S', '')) * -1
-
-    # second loop for creating datetime and category variables
+    # the hemisphere suffix decides the sign: W and S are negative
+    longClean = data['Longitude'].str.rstrip('EW').astype(float)
+    data['Longitude'] = np.where(data['Longitude'].str.endswith('W'), -longClean, longClean)
+
+    latClean = data['Latitude'].str.rstrip('NS').astype(float)
+    data['Latitude'] = np.where(data['Latitude'].str.endswith('N'), latClean, -latClean)
+
+    # create datetime by combining variables 'Date' and 'Time'
+    data['Datetime'] = pd.to_datetime(data['Date'].astype(str) + ' ' + data['Time'], format = '%Y%m%d %H%M')
+
+    # create hurricane categories from the wind, Saffir-Simpson thresholds in StormRules
     # use 0 for non-hurricanes (tropical storms, etc.)
-    # 1: Maximum W 64 <= x < 82
-    # 2: 82 <= x < 95
-    # 3: 95 <= x < 112
-    # 4: 112 <= x < 136
-    # 5: x >= 136
-
-    datetime_list = []
-    category_list = []
-    for j in range(len(data)):
-        # create a datetime list by combining variables 'Date' and 'Time'
-        datetime_list.append(str(data.iloc[j, data.columns.get_loc('Date')]) + ' ' + data.iloc[j, data.columns.get_loc('Time')])
-    
-        # create a list of hurricane categories, based on wind value
-        windValue = data.iloc[j, data.columns.get_loc('Maximum Wind')]
-    
-        if data.iloc[j, data.columns.get_loc('Status')] != 'HU':
-            category_list.append(0.0)
-        else:
-            if windValue > 136:
-                category_list.append(5.0)
-            elif windValue > 112:
-                category_list.append(4.0)
-            elif windValue > 95:
-                category_list.append(3.0)
-            elif windValue > 82:
-                category_list.append(2.0)
-            elif windValue > 62:
-                category_list.append(1.0)
-            else:
-                category_list.append(0.0)
-    
-    # join 'Datetime' and 'Category' lists to the main dataset
-    data['Datetime'] = datetime_list
-    data['Datetime'] = pd.to_datetime(data['Datetime'], format = '%Y%m%d %H%M')
-    data['Category'] = category_list
+    data['Category'] = stormRules.categoryOf(data['Maximum Wind'], data['Status']).astype(float)
 
-    # replace -999 values for 'Minimum Pressure' with NaN
-    data = data.replace(-999, pd.NA)
+    # -999 stands for a missing wind or pressure reading: those columns become nullable numbers with <NA>
+    data = stormRules.replaceSentinels(data)
 
     # clean longitude data, as some points are <-180
     # e.g. -359.1 (359.1W) should be 0.9 (0.9E)
-    data['Longitude'].loc[lambda i: i < -180] = data['Longitude'].loc[lambda i: i < -180] + 360
-        
+    data.loc[data['Longitude'] < -180, 'Longitude'] += 360
+
+    return data
+
+# dtypes of the cleaned track frame: float32 coordinates, nullable int16 wind/pressure,
+# int8 category and categorical strings
+compactDtypes = {'ID': 'category', 'Name': 'category', 'Time': 'category', \
+                 'Event': 'category', 'Status': 'category', 'Latitude': 'float32', \
+                 'Longitude': 'float32', 'Maximum Wind': 'Int16', 'Minimum Pressure': 'Int16', \
+                 'Category': 'int8'}
+
+def memoryFootprint(data):
+    # bytes used by the frame, including the python strings of object columns
+    return int(data.memory_usage(deep = True).sum())
+
+@stageProfiler.profiled
+def normalizeDtypes(data, report = False):
+    # convert the cleaned frame to compactDtypes; missing wind/pressure values become <NA>
+    before = memoryFootprint(data) if report else 0
+
+    data = data.astype({column: dtype for column, dtype in compactDtypes.items() if column in data.columns})
+
+    if report:
+        after = memoryFootprint(data)
+        print("Memory footprint: " + str(round(before / 2**20, 2)) + " MB -> " + \
+              str(round(after / 2**20, 2)) + " MB (" + str(len(data)) + " rows)")
     return data
 
 def hurricaneQuery(data, varCondition, varMaxMin, n):
@@ -125,20 +153,27 @@ def hurricaneQuery(data, varCondition, varMaxMin, n):
     ## True for ascending, if you are searching for the lowest values, e.g. lowest pressures
     ## False for descending, if you are searching for the highest values, e.g. highest windspeeds
     # n = int, number of variables to retrieve
-    
-    return data[['ID', 'Name', varCondition]].sort_values(by = [varCondition], ascending = varMaxMin).head(n)
+    ## storms without a value come last; ties keep their order in the table
+    ## for many queries over the same table, with filters or several columns, use StormQuery
+
+    return data[['ID', 'Name', varCondition]].sort_values(by = [varCondition], ascending = varMaxMin, kind = 'mergesort', na_position = 'last').head(n)
     
 def experiments(data):
     # trying groupby() for initial exploratory analysis
     print(data.groupby('ID').mean())
     print(data.groupby('Status').mean())
 
-# Cleaning the dataset
-data = readData("atlantic.csv")
-data = condenseData(data)
-data = removeWhitespace(data)
-data = processMaxWind(data)
-data = createAdditionalColumns(data)
+@stageProfiler.profiled
+def loadTracks(dataset_path, engine = 'c', report = False):
+    # read a best-track csv file and run the full cleaning pipeline on it
+    # readTracks already trims whitespace, so removeWhitespace is not needed
+    return cleanTracks(readTracks(dataset_path, engine), report)
 
-# experiments(data)
-# data.to_csv('atlantic_hurricanes.csv')
+@stageProfiler.profiled
+def cleanTracks(data, report = False):
+    # every cleaning step after reading; each one works row by row, so it can run on any slice of a file
+    data = condenseData(data)
+    data = processMaxWind(data)
+    data = createAdditionalColumns(data)
+    data = normalizeDtypes(data, report)
+    return data
@@ -1,14 +1,18 @@
+import os
+import sys
+import subprocess
 import unittest
 import pandas as pd
 import numpy as np
 from CleanData import *
+from ReferenceLoops import createAdditionalColumnsLoop
 
 
 class CleanDataTest(unittest.TestCase):
     
     # test read_data function 
     def test_readData(self):
-        data = readData("atlantic.csv")
+        data = readData("pacific.csv")
         
         # assert that the read data has the correct columns
         assert list(data.columns) == ['ID', 'Name', 'Date', 'Time', 'Event', 
@@ -23,9 +27,22 @@ class CleanDataTest(unittest.TestCase):
                                       ]
         
     
+    # test that the typed reader gives the same values as readData, condenseData and removeWhitespace
+    def test_readTracks(self):
+        expected = removeWhitespace(condenseData(readData("pacific.csv")))
+
+        for engine in ['c', 'pyarrow']:
+            data = condenseData(readTracks("pacific.csv", engine))
+
+            assert list(data.columns) == list(expected.columns)
+            assert data['ID'].dtype == 'category'
+            assert data['Event'].dtype == 'category'
+            pd.testing.assert_frame_equal(data.astype(expected.dtypes.to_dict()), expected)
+        
+    
     # test condense_data function
     def test_condenseData(self):
-        data = readData("atlantic.csv")
+        data = readData("pacific.csv")
         
         condensed_data = condenseData(data)
         
@@ -43,11 +60,7 @@ class CleanDataTest(unittest.TestCase):
  
     # test create_additional_columns function 
     def test_createAdditionalColumns(self):
-        data = readData("atlantic.csv")
-        data = condenseData(data)
-        data = removeWhitespace(data)
-        data = processMaxWind(data)
-        data = createAdditionalColumns(data)
+        data = loadTracks("pacific.csv")
 
         
         # assertions for all added columns
@@ -55,5 +68,46 @@ class CleanDataTest(unittest.TestCase):
         assert "Category" in data.columns
         
     
+    # test that the columnar createAdditionalColumns matches the row-by-row loop
+    def test_createAdditionalColumnsMatchesLoop(self):
+        data = readData("pacific.csv")
+        data = condenseData(data)
+        data = removeWhitespace(data)
+        data = processMaxWind(data)
+
+        expected = createAdditionalColumnsLoop(data.copy())
+        result = createAdditionalColumns(data.copy())
+
+        # the loop leaves wind and pressure as objects holding <NA>, the columnar version as nullable numbers
+        assert result['Maximum Wind'].dtype == 'Float64'
+        assert result['Minimum Pressure'].dtype == 'Int64'
+        expected = expected.astype({'Maximum Wind': 'Float64', 'Minimum Pressure': 'Int64'})
+        pd.testing.assert_frame_equal(result, expected)
+        
+
+    # test that the cleaned frame uses the compact dtypes and keeps missing pressures as <NA>
+    def test_normalizeDtypes(self):
+        data = createAdditionalColumns(processMaxWind(removeWhitespace(condenseData(readData("pacific.csv")))))
+        compact = normalizeDtypes(data.copy())
+
+        for column, dtype in compactDtypes.items():
+            assert compact[column].dtype == dtype
+        assert compact['Minimum Pressure'].isna().sum() == data['Minimum Pressure'].isna().sum()
+        assert (compact['Latitude'] - data['Latitude']).abs().max() < 1e-4
+        assert memoryFootprint(compact) < memoryFootprint(data) / 4
+        
+    
+    # test that importing the pipeline modules does no work beyond loading pandas/numpy
+    def test_importIsCheap(self):
+        code = ("import time, numpy, pandas\n"
+                "start = time.perf_counter()\n"
+                "import CleanData, AggregateData, HeatMap, proj1\n"
+                "print(time.perf_counter() - start)")
+        result = subprocess.run([sys.executable, "-c", code], capture_output = True, text = True,
+                                check = True, cwd = os.path.dirname(os.path.abspath(__file__)))
+
+        assert float(result.stdout) < 0.5
+        
+    
 if __name__ == '__main__':
     unittest.main()  
\ No newline at end of file
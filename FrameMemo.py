@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+import weakref
+import numpy as np
+
+# key of the edit counter in DataFrame.attrs
+EDITS_ATTR = 'frameMemoEdits'
+
+
+def markEdited(data):
+    # count an in-place edit of data's values (df.loc[...] = ...), so that memoized results are computed again;
+    # assigning whole columns (df['Status'] = ...) and adding or dropping rows are seen without it
+    data.attrs[EDITS_ATTR] = data.attrs.get(EDITS_ATTR, 0) + 1
+
+def columnArrays(data, columns):
+    # the arrays that own the values of `columns` (the codes of categorical columns); they are replaced
+    # whenever a column is assigned, and a masked column gives a new array every time (so it never matches)
+    arrays = []
+    for column in columns:
+        values = data[column].array
+        array = np.asarray(getattr(values, 'codes', values))
+        while isinstance(array.base, np.ndarray):
+            array = array.base
+        arrays.append(array)
+    return arrays
+
+def memoized(cache, data, columns, compute):
+    # compute(data), kept in `cache` by id() of the frame for as long as the frame lives, its row count and
+    # edit count stay the same and its `columns` are the same arrays; the check reads no values, so it costs
+    # the same for any frame size
+    # the entry holds the column arrays, so their memory cannot be reused by a later column while it is kept
+    key = id(data)
+    version = (len(data), data.attrs.get(EDITS_ATTR, 0))
+    arrays = columnArrays(data, columns)
+    entry = cache.get(key)
+    if entry is not None and entry[0] == version and all(kept is array for kept, array in zip(entry[1], arrays)):
+        return entry[2]
+    if entry is None:
+        weakref.finalize(data, cache.pop, key, None)
+    cache[key] = (version, arrays, compute(data))
+    return cache[key][2]
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import pandas as pd
+from FrameMemo import *
+
+
+class FrameMemoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = {}
+        self.calls = 0
+
+    def count(self, data):
+        self.calls += 1
+        return data['a'].sum()
+
+    # test that a result is reused until a column is assigned or the frame is marked edited
+    def test_memoized(self):
+        data = pd.DataFrame({'a': [1, 2, 3], 'b': pd.Categorical(['x', 'y', 'x'])})
+        self.assertEqual(memoized(self.cache, data, ['a', 'b'], self.count), 6)
+        self.assertEqual(memoized(self.cache, data, ['a', 'b'], self.count), 6)
+        self.assertEqual(self.calls, 1)
+
+        data['a'] = [1, 1, 1]
+        self.assertEqual(memoized(self.cache, data, ['a', 'b'], self.count), 3)
+        data['b'] = pd.Categorical(['y', 'y', 'y'])
+        memoized(self.cache, data, ['a', 'b'], self.count)
+        self.assertEqual(self.calls, 3)
+
+        data.loc[0, 'a'] = 10
+        self.assertEqual(memoized(self.cache, data, ['a', 'b'], self.count), 3)
+        markEdited(data)
+        self.assertEqual(memoized(self.cache, data, ['a', 'b'], self.count), 12)
+        self.assertEqual(self.calls, 4)
+
+    # test that masked columns are never taken as unchanged, and that entries go with their frame
+    def test_maskedAndReleased(self):
+        data = pd.DataFrame({'a': pd.array([1, None, 3], dtype = 'Int16')})
+        memoized(self.cache, data, ['a'], self.count)
+        memoized(self.cache, data, ['a'], self.count)
+        self.assertEqual(self.calls, 2)
+
+        key = id(data)
+        del data
+        self.assertNotIn(key, self.cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
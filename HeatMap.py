@@ -2,60 +2,94 @@
 
 
 
+import numpy as np
 import pandas as pd
-import folium
-from folium import plugins
 import webbrowser
-import CleanData as cleanData
+import TrackCache as trackCache
+import FrameMemo as frameMemo
+import HeatTiles as heatTiles
 
 
 
-def loadData():
-    atlantic_df_raw = cleanData.readData('atlantic.csv')
-
-    atlantic_df = cleanData.condenseData(atlantic_df_raw)
-    
-    atlantic_df = cleanData.removeWhitespace(atlantic_df)
-    
-    atlantic_df = cleanData.processMaxWind(atlantic_df)
-    
-    atlantic_df = cleanData.createAdditionalColumns(atlantic_df)
-    
-    cleanData.writeData(atlantic_df, 'atlantic_df.csv')
-
-    df = cleanData.readData('atlantic_df.csv')
+def loadData(dataset_path = 'atlantic.csv', use_cache = True):
+    # cleaned tracks, read from the track cache unless the csv or the cleaning code changed
+    df = trackCache.loadCachedTracks(dataset_path, use_cache = use_cache)
     
     return df
 
 
 
+# classes of stormClasses: a hurricane fix at landfall, hurricane fixes but none at landfall, never a hurricane
+LANDFALL = 'landfall'
+NO_LANDFALL = 'noLandfall'
+NOT_HURRICANE = 'notHurricane'
+
+# stormClasses results by id() of the frame (FrameMemo.memoized); entries go when the frame does
+stormClassCache = {}
+
+def classifyStorms(data):
+    # one pass over the fixes: the position of the last hurricane fix at landfall and of the last
+    # hurricane fix away from landfall of every storm, and the class that follows from them, indexed by ID
+    # positions only grow, so the last one of a storm is its maximum
+    hurricane = (data['Status'] == 'HU').to_numpy()
+    landfall = hurricane & (data['Event'] == 'L').to_numpy()
+    codes, ids = pd.factorize(data['ID'])
+    storms = pd.DataFrame(index = pd.Index(np.asarray(ids, dtype = object), name = 'ID'))
+    for column, rows in [('landfallRow', np.flatnonzero(landfall)), ('hurricaneRow', np.flatnonzero(hurricane & ~landfall))]:
+        last = np.full(len(ids), -1)
+        np.maximum.at(last, codes[rows], rows)
+        storms[column] = last
+    storms['class'] = np.where(storms['landfallRow'] >= 0, LANDFALL,
+                               np.where(storms['hurricaneRow'] >= 0, NO_LANDFALL, NOT_HURRICANE))
+    return storms
+
+def stormClasses(data):
+    # classifyStorms(data), computed once per frame until its ID, Status or Event columns are assigned or
+    # it is marked edited (FrameMemo.markEdited)
+    return frameMemo.memoized(stormClassCache, data, ['ID', 'Status', 'Event'], classifyStorms)
+
+def clearStormClasses():
+    stormClassCache.clear()
+
 #1. How many hurricanes make landfall.
 def hurricaneLandFall(data):
-    filter_hurricane = data['Status']=='HU'
-    filter_landfall = data['Event']=='L'
-    df_landfall = data.loc[filter_hurricane&filter_landfall]
-    df_landfall = df_landfall.drop_duplicates(subset=['ID'], keep='last', inplace=False)
-    return df_landfall
+    # the last hurricane fix at landfall of every storm with one, in the order of the frame
+    storms = stormClasses(data)
+    return data.iloc[np.sort(storms.loc[storms['class'] == LANDFALL, 'landfallRow'].to_numpy())]
     
 
 #2. How many hurricanes reach a certain magnitude, but don’t necessarily make landfall.
 def hurricaneNoLandFall(data):
-    filter_hurricane = data['Status']=='HU'
-    filter_no_landfall = data['Event'] != 'L'
-    df_landfall = hurricaneLandFall(data)
-    df_no_landfall = data.loc[filter_hurricane&filter_no_landfall]
-    df_no_landfall = df_no_landfall.loc[~df_no_landfall['ID'].isin(df_landfall['ID'])]
-    df_no_landfall = df_no_landfall.drop_duplicates(subset=['ID'], keep='last', inplace=False)
-    return df_no_landfall
+    # the last hurricane fix of every hurricane that never made landfall as one, in the order of the frame
+    storms = stormClasses(data)
+    return data.iloc[np.sort(storms.loc[storms['class'] == NO_LANDFALL, 'hurricaneRow'].to_numpy())]
 
 
 #HeatMap of Hurricanes
-def mapHurricane(data, map_path):
-    df_Coord = data[["Latitude", "Longitude"]]
-    map_hurricane = folium.Map(location = [25.7617, -80.191788], zoom_start = 13)
-    map_hurricane.add_child(plugins.HeatMap(df_Coord, radius=15))
-    map_hurricane.save(map_path)
-    webbrowser.open_new_tab(map_path)
+def buildHeatMap(data, weight = None, zooms = heatTiles.DEFAULT_ZOOMS, zoom_start = 13):
+    # heat map of the fixes binned into weighted cells, one layer per zoom level
+    # (see HeatTiles.heatTiles), so the page size does not grow with the number of fixes
+    # folium is slow to import, only load it when a map is built
+    import folium
+    from folium import plugins
+
+    map_hurricane = folium.Map(location = [25.7617, -80.191788], zoom_start = zoom_start)
+    shown = max([zoom for zoom in zooms if zoom <= zoom_start] or [min(zooms)])
+    for zoom, cells in heatTiles.heatTiles(data, zooms, weight).items():
+        # intensities are scaled to [0, 1] per layer, the range leaflet.heat draws
+        if len(cells):
+            cells[:, 2] /= cells[:, 2].max()
+        layer = folium.FeatureGroup(name = str(round(heatTiles.cellDegrees(zoom), 2)) + " degree cells", show = zoom == shown)
+        layer.add_child(plugins.HeatMap(cells.round(3).tolist(), radius=15))
+        map_hurricane.add_child(layer)
+    folium.LayerControl().add_to(map_hurricane)
+    return map_hurricane
+
+def mapHurricane(data, map_path, weight = None, open_browser = True):
+    buildHeatMap(data, weight).save(map_path)
+    # unattended runs (BatchRender) only write the file
+    if open_browser:
+        webbrowser.open_new_tab(map_path)
 
 
 
@@ -65,8 +99,9 @@ def unique(list1):
     unique_list = (list(list_set)) 
     return unique_list
 
-def printNumHurricanes(data, message):  
-    n = len(data['ID'])
+def printNumHurricanes(data, message, storm_class = None):
+    # rows of data, or with storm_class the number of storms of that class in the full frame
+    n = len(data['ID']) if storm_class is None else int((stormClasses(data)['class'] == storm_class).sum())
     print(message + " " + str(n))
     
 def printUniqueHurricanes(data, message):
@@ -91,14 +126,14 @@ df = loadData()
 df_landfall = hurricaneLandFall(df)
 #mapHurricane(df_landfall, "landfall.html")
 message1 = "Number of hurricanes to make Landfall:"
-printNumHurricanes(df_landfall, message1)
+printNumHurricanes(df, message1, LANDFALL)
 #printUniqueHurricanes(df_landfall, message1)
 #printUniqueMethodHurricanes(df_landfall, message1)
 
 df_no_landfall = hurricaneNoLandFall(df)
 #mapHurricane(df_no_landfall, "no_landfall.html")
 message2 = "Number of hurricanes to reach a certain magnitude but no landfall:"
-printNumHurricanes(df_no_landfall, message2)
+printNumHurricanes(df, message2, NO_LANDFALL)
 #printUniqueHurricanes(df_no_landfall, message2)
 #printUniqueMethodHurricanes(df_no_landfall, message2)
 """
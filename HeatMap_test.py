@@ -2,16 +2,20 @@
 
 
 import unittest
+import pandas as pd
 import HeatMap as hm
+import FrameMemo as frameMemo
 
 
 class HeatMapTest(unittest.TestCase):
     
+    @classmethod
+    def setUpClass(cls):
+        cls.df = hm.loadData('pacific.csv')
     
     #Test to determine that all values in the landfall dataframe 'Event' column have a value of 'L'
     def testLandFallCols(self):
-        df = hm.loadData()
-        df_landfall = hm.hurricaneLandFall(df)
+        df_landfall = hm.hurricaneLandFall(self.df)
         found = df_landfall[df_landfall['Event'].str.contains('L')]
         land_count = len(found)
         
@@ -22,12 +26,52 @@ class HeatMapTest(unittest.TestCase):
     
     #Test to determine that all values in the no_landfall dataframe 'Event' column do NOT have a value of 'L'
     def testNoLandFallCols(self):
-        df = hm.loadData()
-        df_no_landfall = hm.hurricaneNoLandFall(df)
+        df_no_landfall = hm.hurricaneNoLandFall(self.df)
         found = df_no_landfall[df_no_landfall['Event'].str.contains('L', na=False)]
         land_count = len(found)
         
         self.assertEqual(land_count, 0)
-    
+
+    #Test that every storm gets one class, matching the landfall and no landfall frames
+    def testStormClasses(self):
+        classes = hm.stormClasses(self.df)
+        self.assertEqual(len(classes), self.df['ID'].nunique())
+        self.assertEqual(set(hm.hurricaneLandFall(self.df)['ID']), set(classes.index[classes['class'] == hm.LANDFALL]))
+        self.assertEqual(set(hm.hurricaneNoLandFall(self.df)['ID']), set(classes.index[classes['class'] == hm.NO_LANDFALL]))
+        hurricanes = set(self.df.loc[self.df['Status'] == 'HU', 'ID'])
+        self.assertEqual(set(classes.index[classes['class'] == hm.NOT_HURRICANE]), set(self.df['ID']) - hurricanes)
+
+    #Test that the classes are computed once per frame, and again when its values change
+    def testStormClassesMemoized(self):
+        df = self.df.copy()
+        classes = hm.stormClasses(df)
+        self.assertIs(hm.stormClasses(df), classes)
+        self.assertIs(hm.stormClasses(self.df), hm.stormClasses(self.df))
+
+        df['Event'] = 'L'
+        changed = hm.stormClasses(df)
+        self.assertIsNot(changed, classes)
+        self.assertEqual(set(changed.loc[changed['class'] != hm.NOT_HURRICANE, 'class']), {hm.LANDFALL})
+
+        # values edited in place are seen once the frame is marked edited
+        df = self.df.copy()
+        classes = hm.stormClasses(df)
+        df.loc[df['Status'] == 'HU', 'Status'] = 'TS'
+        self.assertIs(hm.stormClasses(df), classes)
+        frameMemo.markEdited(df)
+        self.assertEqual(set(hm.stormClasses(df)['class']), {hm.NOT_HURRICANE})
+        self.assertEqual(len(hm.hurricaneLandFall(df)) + len(hm.hurricaneNoLandFall(df)), 0)
+
+        key = id(df)
+        del df
+        self.assertNotIn(key, hm.stormClassCache)
+
+    #Test that the heat map page does not grow with the number of fixes
+    def testHeatMapSize(self):
+        html = hm.buildHeatMap(self.df, 'category').get_root().render()
+        html_repeated = hm.buildHeatMap(pd.concat([self.df] * 3), 'category').get_root().render()
+        self.assertLess(abs(len(html_repeated) - len(html)), 0.01 * len(html))
+        self.assertEqual(html.count('L.heatLayer'), 3)
+
 if __name__ == '__main__':
     unittest.main()      
\ No newline at end of file
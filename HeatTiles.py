@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# a 256 px web-map tile spans 360 degrees of longitude at zoom 0, and half as much at every zoom level above
+TILE_DEGREES = 360.0
+TILE_PIXELS = 256
+# cells about as wide on screen as the heat map radius
+CELL_PIXELS = 16
+# best-track positions are given to 0.1 degree, finer cells would hold single points again
+MIN_CELL_DEGREES = 0.1
+DEFAULT_ZOOMS = (2, 4, 6)
+# columns the fixes can be weighted by, instead of counting them
+WEIGHT_COLUMNS = {'wind': 'Maximum Wind', 'category': 'Category'}
+
+
+def cellDegrees(zoom):
+    # cell size of one zoom level, in degrees
+    return max(TILE_DEGREES / 2**zoom * CELL_PIXELS / TILE_PIXELS, MIN_CELL_DEGREES)
+
+def fixWeights(data, weight):
+    # weight of every fix: None counts fixes, 'wind' or 'category' sums that column (missing values count 0)
+    if weight is None:
+        return None
+    return data[WEIGHT_COLUMNS[weight]].to_numpy(dtype = float, na_value = np.nan).clip(min = 0)
+
+def binFixes(data, cell_deg, weight = None):
+    # non-empty cells of a cell_deg grid as rows of [centre latitude, centre longitude, total weight]
+    # cell edges are multiples of cell_deg, so the grid does not depend on the extent of the data
+    latitude = data['Latitude'].to_numpy(dtype = float)
+    longitude = data['Longitude'].to_numpy(dtype = float)
+    weights = fixWeights(data, weight)
+    if weights is not None:
+        keep = ~np.isnan(weights)
+        latitude, longitude, weights = latitude[keep], longitude[keep], weights[keep]
+    if len(latitude) == 0:
+        return np.empty((0, 3))
+
+    latEdges = np.arange(np.floor(latitude.min() / cell_deg), np.floor(latitude.max() / cell_deg) + 2) * cell_deg
+    lonEdges = np.arange(np.floor(longitude.min() / cell_deg), np.floor(longitude.max() / cell_deg) + 2) * cell_deg
+    counts = np.histogram2d(latitude, longitude, bins = [latEdges, lonEdges], weights = weights)[0]
+    rows, columns = np.nonzero(counts)
+    return np.column_stack([latEdges[rows] + cell_deg / 2, lonEdges[columns] + cell_deg / 2, counts[rows, columns]])
+
+def heatTiles(data, zooms = DEFAULT_ZOOMS, weight = None):
+    # weighted cells of every zoom level: {zoom: cells}
+    # the number of cells is bounded by the area the storms cover, not by the number of fixes
+    return {zoom: binFixes(data, cellDegrees(zoom), weight) for zoom in zooms}
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import pandas as pd
+import CleanData as cleanData
+from HeatTiles import *
+
+
+class HeatTilesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = cleanData.loadTracks("pacific.csv")
+
+    def binReference(self, data, cell_deg, column = None):
+        # cell of every fix from floor(), summed with groupby
+        rows = np.floor(data['Latitude'].to_numpy(dtype = float) / cell_deg)
+        columns = np.floor(data['Longitude'].to_numpy(dtype = float) / cell_deg)
+        weights = np.ones(len(data)) if column is None else data[column].to_numpy(dtype = float, na_value = 0).clip(min = 0)
+        sums = pd.Series(weights).groupby([rows, columns]).sum()
+        return sums[sums > 0]
+
+    # test that every fix lands in its cell and that the cells carry the counts or summed weights
+    def test_binFixesMatchesReference(self):
+        for zoom in DEFAULT_ZOOMS:
+            cell_deg = cellDegrees(zoom)
+            for weight, column in [(None, None), ('wind', 'Maximum Wind'), ('category', 'Category')]:
+                cells = binFixes(self.data, cell_deg, weight)
+                expected = self.binReference(self.data, cell_deg, column)
+                self.assertEqual(len(cells), len(expected))
+                found = pd.Series(cells[:, 2], index = pd.MultiIndex.from_arrays(
+                    [np.round(cells[:, 0] / cell_deg - 0.5), np.round(cells[:, 1] / cell_deg - 0.5)])).sort_index()
+                np.testing.assert_allclose(found.to_numpy(), expected.sort_index().to_numpy())
+                np.testing.assert_array_equal(found.index.to_flat_index(), expected.sort_index().index.to_flat_index())
+
+    # test that every zoom level keeps the total weight and that coarser levels have fewer cells
+    def test_heatTiles(self):
+        tiles = heatTiles(self.data, weight = 'wind')
+        self.assertEqual(list(tiles), list(DEFAULT_ZOOMS))
+        for zoom, cells in tiles.items():
+            self.assertAlmostEqual(cells[:, 2].sum(), self.data['Maximum Wind'].sum(), places = 3)
+        sizes = [len(tiles[zoom]) for zoom in DEFAULT_ZOOMS]
+        self.assertEqual(sizes, sorted(sizes))
+        self.assertEqual(cellDegrees(20), MIN_CELL_DEGREES)
+
+    # test that more fixes over the same area give the same cells with larger weights
+    def test_cellsBoundedByArea(self):
+        cells = binFixes(self.data, 1.0)
+        repeated = binFixes(pd.concat([self.data] * 3), 1.0)
+        np.testing.assert_array_equal(repeated[:, :2], cells[:, :2])
+        np.testing.assert_allclose(repeated[:, 2], 3 * cells[:, 2])
+        self.assertEqual(binFixes(self.data.iloc[:0], 1.0).shape, (0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
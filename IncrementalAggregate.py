@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+import TrackCache as trackCache
+import StormCube as stormCube
+from AggregateData import aggregateStorms
+from TrackKernel import stormOffsets
+
+
+def fingerprintPath(aggr_path):
+    # the fingerprints are stored next to the aggregate table
+    return aggr_path + '.fingerprints'
+
+def stormFingerprints(tracks):
+    # one hash per storm over all of its cleaned rows, in ID/datetime order
+    tracks = tracks.sort_values(by = ['ID', 'Datetime'], kind = 'mergesort')
+    rowHashes = pd.util.hash_pandas_object(tracks, index = False).to_numpy()
+    # storm boundaries from the integer codes of the IDs, not from the strings
+    codes, ids = pd.factorize(tracks['ID'])
+    offsets = stormOffsets(codes)
+
+    fingerprints = [hashlib.blake2b(rowHashes[start:end].tobytes(), digest_size = 16).hexdigest()
+                    for start, end in zip(offsets[:-1], offsets[1:])]
+    fingerprints = pd.DataFrame({'ID': np.asarray(ids, dtype = object)[codes[offsets[:-1]]], 'fingerprint': fingerprints})
+    return fingerprints.sort_values(by = ['ID'], kind = 'mergesort').reset_index(drop = True)
+
+def writeAggregates(aggr, fingerprints, aggr_path, cube = None):
+    # the summary cube is written next to the table, built from it unless given
+    aggr.to_parquet(aggr_path, index = False)
+    fingerprints.to_parquet(fingerprintPath(aggr_path), index = False)
+    stormCube.writeCube(stormCube.buildCube(aggr) if cube is None else cube, stormCube.cubePath(aggr_path))
+
+def readAggregates(aggr_path):
+    return pd.read_parquet(aggr_path), pd.read_parquet(fingerprintPath(aggr_path))
+
+def updateAggregates(tracks, aggr_path):
+    # bring the aggregate table at aggr_path up to date with `tracks`, recomputing only the storms
+    # that were added or whose rows changed, and dropping the ones that disappeared
+    # the file written is identical to a full rebuild; returns the table and the IDs per kind of change
+    fingerprints = stormFingerprints(tracks)
+
+    if os.path.exists(aggr_path) and os.path.exists(fingerprintPath(aggr_path)):
+        old_aggr, old_fingerprints = readAggregates(aggr_path)
+    else:
+        old_aggr, old_fingerprints = None, pd.DataFrame({'ID': [], 'fingerprint': []})
+
+    previous = dict(zip(old_fingerprints['ID'], old_fingerprints['fingerprint']))
+    current = dict(zip(fingerprints['ID'], fingerprints['fingerprint']))
+    changes = {'added': sorted(set(current) - set(previous)),
+               'changed': sorted(i for i in current if i in previous and current[i] != previous[i]),
+               'removed': sorted(set(previous) - set(current))}
+
+    recompute = changes['added'] + changes['changed']
+    fresh = aggregateStorms(tracks[tracks['ID'].isin(recompute)])
+    if old_aggr is None:
+        aggr = fresh
+    else:
+        kept = old_aggr[old_aggr['ID'].isin(set(current) - set(recompute))]
+        aggr = pd.concat([kept, fresh], ignore_index = True) if len(kept) else fresh
+        aggr = aggr.sort_values(by = ['ID'], kind = 'mergesort').reset_index(drop = True)
+        aggr = aggr.astype(fresh.dtypes.to_dict())
+
+    # the cube only has the recomputed storms counted in and their previous rows counted out
+    cube = None
+    if old_aggr is not None and os.path.exists(stormCube.cubePath(aggr_path)):
+        previous_rows = old_aggr[old_aggr['ID'].isin(changes['changed'] + changes['removed'])]
+        cube = stormCube.mergeCubes(stormCube.readCube(stormCube.cubePath(aggr_path)),
+                                    added = stormCube.buildCube(fresh), removed = stormCube.buildCube(previous_rows))
+    writeAggregates(aggr, fingerprints, aggr_path, cube)
+    return aggr, changes
+
+def rebuildAggregates(tracks, aggr_path):
+    # full rebuild, used as the reference for updateAggregates
+    aggr = aggregateStorms(tracks)
+    writeAggregates(aggr, stormFingerprints(tracks), aggr_path)
+    return aggr
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Update a persisted storm aggregate table from a best-track csv file.')
+    parser.add_argument('dataset', help = 'best-track csv file')
+    parser.add_argument('aggregates', help = 'parquet file of the aggregate table')
+    parser.add_argument('--full', action = 'store_true', help = 'rebuild every storm')
+    args = parser.parse_args()
+
+    tracks = trackCache.loadCachedTracks(args.dataset)
+    if args.full:
+        aggr = rebuildAggregates(tracks, args.aggregates)
+        print("rebuilt " + str(len(aggr)) + " storms")
+    else:
+        aggr, changes = updateAggregates(tracks, args.aggregates)
+        print(", ".join(str(len(ids)) + " " + kind for kind, ids in changes.items()) + \
+              " (" + str(len(aggr)) + " storms)")
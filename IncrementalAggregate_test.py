@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+import CleanData as cleanData
+import StormCube as stormCube
+from IncrementalAggregate import *
+
+
+class IncrementalAggregateTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = cleanData.loadTracks("pacific.csv")
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def readBytes(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    # test that fingerprints only change for the storm whose rows changed
+    def test_stormFingerprints(self):
+        revised = self.data.copy()
+        revised.loc[revised['ID'] == 'EP011950', 'Maximum Wind'] += 5
+
+        before = stormFingerprints(self.data).set_index('ID')['fingerprint']
+        after = stormFingerprints(revised).set_index('ID')['fingerprint']
+
+        self.assertEqual(list((before != after)[lambda changed: changed].index), ['EP011950'])
+        self.assertEqual(before.index.tolist(), sorted(self.data['ID'].astype(str).unique()))
+
+    # test that an update with added, revised and dropped storms writes the same file as a full rebuild
+    def test_updateAggregatesMatchesRebuild(self):
+        ids = sorted(self.data['ID'].astype(str).unique())
+        # last season's file: no storms of 2015, one storm that was later dropped, two that were revised,
+        # one of them with a last fix that was added later (so its duration and cube cell change)
+        old = self.data[~self.data['ID'].astype(str).str.endswith('2015')].copy()
+        old.loc[old['ID'] == ids[0], 'Minimum Pressure'] = 1000
+        old = old.drop(old.index[old['ID'] == ids[2]][-1])
+        new = self.data[self.data['ID'] != ids[1]]
+
+        aggr_path = os.path.join(self.tmp, 'aggr.parquet')
+        rebuildAggregates(old, aggr_path)
+        aggr, changes = updateAggregates(new, aggr_path)
+
+        full_path = os.path.join(self.tmp, 'full.parquet')
+        full = rebuildAggregates(new, full_path)
+
+        self.assertEqual(changes['changed'], [ids[0], ids[2]])
+        self.assertEqual(changes['removed'], [ids[1]])
+        self.assertEqual(changes['added'], sorted(i for i in ids if i.endswith('2015')))
+        pd.testing.assert_frame_equal(aggr, full)
+        self.assertEqual(self.readBytes(aggr_path), self.readBytes(full_path))
+        self.assertEqual(self.readBytes(fingerprintPath(aggr_path)), self.readBytes(fingerprintPath(full_path)))
+        pd.testing.assert_frame_equal(stormCube.readCube(stormCube.cubePath(aggr_path)), stormCube.buildCube(full))
+        self.assertEqual(self.readBytes(stormCube.cubePath(aggr_path)), self.readBytes(stormCube.cubePath(full_path)))
+
+    # test that an update without changes recomputes nothing
+    def test_updateAggregatesUnchanged(self):
+        aggr_path = os.path.join(self.tmp, 'aggr.parquet')
+        updateAggregates(self.data, aggr_path)
+        aggr, changes = updateAggregates(self.data, aggr_path)
+
+        self.assertEqual(changes, {'added': [], 'changed': [], 'removed': []})
+        self.assertEqual(len(aggr), self.data['ID'].nunique())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+import CleanData as cleanData
+import BasinIngest as basinIngest
+from AggregateData import aggregateStorms
+
+# bytes from the start of a line within which its ID field ends
+ID_BYTES = 32
+
+
+def decadeRanges(dataset_path):
+    # byte ranges of the rows of every decade of a best-track csv: {decade: [(start, stop), ...]}, in decade
+    # order; the decade comes from the year that ends the ID field of every line (EP011950 -> 1950), found
+    # in the raw bytes, so the file is never parsed here; a line without a year (a blank one) goes with the
+    # line before it
+    if os.path.getsize(dataset_path) == 0:
+        return {}
+    raw = np.memmap(dataset_path, dtype = np.uint8, mode = 'r')
+    starts = np.concatenate([[0], np.flatnonzero(raw == ord('\n')) + 1])
+    starts = starts[starts < len(raw)]
+    # the header line is not a row
+    starts, ends = starts[1:], np.append(starts[2:], len(raw))
+    if not len(starts):
+        return {}
+
+    # end of the ID: the first comma within ID_BYTES of the line start, before any trailing spaces
+    window = raw[np.minimum(starts[:, None] + np.arange(ID_BYTES), len(raw) - 1)]
+    isComma = window == ord(',')
+    idEnd = np.where(isComma.any(axis = 1), starts + isComma.argmax(axis = 1), starts)
+    idEnd = np.minimum(idEnd, ends)
+    spaced = (idEnd > starts) & (raw[np.maximum(idEnd - 1, 0)] == ord(' '))
+    while spaced.any():
+        idEnd = idEnd - spaced
+        spaced = (idEnd > starts) & (raw[np.maximum(idEnd - 1, 0)] == ord(' '))
+
+    digits = raw[np.maximum(idEnd[:, None] - np.arange(4, 0, -1), 0)].astype(np.int64) - ord('0')
+    valid = (idEnd - 4 >= starts) & ((digits >= 0) & (digits <= 9)).all(axis = 1)
+    if not valid.any():
+        return {}
+    decades = digits @ np.array([1000, 100, 10, 1]) // 10 * 10
+    previous = np.maximum.accumulate(np.where(valid, np.arange(len(valid)), -1))
+    decades = decades[np.where(previous >= 0, previous, np.flatnonzero(valid)[0])]
+
+    # one range per run of lines of the same decade
+    runStarts = np.concatenate([[0], np.flatnonzero(np.diff(decades)) + 1])
+    runEnds = np.append(runStarts[1:], len(decades))
+    ranges = {}
+    for decade, first, stop in sorted(zip(decades[runStarts].tolist(), runStarts.tolist(), runEnds.tolist())):
+        ranges.setdefault(decade, []).append((int(starts[first]), int(ends[stop - 1])))
+    return ranges
+
+def readRanges(dataset_path, ranges):
+    # typed rows (CleanData.readTracks) of the header and the byte ranges of a csv, read as one file
+    with open(dataset_path, 'rb') as source:
+        parts = [source.readline()]
+        for start, stop in ranges:
+            source.seek(start)
+            parts.append(source.read(stop - start))
+    # the range that ends the file may have no newline
+    return cleanData.readTracks(io.BytesIO(b''.join(part if part.endswith(b'\n') else part + b'\n' for part in parts)))
+
+def partitionTracks(dataset_paths):
+    # basin/decade partitions of local basin files (or of a {basin: source} dict, as BasinIngest takes), as
+    # the byte ranges each worker reads: [(basin, decade, dataset_path, ranges), ...] in a fixed order
+    if not isinstance(dataset_paths, dict):
+        dataset_paths = basinIngest.sourceBasins(dataset_paths)
+    return [(basin, decade, dataset_path, ranges) for basin, dataset_path in dataset_paths.items()
+            for decade, ranges in decadeRanges(dataset_path).items()]
+
+def cleanAndAggregate(basin, dataset_path, ranges):
+    # worker task: read one partition from its file, clean it and aggregate its storms, both tagged with
+    # the partition's basin
+    tracks = cleanData.cleanTracks(readRanges(dataset_path, ranges))
+    aggr = aggregateStorms(tracks)
+    return basinIngest.tagBasin(tracks, basin), basinIngest.tagBasin(aggr, basin)
+
+def runParallel(dataset_paths, workers = None):
+    # clean + aggregate every basin/decade partition on a process pool; each worker reads its own rows,
+    # only the byte ranges of the partition are sent to it
+    # results are merged in ID order, so they do not depend on the worker count or on scheduling;
+    # both tables carry a 'Basin' column, as BasinIngest.ingestSources gives
+    partitions = partitionTracks(dataset_paths)
+    basins = [partition[0] for partition in partitions]
+    paths = [partition[2] for partition in partitions]
+    ranges = [partition[3] for partition in partitions]
+
+    if workers == 1:
+        results = list(map(cleanAndAggregate, basins, paths, ranges))
+    else:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            results = list(executor.map(cleanAndAggregate, basins, paths, ranges))
+
+    tracks = basinIngest.concatBasins([result[0] for result in results])
+    tracks = tracks.sort_values(by = ['ID', 'Datetime'], kind = 'mergesort').reset_index(drop = True)
+    tracks = cleanData.normalizeDtypes(tracks)
+    aggr = basinIngest.concatBasins([result[1] for result in results])
+    aggr = aggr.sort_values(by = ['ID'], kind = 'mergesort').reset_index(drop = True)
+    return tracks, aggr
+
+def scalingReport(dataset_paths, max_workers = None):
+    # wall time of runParallel for 1..max_workers processes, with the speedup over one process
+    max_workers = max_workers or os.cpu_count()
+    report = []
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        runParallel(dataset_paths, workers)
+        seconds = time.perf_counter() - start
+        report.append({'workers': workers, 'seconds': seconds, 'speedup': report[0]['seconds'] / seconds if report else 1.0})
+    return pd.DataFrame(report)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Clean and aggregate basin files by decade on a process pool.')
+    parser.add_argument('datasets', nargs = '*', default = ['atlantic.csv', 'pacific.csv'])
+    parser.add_argument('--workers', type = int, default = None, help = 'worker processes (default: one per core)')
+    parser.add_argument('--scaling', action = 'store_true', help = 'time 1..workers processes instead')
+    args = parser.parse_args()
+
+    dataset_paths = [path for path in args.datasets if os.path.exists(path)]
+    if args.scaling:
+        print(scalingReport(dataset_paths, args.workers).round(3).to_string(index = False))
+    else:
+        tracks, aggr = runParallel(dataset_paths, args.workers)
+        print(str(len(aggr)) + " storms, " + str(len(tracks)) + " fixes from " + ", ".join(dataset_paths))
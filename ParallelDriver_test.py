@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import CleanData as cleanData
+from AggregateData import aggregateStorms
+from ParallelDriver import *
+
+
+class ParallelDriverTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = cleanData.loadTracks("pacific.csv")
+        cls.aggr = aggregateStorms(cls.data)
+
+    # test that every line goes to the decade in its ID, wherever it is in the file and however it ends
+    def test_decadeRanges(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tracks.csv')
+            lines = [b'ID,Name\r\n', b'EP011949,A\r\n', b'EP101950,B\r\n', b'\r\n', b'CP011959 ,C\r\n',
+                     b'AL021949,D\r\n', b'AL022015,E']
+            with open(path, 'wb') as f:
+                f.writelines(lines)
+            offsets = np.cumsum([0] + [len(line) for line in lines])
+            ranges = decadeRanges(path)
+            self.assertEqual(ranges, {1940: [(offsets[1], offsets[2]), (offsets[5], offsets[6])],
+                                      1950: [(offsets[2], offsets[5])], 2010: [(offsets[6], offsets[7])]})
+
+            with open(path, 'wb') as f:
+                f.write(lines[0])
+            self.assertEqual(decadeRanges(path), {})
+
+    # test that the pool gives the same tables as the in-memory pipeline, for any worker count
+    def test_runParallel(self):
+        tracks = self.data.sort_values(by = ['ID', 'Datetime'], kind = 'mergesort').reset_index(drop = True)
+        tracks['Basin'] = pd.Categorical(['pacific'] * len(tracks))
+        aggr = self.aggr.assign(Basin = pd.Categorical(['pacific'] * len(self.aggr)))
+        for workers in [1, 2]:
+            result_tracks, result_aggr = runParallel(["pacific.csv"], workers)
+
+            pd.testing.assert_frame_equal(result_aggr, aggr)
+            pd.testing.assert_frame_equal(result_tracks, tracks, check_categorical = False)
+
+    # test that the rows of several basins keep their basin, and that two files named after one basin are refused
+    def test_basins(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            copy = os.path.join(tmp, 'eastpacific.csv')
+            shutil.copy("pacific.csv", copy)
+            tracks, aggr = runParallel(["pacific.csv", copy], 1)
+            self.assertEqual(tracks.groupby('Basin', observed = True).size().to_dict(),
+                             {'eastpacific': len(self.data), 'pacific': len(self.data)})
+            self.assertEqual(aggr.groupby('Basin', observed = True).size().to_dict(),
+                             {'eastpacific': len(self.aggr), 'pacific': len(self.aggr)})
+
+            shutil.copy("pacific.csv", os.path.join(tmp, 'pacific.csv'))
+            with self.assertRaises(ValueError):
+                runParallel(["pacific.csv", os.path.join(tmp, 'pacific.csv')], 1)
+
+    # test that the scaling report has one row per worker count
+    def test_scalingReport(self):
+        report = scalingReport(["pacific.csv"], 2)
+        self.assertEqual(report['workers'].tolist(), [1, 2])
+        self.assertEqual(report['speedup'].iloc[0], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+# the original per-row and per-storm loops that the vectorized engines replaced, kept outside the test modules as the
+# reference the tests check against and the "before" column of Benchmark.py
+
+import numpy as np
+import pandas as pd
+from math import sin, cos, sqrt, atan2, radians
+from AggregateData import aggrColumnNames
+
+
+# row-by-row createAdditionalColumns from the original CleanData.py, kept as the reference
+# that the columnar version has to reproduce
+def createAdditionalColumnsLoop(data):
+    for i in range(len(data)):
+        # time
+        timeClean = data.iloc[i, data.columns.get_loc('Time')]
+        if len(str(timeClean)) == 4:
+            data.iloc[i, data.columns.get_loc('Time')] = str(timeClean)
+        else:
+            zeroes = '0' * (4 - len(str(timeClean)))
+            data.iloc[i, data.columns.get_loc('Time')] = zeroes + str(timeClean)
+
+        # longitude
+        longClean = data.iloc[i, data.columns.get_loc('Longitude')]
+        if longClean[-1] == 'W':
+            data.iloc[i, data.columns.get_loc('Longitude')] = float(longClean.replace('W', '')) * -1
+        else:
+            data.iloc[i, data.columns.get_loc('Longitude')] = float(longClean.replace('E', ''))
+
+        # latitude
+        latClean = data.iloc[i, data.columns.get_loc('Latitude')]
+        if latClean[-1] == 'N':
+            data.iloc[i, data.columns.get_loc('Latitude')] = float(latClean.replace('N', ''))
+        else:
+            data.iloc[i, data.columns.get_loc('Latitude')] = float(latClean.replace('S', '')) * -1
+
+    datetime_list = []
+    category_list = []
+    for j in range(len(data)):
+        datetime_list.append(str(data.iloc[j, data.columns.get_loc('Date')]) + ' ' + data.iloc[j, data.columns.get_loc('Time')])
+
+        windValue = data.iloc[j, data.columns.get_loc('Maximum Wind')]
+
+        if data.iloc[j, data.columns.get_loc('Status')] != 'HU':
+            category_list.append(0.0)
+        else:
+            if windValue > 136:
+                category_list.append(5.0)
+            elif windValue > 112:
+                category_list.append(4.0)
+            elif windValue > 95:
+                category_list.append(3.0)
+            elif windValue > 82:
+                category_list.append(2.0)
+            elif windValue > 62:
+                category_list.append(1.0)
+            else:
+                category_list.append(0.0)
+
+    data['Datetime'] = datetime_list
+    data['Datetime'] = pd.to_datetime(data['Datetime'], format = '%Y%m%d %H%M')
+    data['Category'] = category_list
+
+    data = data.replace(-999, pd.NA)
+
+    longitude = data['Longitude'].astype(float)
+    data['Longitude'] = longitude.where(longitude >= -180, longitude + 360)
+    data['Latitude'] = data['Latitude'].astype(float)
+
+    return data
+
+
+## scalar distance function from the original proj1.py loop, scaled to kilometers
+def coord_to_km(lat1, lat2, long1, long2):
+    delta_lat = radians(lat2) - radians(lat1)
+    delta_long = radians(long2) - radians(long1)
+
+    a = sin(delta_lat / 2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(delta_long / 2)**2
+    distance_km = 2 * 6371.0088 * atan2(sqrt(a), sqrt(1 - a))
+    return distance_km
+
+
+# per-ID loop from the original proj1.py, kept as the reference for aggregateStorms
+# rows are collected in a list since DataFrame.append no longer exists, pressure is
+# described as floats, and storms with a single fix get NaN land speeds
+# speeds use total_seconds() and net distance runs from the first to the last fix
+def aggregateStormsLoop(atlantic_df):
+    atlantic_df = atlantic_df.sort_values(by = ['ID', 'Datetime'], ascending = True)
+    hurricane_list = atlantic_df[['ID', 'Name']].drop_duplicates().sort_values(by = ['ID'])
+
+    rows = []
+    for k in range(len(hurricane_list)):
+        subset_df = atlantic_df[atlantic_df['ID'] == hurricane_list.iloc[k, hurricane_list.columns.get_loc('ID')]]
+
+        durationList = [subset_df.Datetime.min(), \
+                        subset_df.Datetime.max(), \
+                        (subset_df.Datetime.max() - subset_df.Datetime.min()).total_seconds() / 3600]
+
+        distance_float = 0
+        speed_list = []
+        for m in range(1, len(subset_df)):
+            distance = coord_to_km(subset_df.iloc[m - 1, subset_df.columns.get_loc('Latitude')], \
+                                   subset_df.iloc[m, subset_df.columns.get_loc('Latitude')], \
+                                   subset_df.iloc[m - 1, subset_df.columns.get_loc('Longitude')], \
+                                   subset_df.iloc[m, subset_df.columns.get_loc('Longitude')])
+            distance_float += distance
+            speed_list.append(distance / ((subset_df.iloc[m, subset_df.columns.get_loc('Datetime')] - subset_df.iloc[m - 1, subset_df.columns.get_loc('Datetime')]).total_seconds() / 3600))
+
+        net_distance = coord_to_km(subset_df.Latitude[subset_df.Datetime == subset_df.Datetime.min()].iloc[0], \
+                                   subset_df.Latitude[subset_df.Datetime == subset_df.Datetime.max()].iloc[0], \
+                                   subset_df.Longitude[subset_df.Datetime == subset_df.Datetime.min()].iloc[0], \
+                                   subset_df.Longitude[subset_df.Datetime == subset_df.Datetime.max()].iloc[0])
+        distanceList = [net_distance, distance_float]
+
+        if speed_list:
+            landSpeedList = [max(speed_list), min(speed_list), sum(speed_list) / len(speed_list)]
+        else:
+            landSpeedList = [np.nan, np.nan, np.nan]
+
+        pressure = pd.to_numeric(subset_df['Minimum Pressure']).astype(float)
+        pressureList = pressure.describe().iloc[1:8].tolist()
+        pressureList.append(pressure.max() - pressure.min())
+
+        windList = subset_df['Maximum Wind'].describe().iloc[1:8].tolist()
+        windList.append(subset_df['Maximum Wind'].max() - subset_df['Maximum Wind'].min())
+
+        categoryList = [subset_df['Category'].max()]
+
+        if subset_df.Event.isin(['L']).any():
+            landfallList = [True,
+                            subset_df.Datetime[subset_df.Event == 'L'].min() - subset_df.Datetime.min(),
+                            subset_df.Datetime[subset_df.Event == 'L'].min(),
+                            subset_df.Category[subset_df.Event == 'L'].iloc[0],
+                            subset_df.loc[subset_df.Event == 'L', ['Longitude', 'Latitude']].iloc[0].iloc[0],
+                            subset_df.loc[subset_df.Event == 'L', ['Longitude', 'Latitude']].iloc[0].iloc[1]]
+        else:
+            landfallList = [False, None, None, None, None, None]
+
+        rows.append(hurricane_list.iloc[k].tolist() + durationList + distanceList + landSpeedList + pressureList + windList + categoryList + landfallList)
+
+    return pd.DataFrame(rows, columns = aggrColumnNames)
+
+
+# per-storm resampling with np.interp, the reference for resampleStorms: positions are interpolated
+# linearly in degrees, which is close to the great circle over the few hundred km between two fixes
+def resampleStormsLoop(data, step_hours):
+    step = pd.Timedelta(hours = step_hours)
+    rows = []
+    for storm_id, storm in data.sort_values(by = ['ID', 'Datetime'], kind = 'mergesort').groupby('ID', observed = True, sort = True):
+        times = storm['Datetime']
+        grid = pd.date_range(times.iloc[0].ceil(step), times.iloc[-1].floor(step), freq = step)
+        seconds = times.astype('int64').to_numpy() / 1e9
+        gridSeconds = grid.astype('int64').to_numpy() / 1e9
+        rows.append(pd.DataFrame({'ID': storm_id, 'Datetime': grid,
+                                  'Latitude': np.interp(gridSeconds, seconds, storm['Latitude'].to_numpy(dtype = float)),
+                                  'Longitude': np.interp(gridSeconds, seconds, storm['Longitude'].to_numpy(dtype = float)),
+                                  'Maximum Wind': np.interp(gridSeconds, seconds, storm['Maximum Wind'].to_numpy(dtype = float, na_value = np.nan))}))
+    return pd.concat(rows, ignore_index = True)
+
+
+def analogsLoop(ids, features, storm_id, k):
+    # one distance per storm pair, the way a search without the matrix kernel would go
+    query = features[list(ids).index(storm_id)].astype(float)
+    distances = [(np.sqrt(((row.astype(float) - query) ** 2).sum()), other) for other, row in zip(ids, features) if other != storm_id]
+    return [other for distance, other in sorted(distances)[:k]]
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from TrackKernel import EARTH_RADIUS_KM, haversineKm
+
+# kilometers per degree of latitude
+KM_PER_DEGREE = 111.195
+
+
+def toDatetime64(value, default):
+    return default if value is None else np.datetime64(pd.Timestamp(value), 'ns')
+
+def expandRanges(lo, hi):
+    # concatenation of arange(lo[i], hi[i]) for every i, without a python loop
+    lengths = hi - lo
+    total = int(lengths.sum())
+    if total == 0:
+        return np.array([], dtype = np.int64)
+    starts = np.repeat(lo - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return starts + np.arange(total)
+
+
+class TrackIndex:
+    # grid index over the fixes of a cleaned track frame, for radius and bounding-box queries
+    # fixes are bucketed into cell_deg x cell_deg cells and sorted by (cell, minute), so the fixes
+    # of one cell inside a time range are a single slice found with searchsorted; without a time range
+    # the slice of every cell is read from precomputed cell starts
+
+    def __init__(self, tracks, cell_deg = 0.5):
+        self.tracks = tracks
+        self.cell_deg = cell_deg
+        self.nlat = int(np.ceil(180 / cell_deg))
+        self.nlon = int(np.ceil(360 / cell_deg))
+
+        latitude = tracks['Latitude'].to_numpy(dtype = float)
+        longitude = tracks['Longitude'].to_numpy(dtype = float)
+        datetime = tracks['Datetime'].to_numpy(dtype = 'datetime64[ns]')
+        codes, ids = pd.factorize(tracks['ID'], sort = True)
+        names = tracks['Name'].to_numpy()
+
+        cell = self.cellOf(latitude, longitude)
+        minutes = self.minutesOf(datetime)
+        self.order = np.lexsort((minutes, cell))
+        self.keys = (cell[self.order] << 32) | minutes[self.order]
+        self.latitude = latitude[self.order]
+        self.longitude = longitude[self.order]
+        self.datetime = datetime[self.order]
+        self.storm = codes[self.order]
+        # first sorted position of every cell, and the fixes as unit vectors for chord distances
+        self.cellStarts = np.searchsorted(cell[self.order], np.arange(self.nlat * self.nlon + 1))
+        latitude, longitude = np.radians(self.latitude), np.radians(self.longitude)
+        self.unit = (np.cos(latitude) * np.cos(longitude), np.cos(latitude) * np.sin(longitude), np.sin(latitude))
+
+        self.ids = np.asarray(ids, dtype = object)
+        self.names = np.empty(len(self.ids), dtype = object)
+        self.names[codes] = names
+
+    def cellOf(self, latitude, longitude):
+        row = np.clip(np.floor((latitude + 90) / self.cell_deg).astype(np.int64), 0, self.nlat - 1)
+        column = np.floor((longitude + 180) / self.cell_deg).astype(np.int64) % self.nlon
+        return row * self.nlon + column
+
+    def minutesOf(self, datetime):
+        # minutes since 1800, which fits the lower 32 bits of the sort key
+        minutes = (datetime.astype('datetime64[m]') - np.datetime64('1800-01-01', 'm')).astype(np.int64)
+        return np.clip(minutes, 0, 2**32 - 1).astype(np.int64)
+
+    def candidates(self, rows, columns, start = None, end = None):
+        # sorted positions of the fixes in the given cell rows x columns, within [start, end] if given
+        cells = (rows[:, None] * self.nlon + columns[None, :]).ravel()
+        if start is None and end is None:
+            return expandRanges(self.cellStarts[cells], self.cellStarts[cells + 1])
+        start = toDatetime64(start, np.datetime64('1800-01-01', 'ns'))
+        end = toDatetime64(end, np.datetime64('2200-01-01', 'ns'))
+        lo = np.searchsorted(self.keys, (cells << 32) | self.minutesOf(np.array([start]))[0], 'left')
+        hi = np.searchsorted(self.keys, (cells << 32) | self.minutesOf(np.array([end]))[0], 'right')
+        positions = expandRanges(lo, hi)
+        # the key only has minute resolution, check the exact times
+        inside = (self.datetime[positions] >= start) & (self.datetime[positions] <= end)
+        return positions[inside]
+
+    def columnsBetween(self, lon_min, lon_max):
+        # grid columns covering [lon_min, lon_max], wrapping across the antimeridian when lon_min > lon_max
+        first = int(np.floor((lon_min + 180) / self.cell_deg))
+        last = int(np.floor((lon_max + 180) / self.cell_deg))
+        if lon_min > lon_max:
+            last += self.nlon
+        if last - first + 1 >= self.nlon:
+            return np.arange(self.nlon)
+        return np.arange(first, last + 1) % self.nlon
+
+    def rowsBetween(self, lat_min, lat_max):
+        first = int(np.clip(np.floor((lat_min + 90) / self.cell_deg), 0, self.nlat - 1))
+        last = int(np.clip(np.floor((lat_max + 90) / self.cell_deg), 0, self.nlat - 1))
+        return np.arange(first, last + 1)
+
+    def stormsNear(self, lat, lon, radius_km, start = None, end = None):
+        # storms with a fix within radius_km of (lat, lon), optionally between start and end,
+        # with the distance of their closest fix, nearest first
+        delta_lat = radius_km / KM_PER_DEGREE
+        lat_min, lat_max = lat - delta_lat, lat + delta_lat
+        if lat_min <= -90 or lat_max >= 90:
+            columns = np.arange(self.nlon)
+        else:
+            delta_lon = delta_lat / np.cos(np.radians(max(abs(lat_min), abs(lat_max))))
+            columns = np.arange(self.nlon) if delta_lon >= 180 else \
+                self.columnsBetween(((lon - delta_lon + 180) % 360) - 180, ((lon + delta_lon + 180) % 360) - 180)
+        positions = self.candidates(self.rowsBetween(lat_min, lat_max), columns, start, end)
+
+        # squared chord between unit vectors grows with the distance, so the closest fix of every storm is
+        # found without trigonometry; only those fixes get their haversine distance, which decides the radius
+        phi, lam = np.radians(lat), np.radians(lon)
+        center = (np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi))
+        chord = sum(np.square(axis[positions] - value) for axis, value in zip(self.unit, center))
+        limit = (2 * np.sin(min(radius_km / EARTH_RADIUS_KM, np.pi) / 2))**2
+        # the margin keeps fixes at the radius that rounding would move out of the chord bound
+        near = chord <= limit * (1 + 1e-9) + 1e-15
+        positions, chord = positions[near], chord[near]
+        storm = self.storm[positions]
+        closest = np.full(len(self.ids), np.inf)
+        np.minimum.at(closest, storm, chord)
+        # one fix per storm, the first of any ties, in storm order
+        winner = chord == closest[storm]
+        storm, first = np.unique(storm[winner], return_index = True)
+        positions = positions[winner][first]
+        distance = haversineKm(lat, lon, self.latitude[positions], self.longitude[positions])
+        storm, distance = storm[distance <= radius_km], distance[distance <= radius_km]
+        nearest = np.argsort(distance, kind = 'mergesort')
+        return pd.DataFrame({'ID': self.ids[storm[nearest]],
+                             'Name': self.names[storm[nearest]],
+                             'distanceKm': distance[nearest]})
+
+    def fixesInBbox(self, lat_min, lat_max, lon_min, lon_max, start = None, end = None):
+        # fixes inside the box, optionally between start and end, in their original order
+        # lon_min > lon_max selects a box crossing the antimeridian
+        positions = self.candidates(self.rowsBetween(lat_min, lat_max),
+                                    self.columnsBetween(lon_min, lon_max), start, end)
+        latitude, longitude = self.latitude[positions], self.longitude[positions]
+        inside = (latitude >= lat_min) & (latitude <= lat_max)
+        if lon_min <= lon_max:
+            inside &= (longitude >= lon_min) & (longitude <= lon_max)
+        else:
+            inside &= (longitude >= lon_min) | (longitude <= lon_max)
+        return self.tracks.iloc[np.sort(self.order[positions[inside]])]
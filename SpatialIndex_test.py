@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import pandas as pd
+import CleanData as cleanData
+from TrackKernel import haversineKm
+from SpatialIndex import *
+
+
+class SpatialIndexTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = cleanData.loadTracks("pacific.csv")
+        cls.index = TrackIndex(cls.data)
+
+    def between(self, start, end):
+        datetime = self.data['Datetime']
+        return ((datetime >= pd.Timestamp(start)) if start else True) & ((datetime <= pd.Timestamp(end)) if end else True)
+
+    def scanNear(self, lat, lon, radius_km, start = None, end = None):
+        distance = haversineKm(lat, lon, self.data['Latitude'].to_numpy(dtype = float), self.data['Longitude'].to_numpy(dtype = float))
+        near = (distance <= radius_km) & self.between(start, end)
+        return pd.Series(distance[near], index = self.data['ID'].astype(str)[near]).groupby(level = 0).min()
+
+    # test that radius queries find the same storms and closest distances as a full scan
+    def test_stormsNearMatchesScan(self):
+        queries = [(16.85, -99.88, 200, None, None),
+                   (16.85, -99.88, 200, '1990-01-01', '1999-12-31'),
+                   (21.3, -157.86, 500, '1980-06-01 12:00', None),
+                   (10.0, 179.5, 300, None, None),
+                   (60.0, -140.0, 1500, None, None),
+                   (0.0, 0.0, 100, None, None)]
+        for lat, lon, radius_km, start, end in queries:
+            found = self.index.stormsNear(lat, lon, radius_km, start, end)
+            expected = self.scanNear(lat, lon, radius_km, start, end)
+            self.assertEqual(sorted(found['ID']), sorted(expected.index))
+            np.testing.assert_allclose(found.set_index('ID')['distanceKm'].sort_index(), expected.sort_index())
+            self.assertTrue(found['distanceKm'].is_monotonic_increasing)
+
+    # test that bounding-box queries return the same rows as a full scan, including boxes across the antimeridian
+    def test_fixesInBboxMatchesScan(self):
+        latitude, longitude = self.data['Latitude'], self.data['Longitude']
+        queries = [(15, 20, -105, -100, None, None),
+                   (10, 30, -120.5, -110.25, '2000-01-01', '2010-12-31'),
+                   (0, 40, 170, -170, None, None),
+                   (-90, 90, -180, 180, None, None)]
+        for lat_min, lat_max, lon_min, lon_max, start, end in queries:
+            if lon_min <= lon_max:
+                inLon = (longitude >= lon_min) & (longitude <= lon_max)
+            else:
+                inLon = (longitude >= lon_min) | (longitude <= lon_max)
+            expected = self.data[(latitude >= lat_min) & (latitude <= lat_max) & inLon & self.between(start, end)]
+            pd.testing.assert_frame_equal(self.index.fixesInBbox(lat_min, lat_max, lon_min, lon_max, start, end), expected)
+
+    # test that a query with no fixes in range gives empty results
+    def test_emptyQuery(self):
+        self.assertEqual(len(self.index.stormsNear(16.85, -99.88, 200, '1800-01-01', '1900-01-01')), 0)
+        self.assertEqual(len(self.index.fixesInBbox(-60, -50, 0, 10)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
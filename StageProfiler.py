@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import cProfile
+import argparse
+import functools
+import threading
+import contextlib
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # no getrusage on Windows, the RSS column stays empty there
+    resource = None
+
+try:
+    from pyinstrument import Profiler as Pyinstrument
+except ImportError:
+    Pyinstrument = None
+
+# off by default: a profiled stage then costs one global lookup on top of the call
+enabled = False
+# finished stages, in the order they finished: one dict per call
+records = []
+# settings of the current run, see enable()
+settings = {}
+# stages that are running in each thread, innermost last (see stageStack)
+running = threading.local()
+origin = time.perf_counter()
+
+
+def enable(memory = False, profile_stage = None, profiler = 'cprofile', profile_dir = '.'):
+    # start recording every stage; memory = True also traces python allocations with tracemalloc, which
+    # slows the pipeline down, so it is off unless asked for
+    # profile_stage names one stage to run under cProfile ('cprofile', written as <profile_dir>/<stage>.prof)
+    # or pyinstrument ('pyinstrument', written as <profile_dir>/<stage>.html); repeated calls of the stage
+    # add up in the same profile
+    # tracemalloc has one peak counter for the whole process, so memory is only recorded for the stages of the
+    # thread that calls enable(); stages on other threads get no tracemallocPeakMB, while their allocations
+    # count towards the peaks of the stages that are running on that thread
+    global enabled, origin
+    if profile_stage is not None and profiler == 'pyinstrument' and Pyinstrument is None:
+        raise ImportError("pyinstrument is not installed, use profiler = 'cprofile'")
+    settings.clear()
+    settings.update({'memory': memory, 'memoryThread': threading.get_ident(), 'profileStage': profile_stage,
+                     'profiler': profiler, 'profileDir': profile_dir, 'profile': None})
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        settings['stopTracing'] = True
+    reset()
+    origin = time.perf_counter()
+    enabled = True
+
+def disable():
+    global enabled
+    enabled = False
+    if settings.pop('stopTracing', False):
+        tracemalloc.stop()
+
+def reset():
+    del records[:]
+    running.stages = []
+
+def stageStack():
+    # running stages of the calling thread, so stages run on a thread pool nest within their own thread
+    if not hasattr(running, 'stages'):
+        running.stages = []
+    return running.stages
+
+def rowCount(value):
+    # rows of a frame, series or array; None for anything else (paths, tuples, figures)
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)) else None
+
+def peakRssMB():
+    if resource is None:
+        return None
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == 'darwin' else 2**10)
+
+def startRecord(name, rows_in):
+    openStages = stageStack()
+    record = {'name': name, 'start': None, 'seconds': None, 'cpuSeconds': None,
+              'rowsIn': rows_in, 'rowsOut': None, 'peakRssDeltaMB': None, 'tracemallocPeakMB': None,
+              'depth': len(openStages), 'pid': os.getpid(), 'tid': threading.get_ident()}
+    stage = {'record': record, 'rss': peakRssMB(), 'traced': 0, 'peak': 0,
+             'memory': settings['memory'] and record['tid'] == settings['memoryThread'],
+             'profiling': name == settings['profileStage'] and not any(s['profiling'] for s in openStages)}
+    if stage['memory']:
+        current, peak = tracemalloc.get_traced_memory()
+        # the enclosing stage keeps the peak it reached so far, the peak counter is reset for this one
+        if openStages:
+            openStages[-1]['peak'] = max(openStages[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        stage['traced'], stage['peak'] = current, current
+    if stage['profiling']:
+        startProfile()
+    openStages.append(stage)
+    stage['wall'], stage['cpu'] = time.perf_counter(), time.process_time()
+    record['start'] = stage['wall'] - origin
+    return record
+
+def finishRecord(record):
+    openStages = stageStack()
+    stage = openStages.pop()
+    record['seconds'] = time.perf_counter() - stage['wall']
+    record['cpuSeconds'] = time.process_time() - stage['cpu']
+    if stage['profiling']:
+        record['profile'] = stopProfile(record['name'])
+    if stage['rss'] is not None:
+        record['peakRssDeltaMB'] = peakRssMB() - stage['rss']
+    if stage['memory']:
+        peak = max(stage['peak'], tracemalloc.get_traced_memory()[1])
+        record['tracemallocPeakMB'] = (peak - stage['traced']) / 2**20
+        if openStages:
+            openStages[-1]['peak'] = max(openStages[-1]['peak'], peak)
+    records.append(record)
+
+def startProfile():
+    # one profiler per run, so repeated calls of the profiled stage add up
+    if settings['profile'] is None:
+        settings['profile'] = cProfile.Profile() if settings['profiler'] == 'cprofile' else Pyinstrument()
+    if settings['profiler'] == 'cprofile':
+        settings['profile'].enable()
+    else:
+        settings['profile'].start()
+
+def stopProfile(name):
+    # stop the profiler and write what it has so far, returns the file
+    profile = settings['profile']
+    os.makedirs(settings['profileDir'], exist_ok = True)
+    if settings['profiler'] == 'cprofile':
+        profile.disable()
+        path = os.path.join(settings['profileDir'], name + '.prof')
+        profile.dump_stats(path)
+    else:
+        profile.stop()
+        path = os.path.join(settings['profileDir'], name + '.html')
+        with open(path, 'w') as f:
+            f.write(profile.output_html())
+    return path
+
+def profiled(func):
+    # decorator for a pipeline stage: records the call under the function's name while profiling is enabled
+    # rows in are counted on the first argument, rows out on the return value
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return func(*args, **kwargs)
+        record = startRecord(func.__name__, rowCount(args[0]) if args else None)
+        try:
+            result = func(*args, **kwargs)
+            record['rowsOut'] = rowCount(result)
+            return result
+        finally:
+            finishRecord(record)
+    return wrapper
+
+@contextlib.contextmanager
+def stage(name, rows_in = None):
+    # same as profiled, for a block of code; the block can set 'rowsOut' on the record it gets
+    if not enabled:
+        yield {}
+        return
+    record = startRecord(name, rows_in)
+    try:
+        yield record
+    finally:
+        finishRecord(record)
+
+
+def summary():
+    # one line per stage name: calls, total wall and CPU seconds, rows in and out of the last call
+    lines = []
+    for name in dict.fromkeys(record['name'] for record in records):
+        calls = [record for record in records if record['name'] == name]
+        last = calls[-1]
+        lines.append(name.ljust(48) + str(len(calls)).rjust(6) + \
+                     str(round(sum(record['seconds'] for record in calls), 3)).rjust(10) + " s" + \
+                     str(round(sum(record['cpuSeconds'] for record in calls), 3)).rjust(10) + " s cpu" + \
+                     ("" if last['rowsOut'] is None else str(last['rowsOut']).rjust(10) + " rows"))
+    return "\n".join(lines)
+
+def writeJson(path):
+    # every record, plus the settings of the run
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'settings': {key: settings.get(key) for key in ['memory', 'profileStage', 'profiler']},
+                   'stages': records},
+                  f, indent = 2)
+    os.replace(path + '.tmp', path)
+    return path
+
+def writeChromeTrace(path):
+    # trace event file for chrome://tracing or Perfetto: one complete ('X') event per stage, in microseconds
+    events = [{'name': record['name'], 'cat': 'stage', 'ph': 'X',
+               'ts': record['start'] * 1e6, 'dur': record['seconds'] * 1e6,
+               'pid': record['pid'], 'tid': record['tid'],
+               'args': {key: record[key] for key in ['cpuSeconds', 'rowsIn', 'rowsOut', 'peakRssDeltaMB', 'tracemallocPeakMB']
+                        if record[key] is not None}}
+              for record in records]
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    os.replace(path + '.tmp', path)
+    return path
+
+def profilePipeline(dataset_path, render_dir = None):
+    # the nightly run with every stage recorded: clean the csv (no track cache), aggregate, and optionally
+    # render the report artifacts into render_dir, one after another so every stage lands in this process
+    import proj1
+    with stage('pipeline'):
+        proj1.main(dataset_path, use_cache = False)
+        if render_dir is not None:
+            import BatchRender as batchRender
+            batchRender.renderAll(dataset_path, render_dir, workers = 1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Run the pipeline with per-stage timing and memory records.')
+    parser.add_argument('dataset', nargs = '?', default = 'atlantic.csv')
+    parser.add_argument('--json', default = 'stages.json', help = 'stage records (default: %(default)s)')
+    parser.add_argument('--trace', default = 'stages.trace.json', help = 'Chrome trace file (default: %(default)s)')
+    parser.add_argument('--render', metavar = 'DIR', help = 'also render the report artifacts into DIR')
+    parser.add_argument('--memory', action = 'store_true', help = 'trace python allocations per stage of the main thread (slower)')
+    parser.add_argument('--profile-stage', help = 'run this stage, e.g. createAdditionalColumns, under a profiler')
+    parser.add_argument('--profiler', choices = ['cprofile', 'pyinstrument'], default = 'cprofile')
+    args = parser.parse_args()
+
+    # the pipeline modules record into the imported module, not into this script's copy of it
+    import StageProfiler as stageProfiler
+    stageProfiler.enable(args.memory, args.profile_stage, args.profiler, os.path.dirname(os.path.abspath(args.json)))
+    stageProfiler.profilePipeline(args.dataset, args.render)
+    stageProfiler.disable()
+    print(stageProfiler.summary())
+    print("records in " + stageProfiler.writeJson(args.json) + ", trace in " + stageProfiler.writeChromeTrace(args.trace))
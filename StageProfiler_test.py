@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import pstats
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+import StageProfiler as stageProfiler
+
+
+@stageProfiler.profiled
+def double(data):
+    return pd.concat([data, data])
+
+@stageProfiler.profiled
+def allocate(megabytes):
+    # holds `megabytes` of python allocations until it returns
+    block = bytearray(megabytes * 2**20)
+    return len(block)
+
+
+class StageProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        stageProfiler.disable()
+        stageProfiler.reset()
+        shutil.rmtree(self.tmp)
+
+    # test that nothing is recorded while profiling is disabled
+    def test_disabled(self):
+        data = pd.DataFrame({'a': range(5)})
+        self.assertEqual(len(double(data)), 10)
+        with stageProfiler.stage('block') as record:
+            record['rowsOut'] = 1
+        self.assertEqual(stageProfiler.records, [])
+
+    # test that nested stages are recorded with their timings, rows and depth
+    def test_stages(self):
+        stageProfiler.enable()
+        with stageProfiler.stage('outer', 3) as record:
+            double(pd.DataFrame({'a': range(3)}))
+            record['rowsOut'] = 6
+        records = stageProfiler.records
+
+        self.assertEqual([(r['name'], r['depth'], r['rowsIn'], r['rowsOut']) for r in records],
+                         [('double', 1, 3, 6), ('outer', 0, 3, 6)])
+        self.assertTrue(all(r['seconds'] > 0 and r['cpuSeconds'] >= 0 for r in records))
+        self.assertGreaterEqual(records[0]['start'], records[1]['start'])
+        self.assertGreaterEqual(records[1]['seconds'], records[0]['seconds'])
+
+    # test that the tracemalloc peak of a stage includes the peaks of the stages inside it
+    def test_memory(self):
+        stageProfiler.enable(memory = True)
+        with stageProfiler.stage('outer'):
+            allocate(8)
+            allocate(2)
+        inner, small, outer = stageProfiler.records
+
+        self.assertGreater(inner['tracemallocPeakMB'], 7.9)
+        self.assertLess(small['tracemallocPeakMB'], 3)
+        self.assertGreaterEqual(outer['tracemallocPeakMB'], inner['tracemallocPeakMB'])
+
+    # test that only the stages of the enabling thread record memory, and that a stage on another thread
+    # neither resets their peak nor gets one of its own
+    def test_memoryThreads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        stageProfiler.enable(memory = True)
+        with stageProfiler.stage('outer'):
+            with ThreadPoolExecutor(max_workers = 1) as executor:
+                # the 8 MB block is freed before the worker's stage starts and resets the process-wide peak
+                allocate(8)
+                executor.submit(allocate, 1).result()
+        inner, small, outer = stageProfiler.records
+
+        self.assertNotEqual(small['tid'], outer['tid'])
+        self.assertIsNone(small['tracemallocPeakMB'])
+        self.assertGreater(inner['tracemallocPeakMB'], 7.9)
+        self.assertGreaterEqual(outer['tracemallocPeakMB'], inner['tracemallocPeakMB'])
+
+    # test that stages running on other threads nest within their own thread, not within the caller's stage
+    def test_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        stageProfiler.enable()
+        with stageProfiler.stage('outer'):
+            with ThreadPoolExecutor(max_workers = 2) as executor:
+                list(executor.map(double, [pd.DataFrame({'a': range(n)}) for n in range(4)]))
+        records = stageProfiler.records
+
+        self.assertEqual(sorted((r['name'], r['depth']) for r in records), [('double', 0)] * 4 + [('outer', 0)])
+        self.assertEqual(sorted(r['rowsOut'] for r in records[:-1]), [0, 2, 4, 6])
+        self.assertEqual(stageProfiler.stageStack(), [])
+
+    # test that the records are written as JSON and as Chrome trace events
+    def test_export(self):
+        stageProfiler.enable()
+        with stageProfiler.stage('outer'):
+            double(pd.DataFrame({'a': range(3)}))
+
+        with open(stageProfiler.writeJson(os.path.join(self.tmp, 'stages.json'))) as f:
+            self.assertEqual([r['name'] for r in json.load(f)['stages']], ['double', 'outer'])
+        with open(stageProfiler.writeChromeTrace(os.path.join(self.tmp, 'trace.json'))) as f:
+            events = json.load(f)['traceEvents']
+        self.assertEqual([(e['name'], e['ph']) for e in events], [('double', 'X'), ('outer', 'X')])
+        self.assertEqual(events[0]['args']['rowsOut'], 6)
+        self.assertLessEqual(events[1]['ts'], events[0]['ts'])
+        self.assertGreaterEqual(events[1]['ts'] + events[1]['dur'], events[0]['ts'] + events[0]['dur'])
+
+    # test that only the chosen stage runs under cProfile, with every call in one profile
+    def test_profileStage(self):
+        stageProfiler.enable(profile_stage = 'double', profile_dir = self.tmp)
+        allocate(1)
+        for i in range(3):
+            double(pd.DataFrame({'a': range(3)}))
+
+        self.assertEqual(os.listdir(self.tmp), ['double.prof'])
+        self.assertEqual(stageProfiler.records[-1]['profile'], os.path.join(self.tmp, 'double.prof'))
+        calls = {function[2]: stats[1] for function, stats in pstats.Stats(os.path.join(self.tmp, 'double.prof')).stats.items()}
+        self.assertEqual(calls['double'], 3)
+        self.assertNotIn('allocate', calls)
+
+    @unittest.skipIf(stageProfiler.Pyinstrument is not None, "pyinstrument is installed")
+    def test_pyinstrumentMissing(self):
+        with self.assertRaises(ImportError):
+            stageProfiler.enable(profile_stage = 'double', profiler = 'pyinstrument')
+
+    # test that the cleaning and aggregation stages of proj1.main are recorded
+    def test_pipeline(self):
+        import proj1
+        stageProfiler.enable()
+        atlantic_df, atlantic_df_aggr = proj1.main('pacific.csv', use_cache = False)
+        rows = {r['name']: (r['rowsIn'], r['rowsOut']) for r in stageProfiler.records}
+
+        self.assertGreater(rows['readTracks'][1], len(atlantic_df))
+        for name in ['condenseData', 'createAdditionalColumns', 'normalizeDtypes', 'sortTracks']:
+            self.assertEqual(rows[name][1], len(atlantic_df))
+        self.assertEqual(rows['aggregateStorms'], (len(atlantic_df), len(atlantic_df_aggr)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import numpy as np
+import pandas as pd
+import TrackCache as trackCache
+import StormRules as stormRules
+from TrackKernel import EARTH_RADIUS_KM, stormOffsets, gridBrackets, greatCircleInterpolate, linearInterpolate
+
+# positions sampled along every track, evenly spaced in time from its first to its last fix
+FEATURE_POINTS = 16
+# how much a difference of one knot of wind, or of a full reversal of heading, weighs against
+# one kilometer between positions
+WIND_KM = 10.0
+HEADING_KM = 250.0
+# queries per matrix product in allAnalogs, so the distance block stays at a few tens of MB
+BATCH_QUERIES = 1024
+
+
+def trackFeatures(tracks, points = FEATURE_POINTS, wind_km = WIND_KM, heading_km = HEADING_KM):
+    # fixed-length feature vector of every storm of a cleaned track frame, all storms in one pass:
+    # `points` positions as earth-centered coordinates in km (so distances do not break at the dateline
+    # or the poles), the maximum wind at each of them, and the heading between them as a unit vector
+    # returns (ids, names, float32 matrix with one row per storm, sorted by ID)
+    tracks = tracks.sort_values(by = ['ID', 'Datetime'], kind = 'mergesort')
+    offsets = stormOffsets(tracks['ID'].to_numpy())
+    starts, ends = offsets[:-1], offsets[1:] - 1
+    datetime = tracks['Datetime'].to_numpy(dtype = 'datetime64[ns]')
+    storms = len(starts)
+
+    # sample times: exact nanoseconds from the first fix, so none falls outside the storm
+    first = datetime[starts].astype(np.int64)
+    span = datetime[ends].astype(np.int64) - first
+    sampleTimes = (first[:, None] + np.round(span[:, None] * np.linspace(0, 1, points)).astype(np.int64)).ravel()
+    sampleOffsets = np.arange(storms + 1) * points
+    before, after, fraction = gridBrackets(datetime, offsets, sampleTimes.astype('datetime64[ns]'), sampleOffsets)
+
+    latitude, longitude = greatCircleInterpolate(tracks['Latitude'].to_numpy(dtype = float),
+                                                 tracks['Longitude'].to_numpy(dtype = float), before, after, fraction)
+    latitude, longitude = np.radians(latitude).reshape(storms, points), np.radians(longitude).reshape(storms, points)
+    position = np.stack([np.cos(latitude) * np.cos(longitude), np.cos(latitude) * np.sin(longitude), np.sin(latitude)], axis = 2)
+
+    # missing winds take the mean wind of their storm, or 0 for storms without any
+    wind = linearInterpolate(stormRules.floatValues(tracks['Maximum Wind']), before, after, fraction).reshape(storms, points)
+    known = ~np.isnan(wind)
+    meanWind = np.divide(np.where(known, wind, 0).sum(axis = 1), known.sum(axis = 1),
+                         out = np.zeros(storms), where = known.any(axis = 1))
+    wind = np.where(known, wind, meanWind[:, None])
+
+    # heading of every move as (east, north) components of unit length, (0, 0) where the storm stands still
+    move = position[:, 1:] - position[:, :-1]
+    east = (-np.sin(longitude[:, :-1]) * move[..., 0] + np.cos(longitude[:, :-1]) * move[..., 1])
+    north = (-np.sin(latitude[:, :-1]) * (np.cos(longitude[:, :-1]) * move[..., 0] + np.sin(longitude[:, :-1]) * move[..., 1])
+             + np.cos(latitude[:, :-1]) * move[..., 2])
+    length = np.hypot(east, north)
+    heading = np.zeros(east.shape + (2,))
+    np.divide(np.stack([east, north], axis = 2), length[..., None], out = heading, where = length[..., None] > 0)
+
+    features = np.concatenate([(position * EARTH_RADIUS_KM).reshape(storms, -1),
+                               wind * wind_km,
+                               (heading * heading_km).reshape(storms, -1)], axis = 1).astype(np.float32)
+    ids = tracks['ID'].astype(str).to_numpy()[starts]
+    names = tracks['Name'].astype(str).str.strip().to_numpy()[starts]
+    return ids, names, features
+
+
+class AnalogIndex:
+    # nearest-neighbor search over the trackFeatures vectors of every storm of a track frame (any number of
+    # basins): distances to all storms come from one matrix product, |a - b|^2 = |a|^2 + |b|^2 - 2 a.b,
+    # for one query storm or a batch of them
+
+    def __init__(self, tracks, points = FEATURE_POINTS, wind_km = WIND_KM, heading_km = HEADING_KM):
+        self.settings = {'points': points, 'wind_km': wind_km, 'heading_km': heading_km}
+        self.ids, self.names, self.features = trackFeatures(tracks, **self.settings)
+        # squared norms and distances in float64: in float32, |a|^2 + |b|^2 - 2 a.b of two near-identical tracks
+        # cancels all the digits of the result and can come out negative
+        self.matrix = self.features.astype(np.float64)
+        self.norms = np.einsum('ij,ij->i', self.matrix, self.matrix)
+        self.rows = pd.Index(self.ids)
+
+    def nearest(self, vectors, k = 10, exclude = None):
+        # rows and distances of the k storms nearest to every vector of a (queries x features) batch,
+        # nearest first; exclude holds one row per query to leave out (the query storm itself), or -1
+        vectors = np.atleast_2d(np.asarray(vectors, dtype = np.float64))
+        squared = self.norms[None, :] + np.einsum('ij,ij->i', vectors, vectors)[:, None] - 2 * vectors @ self.matrix.T
+        # rounding can still leave a hair below 0 for a duplicate track; rank those as distance 0
+        np.maximum(squared, 0, out = squared)
+        if exclude is not None:
+            exclude = np.asarray(exclude)
+            squared[np.flatnonzero(exclude >= 0), exclude[exclude >= 0]] = np.inf
+        k = max(min(k, len(self.ids) - (exclude is not None)), 0)
+        # the k smallest of every row, then sorted among themselves
+        if 0 < k < len(self.ids):
+            rows = np.argpartition(squared, k - 1, axis = 1)[:, :k]
+        else:
+            rows = np.tile(np.arange(len(self.ids)), (len(vectors), 1))[:, :k]
+        order = np.argsort(np.take_along_axis(squared, rows, axis = 1), axis = 1, kind = 'stable')
+        rows = np.take_along_axis(rows, order, axis = 1)
+        return rows, np.sqrt(np.take_along_axis(squared, rows, axis = 1))
+
+    def matches(self, rows, distances):
+        return pd.DataFrame({'ID': self.ids[rows], 'Name': self.names[rows], 'distance': distances})
+
+    def analogs(self, storm_id, k = 10):
+        # the k storms whose tracks are most like that of storm_id, nearest first, without the storm itself
+        row = self.rows.get_loc(storm_id)
+        rows, distances = self.nearest(self.features[row], k, exclude = [row])
+        return self.matches(rows[0], distances[0])
+
+    def analogsOfTrack(self, track, k = 10):
+        # the k storms nearest to a track that need not be in the index, e.g. the fixes of a current storm
+        features = trackFeatures(track, **self.settings)[2]
+        rows, distances = self.nearest(features[:1], k)
+        return self.matches(rows[0], distances[0])
+
+    def allAnalogs(self, k = 10, batch = BATCH_QUERIES):
+        # analogs of every storm: (rows, distances), one row of k matches per storm in self.ids order,
+        # `batch` query storms per matrix product
+        blocks = [self.nearest(self.features[start:start + batch], k, exclude = np.arange(start, min(start + batch, len(self.ids))))
+                  for start in range(0, len(self.ids), batch)]
+        return np.concatenate([rows for rows, distances in blocks]), np.concatenate([distances for rows, distances in blocks])
+
+
+if __name__ == '__main__':
+    parser = trackCache.addCacheArguments(argparse.ArgumentParser(description = 'Find the past storms whose tracks look most like a storm.'))
+    parser.add_argument('storm', help = 'storm ID, e.g. EP092015')
+    parser.add_argument('datasets', nargs = '*', default = ['pacific.csv'],
+                        help = 'track files (default: %(default)s)')
+    parser.add_argument('-k', type = int, default = 10, help = 'number of analogs (default: %(default)s)')
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        trackCache.clearCache(args.cache_dir)
+    tracks = pd.concat([trackCache.loadCachedTracks(path, args.cache_dir, args.use_cache) for path in args.datasets])
+    print(AnalogIndex(tracks).analogs(args.storm, args.k).to_string(index = False))
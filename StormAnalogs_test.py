@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import pandas as pd
+import CleanData as cleanData
+from TrackKernel import haversineKm
+from StormAnalogs import *
+from ReferenceLoops import analogsLoop
+
+
+class StormAnalogsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = cleanData.loadTracks("pacific.csv")
+        cls.index = AnalogIndex(cls.data)
+
+    # test the layout of the feature vectors: positions on the earth's surface, winds, unit headings
+    def test_trackFeatures(self):
+        ids, names, features = trackFeatures(self.data, points = 8)
+        self.assertEqual(features.shape, (self.data['ID'].nunique(), 8 * 3 + 8 + 7 * 2))
+        self.assertEqual(features.dtype, np.float32)
+        self.assertEqual(list(ids), sorted(self.data['ID'].astype(str).unique()))
+
+        storm = self.data[self.data['ID'] == ids[0]]
+        position = features[0, :24].reshape(8, 3)
+        np.testing.assert_allclose(np.linalg.norm(position, axis = 1), EARTH_RADIUS_KM, rtol = 1e-5)
+        # the first and last samples are the first and last fixes
+        latitude = np.degrees(np.arcsin(position[[0, -1], 2] / EARTH_RADIUS_KM))
+        np.testing.assert_allclose(latitude, storm['Latitude'].astype(float).iloc[[0, -1]], atol = 1e-3)
+        wind = storm['Maximum Wind'].astype(float).iloc[[0, -1]]
+        np.testing.assert_allclose(features[0, [24, 31]] / WIND_KM, wind.fillna(wind.mean()), rtol = 1e-5)
+        heading = features[:, 32:].reshape(len(ids), 7, 2) / HEADING_KM
+        self.assertTrue(np.all(np.isclose(np.linalg.norm(heading, axis = 2), 1, atol = 1e-4) | (np.linalg.norm(heading, axis = 2) == 0)))
+
+    # test that a storm's nearest analog is a slightly moved copy of it, also across the dateline
+    def test_movedCopy(self):
+        storm = self.data[self.data['ID'] == 'EP092015']
+        copy = storm.assign(ID = 'XX092015', Longitude = storm['Longitude'] + 0.2)
+        index = AnalogIndex(pd.concat([self.data, copy]))
+        matches = index.analogs('EP092015', 3)
+        self.assertEqual(matches['ID'].iloc[0], 'XX092015')
+        self.assertNotIn('EP092015', matches['ID'].tolist())
+
+        # a track heading east across the dateline, 22 km from a copy 0.2 degrees north of it
+        times = pd.date_range('2000-01-01', periods = 3, freq = '6h')
+        crossing = pd.DataFrame({'ID': 'CP011999', 'Name': 'A', 'Datetime': times, 'Latitude': 10.0,
+                                 'Longitude': [179.5, 179.9, -179.7], 'Maximum Wind': 50})
+        moved = crossing.assign(ID = 'CP021999', Latitude = 10.2)
+        index = AnalogIndex(pd.concat([self.data, crossing, moved]))
+        match = index.analogs('CP011999', 1).iloc[0]
+        self.assertEqual(match['ID'], 'CP021999')
+        self.assertAlmostEqual(match['distance'] / np.sqrt(FEATURE_POINTS), haversineKm(10.0, 179.5, 10.2, 179.5), delta = 0.5)
+
+    # test that an exact duplicate is ranked first at distance 0, not at a negative squared distance
+    def test_duplicate(self):
+        storm = self.data[self.data['ID'] == 'EP092015']
+        index = AnalogIndex(pd.concat([self.data, storm.assign(ID = 'XX092015')]))
+        matches = index.analogs('EP092015', 3)
+        self.assertEqual(matches['ID'].iloc[0], 'XX092015')
+        self.assertEqual(matches['distance'].iloc[0], 0)
+        self.assertTrue((index.allAnalogs(3)[1] >= 0).all())
+
+    # test that the matrix kernel ranks storms as a pairwise loop does
+    def test_pairwiseLoop(self):
+        for storm_id in [self.index.ids[0], 'EP092015', self.index.ids[-1]]:
+            matches = self.index.analogs(storm_id, 10)
+            self.assertEqual(matches['ID'].tolist(), analogsLoop(self.index.ids, self.index.features, storm_id, 10))
+            self.assertTrue(matches['distance'].is_monotonic_increasing)
+
+    # test that the batch of all storms gives the single-storm answers, and that an outside track finds itself
+    def test_batches(self):
+        rows, distances = self.index.allAnalogs(5, batch = 300)
+        self.assertEqual(rows.shape, (len(self.index.ids), 5))
+        for row in [0, 100, len(self.index.ids) - 1]:
+            matches = self.index.analogs(self.index.ids[row], 5)
+            self.assertEqual(list(self.index.ids[rows[row]]), matches['ID'].tolist())
+            np.testing.assert_allclose(distances[row], matches['distance'], rtol = 1e-4)
+
+        matches = self.index.analogsOfTrack(self.data[self.data['ID'] == 'EP092015'], 2)
+        self.assertEqual(matches['ID'].iloc[0], 'EP092015')
+        self.assertLess(matches['distance'].iloc[0], 1)
+        self.assertEqual(len(self.index.analogs('EP092015', len(self.index.ids) + 5)), len(self.index.ids) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
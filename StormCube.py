@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+import FrameMemo as frameMemo
+
+# cells of the cube: storms per basin, year of formation and maximum category
+CUBE_KEYS = ['basin', 'year', 'maxCategory']
+# duration histogram of every cell: storms lasting [0, 1) days, [1, 2) days, ..., and DURATION_DAYS days or more
+DURATION_DAYS = 14
+HISTOGRAM_COLUMNS = ['durationDays' + str(day) for day in range(DURATION_DAYS + 1)]
+# measures of every cell; all are sums, so cells merge, and storms are counted out, by adding and subtracting
+# durations are summed in whole minutes so that the sums stay exact integers through any update
+CUBE_MEASURES = ['storms', 'durationMinutes', 'durationSquares'] + HISTOGRAM_COLUMNS
+
+# buildCube results by id() of the aggregate table (FrameMemo.memoized)
+cubeCache = {}
+
+
+def cubePath(aggr_path):
+    # the cube is stored next to the aggregate table it summarizes
+    return aggr_path + '.cube'
+
+def buildCube(aggr):
+    # the cube of an aggregate table (AggregateData.aggregateStorms), in one groupby: one row per
+    # non-empty cell, sorted by the keys, with the CUBE_MEASURES of its storms
+    minutes = np.round(aggr['duration'].to_numpy(dtype = float) * 60).astype(np.int64)
+    days = np.minimum(minutes // (24 * 60), DURATION_DAYS)
+    cells = pd.DataFrame({'basin': aggr['ID'].astype(str).str[:2].to_numpy(),
+                          'year': aggr['initialDate'].dt.year.to_numpy(dtype = np.int16),
+                          'maxCategory': aggr['maxCategory'].to_numpy(dtype = np.int8),
+                          'storms': np.ones(len(aggr), dtype = np.int64),
+                          'durationMinutes': minutes,
+                          'durationSquares': minutes * minutes})
+    histogram = np.zeros((len(aggr), DURATION_DAYS + 1), dtype = np.int64)
+    histogram[np.arange(len(aggr)), days] = 1
+    cells[HISTOGRAM_COLUMNS] = histogram
+    return cells.groupby(CUBE_KEYS, sort = True)[CUBE_MEASURES].sum().reset_index()
+
+def mergeCubes(cube, added = None, removed = None):
+    # cube with the storms of the `added` cube counted in and those of the `removed` cube counted out;
+    # cells left without storms are dropped
+    parts = [cube]
+    if added is not None:
+        parts.append(added)
+    if removed is not None:
+        parts.append(removed.assign(**{measure: -removed[measure] for measure in CUBE_MEASURES}))
+    merged = pd.concat(parts, ignore_index = True).groupby(CUBE_KEYS, sort = True)[CUBE_MEASURES].sum().reset_index()
+    return merged[merged['storms'] != 0].reset_index(drop = True).astype(cube.dtypes.to_dict())
+
+def cubeTotals(cube, by):
+    # storms per group of cells, e.g. by = ['maxCategory'] or ['year', 'maxCategory']
+    return cube.groupby(by, sort = True)['storms'].sum()
+
+def summarizeCube(cube, by = ('basin', 'year', 'maxCategory')):
+    # storms and duration mean, standard deviation and median (hours) per group of cells
+    # mean and standard deviation are exact; the median is estimated from the summed histogram, with the
+    # storms of a day spread evenly over it (and at DURATION_DAYS days in the last bin), so it is within
+    # a day of the true median for groups without storms of DURATION_DAYS days or more
+    sums = cube.groupby(list(by), sort = True)[CUBE_MEASURES].sum()
+    storms = sums['storms'].to_numpy()
+    minutes = sums['durationMinutes'].to_numpy(dtype = float)
+    summary = pd.DataFrame({'storms': storms, 'durationMean': minutes / storms / 60}, index = sums.index)
+    variance = (sums['durationSquares'].to_numpy(dtype = float) - minutes * minutes / storms) / np.maximum(storms - 1, 1)
+    summary['durationStd'] = np.where(storms > 1, np.sqrt(np.maximum(variance, 0)) / 60, np.nan)
+
+    histogram = sums[HISTOGRAM_COLUMNS].to_numpy()
+    ends = np.cumsum(histogram, axis = 1)
+    groups = np.arange(len(storms))
+
+    def durationAt(rank):
+        # estimated duration (hours) of the storm at 0-based `rank` of every group, shortest first
+        day = np.argmax(ends > rank[:, None], axis = 1)
+        share = (rank - (ends - histogram)[groups, day] + 0.5) / np.maximum(histogram[groups, day], 1)
+        return (day + np.where(day < DURATION_DAYS, share, 0)) * 24
+
+    summary['durationMedian'] = (durationAt((storms - 1) // 2) + durationAt(storms // 2)) / 2
+    return summary
+
+def cachedCube(aggr):
+    # buildCube(aggr), computed once per table, for the figures that all read the same table
+    return frameMemo.memoized(cubeCache, aggr, ['ID', 'initialDate', 'maxCategory', 'duration'], buildCube)
+
+def writeCube(cube, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+    cube.to_parquet(path + '.tmp', index = False)
+    os.replace(path + '.tmp', path)
+
+def readCube(path):
+    return pd.read_parquet(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Print the storm summary cube of a persisted aggregate table.')
+    parser.add_argument('aggregates', help = 'parquet file written by IncrementalAggregate.py')
+    parser.add_argument('--by', nargs = '+', default = ['maxCategory'], choices = CUBE_KEYS)
+    args = parser.parse_args()
+
+    cube = readCube(cubePath(args.aggregates)) if os.path.exists(cubePath(args.aggregates)) \
+        else buildCube(pd.read_parquet(args.aggregates))
+    print(summarizeCube(cube, args.by).to_string())
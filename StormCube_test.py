@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import CleanData as cleanData
+import AggregateData as aggregateData
+from StormCube import *
+
+
+class StormCubeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.aggr = aggregateData.aggregateStorms(cleanData.loadTracks("pacific.csv"))
+
+    # test that the cube counts every storm once, in the cell of its basin, year and category
+    def test_buildCube(self):
+        cube = buildCube(self.aggr)
+
+        self.assertEqual(cube.columns.tolist(), CUBE_KEYS + CUBE_MEASURES)
+        self.assertEqual(cube['storms'].sum(), len(self.aggr))
+        self.assertFalse(cube.duplicated(CUBE_KEYS).any())
+        np.testing.assert_array_equal(cube[HISTOGRAM_COLUMNS].sum(axis = 1), cube['storms'])
+        self.assertLess(len(cube), len(self.aggr) / 3)
+        expected = self.aggr.groupby('maxCategory')['ID'].count()
+        self.assertEqual(cubeTotals(cube, ['maxCategory']).tolist(), expected.tolist())
+
+    # test that the summaries read from the cube match those of the aggregate table, the medians
+    # to within a day
+    def test_summarizeCube(self):
+        cube = buildCube(self.aggr)
+        table = self.aggr.assign(year = self.aggr['initialDate'].dt.year, basin = self.aggr['ID'].str[:2])
+        for by in [['maxCategory'], ['year', 'maxCategory'], ['basin']]:
+            summary = summarizeCube(cube, by)
+            expected = table.groupby(by)['duration'].agg(['count', 'mean', 'std', 'median'])
+            self.assertEqual(summary['storms'].tolist(), expected['count'].tolist())
+            np.testing.assert_allclose(summary['durationMean'], expected['mean'])
+            np.testing.assert_allclose(summary['durationStd'], expected['std'], rtol = 1e-9)
+            short = (table.groupby(by)['duration'].max() < DURATION_DAYS * 24).to_numpy()
+            np.testing.assert_allclose(summary['durationMedian'][short], expected['median'][short], atol = 24)
+
+    # test that counting storms in and out of a cube gives the cube of the resulting table
+    def test_mergeCubes(self):
+        first, rest = self.aggr.iloc[:100], self.aggr.iloc[100:]
+        merged = mergeCubes(buildCube(rest), added = buildCube(first))
+        pd.testing.assert_frame_equal(merged, buildCube(self.aggr))
+        pd.testing.assert_frame_equal(mergeCubes(merged, removed = buildCube(first)), buildCube(rest))
+
+    # test that the cube is built once per table and rebuilt once the table changes
+    def test_cachedCube(self):
+        aggr = self.aggr.copy()
+        cube = cachedCube(aggr)
+        self.assertIs(cachedCube(aggr), cube)
+        aggr['maxCategory'] = 0
+        self.assertEqual(cubeTotals(cachedCube(aggr), ['maxCategory']).tolist(), [len(aggr)])
+
+    # test that a persisted cube reads back unchanged
+    def test_writeCube(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            cube = buildCube(self.aggr)
+            path = cubePath(os.path.join(tmp, 'aggr.parquet'))
+            writeCube(cube, path)
+            pd.testing.assert_frame_equal(readCube(path), cube)
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
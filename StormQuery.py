@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import functools
+import numpy as np
+import pandas as pd
+
+# sort key given to missing values, so they come last in either direction like sort_values(na_position = 'last')
+MISSING_KEY = np.iinfo(np.int64).max
+
+
+class StormQuery:
+    # top-n queries over the storm aggregate table (AggregateData.aggregateStorms)
+    # every ordering column gets a stable sorted order the first time it is used, which later queries
+    # reuse: a filtered top-n is then a single pass over that order instead of a sort of the table
+    # results are kept in an LRU cache; call update() with the new table whenever it changes
+
+    def __init__(self, aggr, cache_size = 256):
+        self.cache_size = cache_size
+        self.update(aggr)
+
+    def update(self, aggr):
+        # replace the table, dropping the sorted orders and the cached results
+        self.aggr = aggr.reset_index(drop = True)
+        self.orders = {}
+        self.keys = {}
+        self.year = self.aggr['initialDate'].dt.year.to_numpy(dtype = float)
+        self.basin = self.aggr['ID'].astype(str).str[:2].to_numpy()
+        self.cachedTop = functools.lru_cache(maxsize = self.cache_size)(self.computeTop)
+
+    def sortKey(self, column, ascending):
+        # integer or float key that sorts `column` ascending, with missing values last
+        if (column, ascending) in self.keys:
+            return self.keys[column, ascending]
+        series = self.aggr[column]
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            key = series.to_numpy(dtype = float, na_value = np.nan)
+            key = key if ascending else -key
+        else:
+            if pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_timedelta64_dtype(series):
+                key = series.to_numpy().view(np.int64).copy()
+            elif pd.api.types.is_bool_dtype(series):
+                key = series.to_numpy(dtype = np.int64)
+            else:
+                key = pd.factorize(series, sort = True)[0].astype(np.int64)
+            missing = series.isna().to_numpy()
+            key = key if ascending else -key
+            key[missing] = MISSING_KEY
+        self.keys[column, ascending] = key
+        return key
+
+    def sortedOrder(self, column, ascending):
+        # row positions of the table sorted by one column, ties in table order
+        if (column, ascending) not in self.orders:
+            self.orders[column, ascending] = np.argsort(self.sortKey(column, ascending), kind = 'stable')
+        return self.orders[column, ascending]
+
+    def filterMask(self, years, basin, landfall, category):
+        # rows matching every given predicate, or None when there are none
+        mask = np.ones(len(self.aggr), dtype = bool)
+        if years is not None:
+            mask &= (self.year >= years[0]) & (self.year <= years[1])
+        if basin is not None:
+            mask &= np.isin(self.basin, [basin] if isinstance(basin, str) else list(basin))
+        if landfall is not None:
+            mask &= self.aggr['landfallBool'].to_numpy(dtype = bool) == landfall
+        if category is not None:
+            low, high = (category, category) if np.isscalar(category) else category
+            maxCategory = self.aggr['maxCategory'].to_numpy(dtype = float)
+            mask &= (maxCategory >= low) & (maxCategory <= high)
+        return mask
+
+    def computeTop(self, order_by, ascending, n, columns, years, basin, landfall, category):
+        order = self.sortedOrder(order_by[0], ascending[0])
+        mask = self.filterMask(years, basin, landfall, category)
+        candidates = order[mask[order]]
+
+        if len(order_by) > 1 and len(candidates) > n:
+            # only the rows tied with the n-th row on the first column can still move, so sort
+            # those on all the columns; candidates are already in order of the first column
+            primary = self.sortKey(order_by[0], ascending[0])[candidates]
+            candidates = candidates[:np.searchsorted(primary, primary[n - 1], side = 'right')]
+        if len(order_by) > 1:
+            keys = [self.sortKey(column, up)[candidates] for column, up in zip(order_by, ascending)]
+            candidates = candidates[np.lexsort(keys[::-1])]
+
+        return self.aggr.iloc[candidates[:n]][list(columns)]
+
+    def top(self, order_by, n = 10, ascending = False, columns = None,
+            years = None, basin = None, landfall = None, category = None):
+        # first n storms ordered by one or more columns, like sort_values(order_by, ascending).head(n)
+        # on the rows that pass the filters:
+        # years = (first, last) year the storm started, basin = ID prefix(es) such as 'EP' or ['EP', 'CP'],
+        # landfall = bool, category = maximum category or (lowest, highest)
+        order_by = (order_by,) if isinstance(order_by, str) else tuple(order_by)
+        ascending = (ascending,) * len(order_by) if isinstance(ascending, bool) else tuple(ascending)
+        columns = tuple(columns) if columns is not None else \
+            ('ID', 'Name') + tuple(column for column in order_by if column not in ('ID', 'Name'))
+        years = tuple(years) if years is not None else None
+        basin = basin if basin is None or isinstance(basin, str) else tuple(basin)
+        category = category if category is None or np.isscalar(category) else tuple(category)
+        return self.cachedTop(order_by, ascending, n, columns, years, basin, landfall, category).copy()
+
+    def nlargest(self, n, order_by, **filters):
+        return self.top(order_by, n, False, **filters)
+
+    def nsmallest(self, n, order_by, **filters):
+        return self.top(order_by, n, True, **filters)
+
+    def cacheInfo(self):
+        return self.cachedTop.cache_info()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import pandas as pd
+import CleanData as cleanData
+from AggregateData import aggregateStorms
+from StormQuery import *
+
+
+class StormQueryTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.aggr = aggregateStorms(cleanData.loadTracks("pacific.csv"))
+
+    def setUp(self):
+        self.engine = StormQuery(self.aggr)
+
+    def sortReference(self, order_by, n, ascending, columns, rows = None):
+        rows = self.aggr if rows is None else self.aggr[rows]
+        return rows.sort_values(by = order_by, ascending = ascending, kind = 'mergesort', na_position = 'last').head(n)[columns]
+
+    # test that single and multi-column orderings match a full stable sort, ties and missing values included
+    def test_topMatchesSort(self):
+        queries = [(['windMax'], False), (['pressureMin'], True), (['landfallDatetime'], True),
+                   (['duration'], False), (['Name'], True), (['landfallTimeDelta'], False),
+                   (['maxCategory', 'pressureMin'], [False, True]),
+                   (['windMax', 'initialDate'], [False, False]),
+                   (['landfallBool', 'Name', 'ID'], [False, True, False])]
+        for order_by, ascending in queries:
+            for n in [1, 10, 500, 5000]:
+                columns = ['ID', 'Name'] + [column for column in order_by if column not in ('ID', 'Name')]
+                expected = self.sortReference(order_by, n, ascending, columns)
+                pd.testing.assert_frame_equal(self.engine.top(order_by, n, ascending), expected)
+
+    # test that the predicates select the same rows as boolean masks on the table
+    def test_filters(self):
+        year = self.aggr['initialDate'].dt.year
+        rows = (year >= 1990) & (year <= 2005) & self.aggr['ID'].str.startswith('EP') & \
+               ~self.aggr['landfallBool'] & self.aggr['maxCategory'].between(3, 5)
+        expected = self.sortReference(['windMax', 'pressureMin'], 15, [False, True], ['ID', 'Name', 'windMax', 'pressureMin'], rows)
+        found = self.engine.top(['windMax', 'pressureMin'], 15, [False, True],
+                                years = (1990, 2005), basin = 'EP', landfall = False, category = (3, 5))
+        pd.testing.assert_frame_equal(found, expected)
+
+        found = self.engine.nsmallest(5, 'pressureMin', basin = ['CP'], landfall = True, category = 4, columns = ['ID'])
+        rows = self.aggr['ID'].str.startswith('CP') & self.aggr['landfallBool'] & (self.aggr['maxCategory'] == 4)
+        pd.testing.assert_frame_equal(found, self.sortReference(['pressureMin'], 5, True, ['ID'], rows))
+        self.assertEqual(len(self.engine.nlargest(5, 'windMax', years = (1800, 1900))), 0)
+
+    # test that repeated queries are served from the cache until the table is updated
+    def test_cache(self):
+        first = self.engine.nlargest(10, 'windMax')
+        first.loc[:, 'windMax'] = 0
+        second = self.engine.nlargest(10, 'windMax')
+        self.assertEqual(self.engine.cacheInfo().hits, 1)
+        self.assertTrue((second['windMax'] > 0).all())
+
+        changed = self.aggr.copy()
+        changed.loc[changed['ID'] == second['ID'].iloc[-1], 'windMax'] = 500
+        self.engine.update(changed)
+        third = self.engine.nlargest(10, 'windMax')
+        self.assertEqual(self.engine.cacheInfo().hits, 0)
+        self.assertEqual(third['ID'].iloc[0], second['ID'].iloc[-1])
+
+    # test that hurricaneQuery returns the top n rows of the full sort
+    def test_hurricaneQuery(self):
+        found = cleanData.hurricaneQuery(self.aggr, 'pressureMin', True, 10)
+        pd.testing.assert_frame_equal(found, self.sortReference(['pressureMin'], 10, True, ['ID', 'Name', 'pressureMin']))
+        found = cleanData.hurricaneQuery(self.aggr, 'windMax', False, 10)
+        pd.testing.assert_frame_equal(found, self.sortReference(['windMax'], 10, False, ['ID', 'Name', 'windMax']))
+        # past the storms with a value, those without one follow
+        n = self.aggr['pressureMin'].notna().sum() + 5
+        found = cleanData.hurricaneQuery(self.aggr, 'pressureMin', True, n)
+        self.assertEqual(len(found), n)
+        self.assertEqual(found['pressureMin'].isna().sum(), 5)
+        pd.testing.assert_frame_equal(found, self.sortReference(['pressureMin'], n, True, ['ID', 'Name', 'pressureMin']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+# Saffir-Simpson hurricane wind scale as (category, wind threshold in knots): a hurricane fix is in the
+# highest category whose threshold its maximum wind exceeds, and in category 0 below the first one
+# these are the bounds of the original if/elif ladder, so category 1 starts above 62 kt
+SAFFIR_SIMPSON = [(1, 62), (2, 82), (3, 95), (4, 112), (5, 136)]
+CATEGORIES = [0] + [category for category, threshold in SAFFIR_SIMPSON]
+CATEGORY_LABELS = ['Category ' + str(category) for category in CATEGORIES]
+# CSS color names of the categories, shared by the matplotlib figures and the web maps
+CATEGORY_COLORS = ['midnightblue', 'indigo', 'purple', 'maroon', 'orangered', 'orange']
+# only fixes with this status get a category above 0
+HURRICANE_STATUS = 'HU'
+
+# value standing for a missing reading, per numeric column of the best-track files
+MISSING = -999
+SENTINELS = {column: MISSING for column in ['Maximum Wind', 'Minimum Pressure'] + \
+             [kind + ' Wind ' + quadrant for kind in ['Low', 'Moderate', 'High'] for quadrant in ['NE', 'SE', 'SW', 'NW']]}
+
+thresholds = np.array([threshold for category, threshold in SAFFIR_SIMPSON], dtype = float)
+categoryCodes = np.array(CATEGORIES, dtype = np.int8)
+
+
+def floatValues(values):
+    # float array of a column or array, missing values (NaN or <NA>) as NaN
+    if isinstance(values, (pd.Series, pd.api.extensions.ExtensionArray)):
+        return values.to_numpy(dtype = float, na_value = np.nan)
+    return np.asarray(values, dtype = float)
+
+def categoryOf(wind, status = None):
+    # int8 category of every fix from its maximum wind; 0 where the wind is missing, and where `status`
+    # is given and is not HURRICANE_STATUS
+    # searchsorted on the left counts the thresholds strictly below the wind, so no ladder is needed
+    wind = floatValues(wind)
+    category = categoryCodes[np.searchsorted(thresholds, wind, side = 'left')]
+    rated = ~np.isnan(wind)
+    if status is not None:
+        rated &= np.asarray(status == HURRICANE_STATUS, dtype = bool)
+    return np.where(rated, category, 0).astype(np.int8)
+
+def replaceSentinels(data, sentinels = SENTINELS):
+    # set the sentinel of every column in `sentinels` to <NA>, in place; only those columns are touched,
+    # and each becomes the nullable version of its numeric dtype (int16 -> Int16, float64 -> Float64)
+    for column, sentinel in sentinels.items():
+        if column not in data.columns:
+            continue
+        values = data[column]
+        # numpy columns are wrapped with a mask directly, which is much cheaper than pd.array's checks
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'iu':
+            values = values.to_numpy()
+            values = pd.arrays.IntegerArray(values.copy(), values == sentinel)
+        elif isinstance(values.dtype, np.dtype) and values.dtype.kind == 'f':
+            # NaN is missing too, as it is for pd.array
+            values = values.to_numpy()
+            values = pd.arrays.FloatingArray(values.copy(), (values == sentinel) | np.isnan(values))
+        else:
+            # nullable or object columns, through pandas' own conversion
+            values = pd.array(values.to_numpy() if values.dtype == object else values.array, copy = True)
+            values[values == sentinel] = pd.NA
+        data[column] = values
+    return data
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import pandas as pd
+import CleanData as cleanData
+from StormRules import *
+
+
+# the if/elif ladder the category rules replace
+def categoryLadder(wind, status):
+    if status != 'HU':
+        return 0
+    if wind > 136:
+        return 5
+    elif wind > 112:
+        return 4
+    elif wind > 95:
+        return 3
+    elif wind > 82:
+        return 2
+    elif wind > 62:
+        return 1
+    return 0
+
+
+class StormRulesTest(unittest.TestCase):
+
+    # test that the thresholds give the categories of the ladder, on and around every threshold
+    def test_categoryOf(self):
+        wind = np.array([-999, 0, 30] + [threshold + offset for category, threshold in SAFFIR_SIMPSON for offset in [-1, 0, 1]] + [185])
+        status = np.array(['HU', 'TS'] * len(wind))[:len(wind)]
+        for statuses in [np.full(len(wind), 'HU'), status]:
+            expected = [categoryLadder(w, s) for w, s in zip(wind, statuses)]
+            self.assertEqual(categoryOf(wind, statuses).tolist(), expected)
+        self.assertEqual(categoryOf(wind).dtype, np.int8)
+
+    # test that missing winds, as NaN or <NA>, are category 0
+    def test_categoryOfMissing(self):
+        wind = pd.array([150, None, 70], dtype = 'Int16')
+        self.assertEqual(categoryOf(wind).tolist(), [5, 0, 1])
+        self.assertEqual(categoryOf(np.array([np.nan, 140.0]), pd.Series(['HU', 'HU'])).tolist(), [0, 5])
+
+    # test that only the sentinel columns change, to nullable dtypes with <NA> for the sentinel
+    def test_replaceSentinels(self):
+        data = pd.DataFrame({'Maximum Wind': [45.0, -999.0, np.nan],
+                             'Minimum Pressure': np.array([1000, -999, 990], dtype = 'int16'),
+                             'Date': [19500101, -999, 19500102],
+                             'Low Wind NE': pd.array([-999, 30, None], dtype = 'Int64')})
+        date = data['Date']
+        result = replaceSentinels(data)
+
+        self.assertIs(result, data)
+        self.assertEqual(result.dtypes.astype(str).tolist(), ['Float64', 'Int16', 'int64', 'Int64'])
+        self.assertEqual(result['Maximum Wind'].isna().tolist(), [False, True, True])
+        self.assertEqual(result['Minimum Pressure'].isna().tolist(), [False, True, False])
+        self.assertEqual(result['Low Wind NE'].isna().tolist(), [True, False, True])
+        pd.testing.assert_series_equal(result['Date'], date)
+
+    # test that the cleaned tracks have no sentinel left and keep missing readings as <NA>
+    def test_cleanedTracks(self):
+        raw = cleanData.condenseData(cleanData.readData('pacific.csv'))
+        tracks = cleanData.loadTracks('pacific.csv')
+
+        for column in ['Maximum Wind', 'Minimum Pressure']:
+            self.assertFalse((tracks[column] == MISSING).any())
+            self.assertEqual(tracks[column].isna().sum(), (raw[column] == MISSING).sum())
+        self.assertLessEqual(set(tracks['Category']), set(CATEGORIES))
+        self.assertEqual(len(CATEGORY_LABELS), len(CATEGORIES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import numpy as np
+import pandas as pd
+
+# header of the HURDAT best-track csv files, as read by CleanData.readData
+COLUMNS = ['ID', 'Name', 'Date', 'Time', 'Event', 'Status', 'Latitude', 'Longitude',
+           'Maximum Wind', 'Minimum Pressure',
+           'Low Wind NE', 'Low Wind SE', 'Low Wind SW', 'Low Wind NW',
+           'Moderate Wind NE', 'Moderate Wind SE', 'Moderate Wind SW', 'Moderate Wind NW',
+           'High Wind NE', 'High Wind SE', 'High Wind SW', 'High Wind NW']
+# latitude and longitude ranges where storms of each basin form
+BASINS = {'AL': ((10.0, 25.0), (-80.0, -20.0)),
+          'EP': ((8.0, 18.0), (-125.0, -95.0)),
+          'CP': ((8.0, 18.0), (-175.0, -140.0))}
+NAMES = ['ADRIAN', 'BEATRIZ', 'CALVIN', 'DORA', 'EUGENE', 'FERNANDA', 'GREG', 'HILARY', 'IRWIN',
+         'JOVA', 'KENNETH', 'LIDIA', 'MAX', 'NORMA', 'OTIS', 'PILAR', 'RAMON', 'SELMA', 'TODD',
+         'VERONICA', 'WILEY', 'XINA', 'YORK', 'ZELDA']
+NAME_WIDTH = 19
+# storm IDs hold a two-digit number and a four-digit year; years stop before pandas' datetime limit,
+# after which the IDs continue with the next two-letter prefix
+LAST_YEAR = 2200
+# storms generated per block; the output only depends on the arguments, not on the memory used
+BLOCK_STORMS = 2000
+
+
+class StormNumbering:
+    # IDs of consecutive storms: a Poisson number of storms per year, numbered from 01 within each year
+    def __init__(self, rng, basin, start_year, storms_per_year):
+        self.rng, self.basin, self.start_year, self.storms_per_year = rng, basin, start_year, storms_per_year
+        self.prefix, self.year, self.number = basin, start_year, 0
+        self.year_storms = self.drawYear()
+
+    def drawYear(self):
+        return int(np.clip(self.rng.poisson(self.storms_per_year), 1, 99))
+
+    def next(self, count):
+        prefixes, years, numbers = [], [], []
+        for i in range(count):
+            if self.number == self.year_storms:
+                self.year, self.number, self.year_storms = self.year + 1, 0, self.drawYear()
+                if self.year > LAST_YEAR:
+                    self.year = self.start_year
+                    self.prefix = chr(65 + (ord(self.prefix[0]) - 65 + (self.prefix[1] == 'Z')) % 26) + \
+                                  chr(65 + (ord(self.prefix[1]) - 64) % 26)
+            self.number += 1
+            prefixes.append(self.prefix)
+            years.append(self.year)
+            numbers.append(self.number)
+        return np.array(prefixes), np.array(years), np.array(numbers)
+
+def segmentCumsum(values, starts, storm):
+    # running sum of values within each storm
+    total = np.cumsum(values)
+    return total - (total[starts] - values[starts])[storm]
+
+def generateBlock(rng, numbering, storms, fixes, basin):
+    # rows of `storms` consecutive storms as a frame with the csv columns
+    prefixes, years, numbers = numbering.next(storms)
+    counts = np.maximum(rng.poisson(fixes, storms), 1)
+    # a few long-lived storms keep heading west, across the dateline for the eastern basins
+    longTrack = rng.random(storms) < 0.05
+    counts[longTrack] *= 4
+    storm = np.repeat(np.arange(storms), counts)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    step = np.arange(len(storm)) - starts[storm]
+    progress = step / np.maximum(counts - 1, 1)[storm]
+
+    # 6-hourly synoptic fixes from a day in June to November
+    first = (years - 1970).astype('datetime64[Y]').astype('datetime64[h]') + \
+        (rng.integers(150, 320, storms) * 24 + rng.integers(0, 4, storms) * 6).astype('timedelta64[h]')
+    when = first[storm] + (6 * step).astype('timedelta64[h]')
+    day = when.astype('datetime64[D]')
+    month = day.astype('datetime64[M]')
+    date = (month.astype('datetime64[Y]').astype(int) + 1970) * 10000 + (month.astype(int) % 12 + 1) * 100 + \
+        (day - month).astype(int) + 1
+    time = (when - day).astype(int) * 100
+
+    # tracks drift west-northwest and recurve to the east late in life, long-lived storms do not recurve
+    (lat_low, lat_high), (lon_low, lon_high) = BASINS.get(basin, BASINS['EP'])
+    latitude = rng.uniform(lat_low, lat_high, storms)[storm] + \
+        segmentCumsum(np.where(longTrack[storm], 0.05, 0.1 + 0.3 * progress) + rng.normal(0, 0.15, len(storm)), starts, storm)
+    longitude = rng.uniform(lon_low, lon_high, storms)[storm] + \
+        segmentCumsum(np.where(longTrack[storm], -0.8, -0.6 + 1.2 * progress**2) + rng.normal(0, 0.2, len(storm)), starts, storm)
+    latitude, longitude = latitude.round(1), longitude.round(1)
+
+    # intensity rises to a peak and decays, pressure follows the wind-pressure relationship
+    peak = np.minimum(30 + rng.gamma(2.0, 22.0, storms), 185)[storm]
+    wind = 25 + (peak - 25) * np.sin(np.pi * progress) ** 1.5 + rng.normal(0, 3, len(storm))
+    wind = np.maximum(np.round(wind / 5) * 5, 10).astype(int)
+    pressure = np.round(1010 - (wind / 6.7) ** (1 / 0.644) + rng.normal(0, 2, len(storm))).astype(int)
+    # about half of the storms have no pressure readings
+    pressure[(rng.random(storms) < 0.5)[storm]] = -999
+
+    status = np.where(wind >= 64, ' HU', np.where(wind >= 34, ' TS', ' TD'))
+    ends = (step == counts[storm] - 1) & (rng.random(storms) < 0.3)[storm]
+    status[ends] = np.where(rng.random(int(ends.sum())) < 0.5, ' EX', ' LO')
+    # blank event field, with a landfall fix for some storms
+    event = np.full(len(storm), '  ', dtype = object)
+    landfall = starts + (rng.random(storms) * counts).astype(int)
+    event[landfall[rng.random(storms) < 0.1]] = ' L'
+
+    # hemisphere suffixes; past the dateline longitudes are written as E, or for some storms as W beyond 180
+    latText = pd.Series(np.abs(latitude)).map('{:.1f}'.format) + np.where(latitude >= 0, 'N', 'S')
+    westBeyond = (rng.random(storms) < 0.3)[storm] & (longitude < -180)
+    east = ((longitude < -180) & ~westBeyond) | (longitude >= 0)
+    lonValue = np.where(longitude < -180, np.where(westBeyond, -longitude, longitude + 360), np.abs(longitude))
+    lonText = pd.Series(lonValue).map('{:.1f}'.format) + np.where(east, 'E', 'W')
+
+    names = np.where((years < 1960) | (rng.random(storms) < 0.05), 'UNNAMED',
+                     np.array(NAMES)[(numbers - 1) % len(NAMES)])
+    frame = pd.DataFrame({'ID': np.char.add(np.char.add(prefixes, np.char.zfill(numbers.astype(str), 2)), years.astype(str))[storm],
+                          'Name': np.char.rjust(names.astype(str), NAME_WIDTH)[storm],
+                          'Date': date, 'Time': time, 'Event': event, 'Status': status,
+                          'Latitude': latText.to_numpy(), 'Longitude': lonText.to_numpy(),
+                          'Maximum Wind': wind, 'Minimum Pressure': pressure})
+
+    # wind radii were only recorded from 2004 on
+    recorded = years[storm] >= 2004
+    for threshold, kind in [(34, 'Low'), (50, 'Moderate'), (64, 'High')]:
+        radius = np.where(wind >= threshold, np.round((wind - threshold + 10) * 1.5 / 5) * 5, 0).astype(int)
+        for quadrant in ['NE', 'SE', 'SW', 'NW']:
+            frame[kind + ' Wind ' + quadrant] = np.where(recorded, radius, -999)
+    return frame
+
+def generateTracks(out_path, storms = 1000, fixes = 25, seed = 0, basin = 'EP', start_year = 1950, storms_per_year = 16):
+    # write a synthetic best-track csv in the format of the HURDAT files: `storms` storms with a Poisson
+    # number of 6-hourly fixes (mean `fixes`), in ID order; the same arguments always give the same file
+    # storms are generated and written BLOCK_STORMS at a time, so memory does not grow with the file
+    rng = np.random.default_rng(seed)
+    numbering = StormNumbering(rng, basin, start_year, storms_per_year)
+    with open(out_path, 'w') as f:
+        f.write(','.join(COLUMNS) + '\n')
+        for first in range(0, storms, BLOCK_STORMS):
+            block = generateBlock(rng, numbering, min(BLOCK_STORMS, storms - first), fixes, basin)
+            block.to_csv(f, header = False, index = False)
+    return out_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Write a synthetic best-track csv file in the HURDAT format.')
+    parser.add_argument('out', help = 'csv file to write')
+    parser.add_argument('--storms', type = int, default = 1000)
+    parser.add_argument('--fixes', type = int, default = 25, help = 'mean fixes per storm (default: %(default)s)')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--basin', default = 'EP', help = 'ID prefix, and formation region for ' + ', '.join(BASINS))
+    parser.add_argument('--start-year', type = int, default = 1950)
+    args = parser.parse_args()
+
+    generateTracks(args.out, args.storms, args.fixes, args.seed, args.basin, args.start_year)
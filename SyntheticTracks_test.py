@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import CleanData as cleanData
+from AggregateData import aggregateStorms
+from SyntheticTracks import *
+
+
+class SyntheticTracksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    # test that the header and field formats are those of the HURDAT files
+    def test_format(self):
+        path = generateTracks(os.path.join(self.tmp, 'synthetic.csv'), storms = 3000, fixes = 20, seed = 1)
+        with open(path) as f, open('pacific.csv') as reference:
+            self.assertEqual(f.readline(), reference.readline())
+        data = cleanData.readData(path)
+
+        self.assertTrue((data.Name.str.len() == NAME_WIDTH).all())
+        self.assertIn('            UNNAMED', set(data.Name))
+        self.assertIn('  ', set(data.Event))
+        self.assertIn(' L', set(data.Event))
+        self.assertTrue(data.Latitude.str.endswith('N').all())
+        self.assertEqual(set(data.Longitude.str[-1]), {'E', 'W'})
+        self.assertTrue((data.Longitude[data.Longitude.str.endswith('W')].str[:-1].astype(float) > 180).any())
+        self.assertTrue((data['Minimum Pressure'] == -999).any())
+        self.assertTrue((data['Low Wind NE'] == -999).any())
+        self.assertTrue((data['Low Wind NE'] >= 0).any())
+
+    # test that the cleaning pipeline reads every storm and every fix back
+    def test_pipeline(self):
+        path = generateTracks(os.path.join(self.tmp, 'synthetic.csv'), storms = 2500, fixes = 10, seed = 2)
+        tracks = cleanData.loadTracks(path)
+        aggr = aggregateStorms(tracks)
+
+        self.assertEqual(len(aggr), 2500)
+        self.assertEqual(len(tracks), len(cleanData.readData(path)))
+        self.assertTrue(tracks.Longitude.between(-180, 180).all())
+        # fixes are 6-hourly, so every storm lasts 6 hours per fix after its first
+        fixes = tracks.groupby('ID', observed = True).size()
+        self.assertTrue((aggr.set_index('ID').duration == 6 * (fixes - 1)).all())
+
+    # test that the output only depends on the arguments
+    def test_seed(self):
+        paths = [generateTracks(os.path.join(self.tmp, name), storms = 50, seed = seed)
+                 for name, seed in [('a.csv', 3), ('b.csv', 3), ('c.csv', 4)]]
+        contents = []
+        for path in paths:
+            with open(path) as f:
+                contents.append(f.read())
+        self.assertEqual(contents[0], contents[1])
+        self.assertNotEqual(contents[0], contents[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
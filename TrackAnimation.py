@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+import json
+import argparse
+import webbrowser
+import numpy as np
+import TrackCache as trackCache
+import StormRules as stormRules
+import TrackResample as trackResample
+from TrackKernel import stormOffsets
+
+# decimal places kept of every coordinate: 2 is about 1 km, well under the 0.1 degree of best-track fixes
+PRECISION = 2
+# how long a track stays on the map after its last position, as an ISO 8601 duration
+DEFAULT_DURATION = 'P7D'
+# a signed value takes at most 7 chunks of 5 bits in an encoded polyline
+MAX_CHUNKS = 7
+
+# browser side of stormTracks: expands the compact tracks into the timestamped GeoJSON that
+# TimestampedGeoJson animates, one LineString per storm with one time per position
+DECODE_JS = """
+function decodeStormTracks(tracks) {
+    var scale = Math.pow(10, tracks.precision), features = [];
+    tracks.storms.forEach(function(storm) {
+        var text = storm[3], index = 0, latitude = 0, longitude = 0, coordinates = [], times = [];
+        while (index < text.length) {
+            var deltas = [];
+            for (var k = 0; k < 2; k++) {
+                var value = 0, shift = 0, chunk;
+                do {
+                    chunk = text.charCodeAt(index++) - 63;
+                    value |= (chunk & 31) << shift;
+                    shift += 5;
+                } while (chunk >= 32);
+                deltas.push(value & 1 ? ~(value >> 1) : value >> 1);
+            }
+            latitude += deltas[0];
+            longitude += deltas[1];
+            coordinates.push([longitude / scale, latitude / scale]);
+            times.push(tracks.origin + (storm[1] + times.length) * tracks.step);
+        }
+        features.push({type: 'Feature',
+                       geometry: coordinates.length > 1 ? {type: 'LineString', coordinates: coordinates}
+                                                        : {type: 'Point', coordinates: coordinates[0]},
+                       properties: {times: times, tooltip: storm[0],
+                                    style: {color: tracks.colors[storm[2]], weight: 2, opacity: 0.8}}});
+    });
+    return {type: 'FeatureCollection', features: features};
+}
+"""
+
+
+def encodePolylines(latitude, longitude, offsets, precision = PRECISION):
+    # one encoded polyline (Google's polyline algorithm format) per storm, for all storms in one pass:
+    # coordinates are quantized to `precision` decimals and every position is stored as its change from the
+    # previous one, zigzag-coded in 5-bit chunks of printable characters
+    # longitude changes are taken the short way round, so tracks crossing the dateline decode past +-180
+    scale = 10**precision
+    quantized = [np.round(np.asarray(c, dtype = float) * scale).astype(np.int64) for c in [latitude, longitude]]
+    offsets = np.asarray(offsets)
+    first = np.zeros(len(quantized[0]), dtype = bool)
+    first[offsets[:-1][np.diff(offsets) > 0]] = True
+    # the first position of a storm is stored whole
+    latitude, longitude = [np.where(first, values, np.diff(values, prepend = 0)) for values in quantized]
+    longitude = np.where(first, longitude, (longitude + 180 * scale) % (360 * scale) - 180 * scale)
+
+    # latitude and longitude changes interleaved, as the format expects
+    values = np.column_stack([latitude, longitude]).ravel()
+    zigzag = np.where(values < 0, ~(values << 1), values << 1)
+    shifts = 5 * np.arange(MAX_CHUNKS)
+    counts = 1 + np.sum((zigzag[:, None] >> shifts[1:]) > 0, axis = 1)
+    chunks = (zigzag[:, None] >> shifts) & 31
+    # every chunk but the last of a value carries the continuation bit
+    chunks |= np.where(np.arange(MAX_CHUNKS) < (counts - 1)[:, None], 32, 0)
+    text = (chunks + 63)[np.arange(MAX_CHUNKS) < counts[:, None]].astype(np.uint8).tobytes().decode('ascii')
+
+    # characters of every position, then of every storm
+    positionChars = np.append(0, np.cumsum(counts[0::2] + counts[1::2]))[offsets]
+    return [text[positionChars[i]:positionChars[i + 1]] for i in range(len(offsets) - 1)]
+
+def decodePolyline(text, precision = PRECISION):
+    # (latitude, longitude) arrays of one encoded polyline, the python twin of DECODE_JS
+    values, value, shift = [], 0, 0
+    for char in text:
+        chunk = ord(char) - 63
+        value |= (chunk & 31) << shift
+        shift += 5
+        if chunk < 32:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value, shift = 0, 0
+    coordinates = np.cumsum(np.array(values, dtype = np.int64).reshape(-1, 2), axis = 0) / 10**precision
+    return coordinates[:, 0], coordinates[:, 1]
+
+def stormTracks(data, step_hours = trackResample.DEFAULT_STEP_HOURS, precision = PRECISION):
+    # compact tracks of every storm for DECODE_JS: storms resampled to a uniform grid
+    # (TrackResample.resampleStorms), so the times of a storm are its first grid step and a count;
+    # each storm is [label, first grid step, highest category, encoded polyline]
+    resampled = trackResample.resampleStorms(data, step_hours)
+    offsets = stormOffsets(resampled['ID'].to_numpy())
+    starts = offsets[:-1]
+    step = int(round(step_hours * 3600)) * 1000
+    milliseconds = resampled['Datetime'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+    origin = int(milliseconds.min()) if len(milliseconds) else 0
+
+    labels = (resampled['ID'].astype(str) + ' ' + resampled['Name'].astype(str).str.strip()).to_numpy()[starts]
+    firstSteps = (milliseconds[starts] - origin) // step
+    category = resampled['Category'].to_numpy()
+    maxCategory = np.maximum.reduceat(category, starts) if len(starts) else category
+    polylines = encodePolylines(resampled['Latitude'], resampled['Longitude'], offsets, precision)
+    return {'origin': origin, 'step': step, 'precision': precision, 'colors': stormRules.CATEGORY_COLORS,
+            'storms': [[label, int(first), int(top), polyline]
+                       for label, first, top, polyline in zip(labels, firstSteps, maxCategory, polylines)]}
+
+def buildAnimatedMap(data, step_hours = trackResample.DEFAULT_STEP_HOURS, duration = DEFAULT_DURATION, precision = PRECISION):
+    # folium map with a time slider over every storm's track, colored by its highest category
+    # the page carries the compact tracks and expands them in the browser, see stormTracks
+    # folium is slow to import, only load it when a map is built
+    import folium
+    from folium import plugins
+
+    map_tracks = folium.Map()
+    if len(data):
+        latitude, longitude = data['Latitude'].astype(float), data['Longitude'].astype(float)
+        map_tracks.fit_bounds([[latitude.min(), longitude.min()], [latitude.max(), longitude.max()]])
+    map_tracks.get_root().header.add_child(folium.Element('<script>' + DECODE_JS + '</script>'))
+    tracks = json.dumps(stormTracks(data, step_hours, precision), separators = (',', ':'))
+    # a string is passed to the page as javascript, so the layer is built from the decoded tracks
+    minutes = int(round(step_hours * 60))
+    period = 'PT' + (str(minutes // 60) + 'H' if minutes % 60 == 0 else str(minutes) + 'M')
+    plugins.TimestampedGeoJson('decodeStormTracks(' + tracks + ')', period = period, duration = duration,
+                               auto_play = False, add_last_point = False, date_options = 'YYYY-MM-DD HH:mm',
+                               time_slider_drag_update = True).add_to(map_tracks)
+    return map_tracks
+
+def mapAnimation(data, map_path, step_hours = trackResample.DEFAULT_STEP_HOURS, duration = DEFAULT_DURATION, open_browser = True):
+    buildAnimatedMap(data, step_hours, duration).save(map_path)
+    if open_browser:
+        webbrowser.open_new_tab(map_path)
+
+
+if __name__ == '__main__':
+    parser = trackCache.addCacheArguments(argparse.ArgumentParser(description = 'Write an animated map of every storm track.'))
+    parser.add_argument('dataset', nargs = '?', default = 'atlantic.csv', help = 'best-track csv file (default: %(default)s)')
+    parser.add_argument('--out', default = 'animation.html', help = 'map file (default: %(default)s)')
+    parser.add_argument('--step-hours', type = trackResample.stepHours, default = trackResample.DEFAULT_STEP_HOURS,
+                        help = 'time step of the slider (default: %(default)s)')
+    parser.add_argument('--duration', default = DEFAULT_DURATION,
+                        help = 'how long tracks stay on the map, ISO 8601 (default: %(default)s)')
+    parser.add_argument('--years', nargs = 2, type = int, metavar = ('FIRST', 'LAST'), help = 'only storms of these seasons')
+    parser.add_argument('--no-browser', dest = 'open_browser', action = 'store_false')
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        trackCache.clearCache(args.cache_dir)
+    tracks = trackCache.loadCachedTracks(args.dataset, args.cache_dir, args.use_cache)
+    if args.years:
+        year = tracks.groupby('ID', observed = True)['Datetime'].transform('min').dt.year
+        tracks = tracks[(year >= args.years[0]) & (year <= args.years[1])]
+    mapAnimation(tracks, args.out, args.step_hours, args.duration, args.open_browser)
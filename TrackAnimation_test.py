@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+import numpy as np
+import CleanData as cleanData
+import TrackResample as trackResample
+from TrackKernel import stormOffsets
+from TrackAnimation import *
+
+
+class TrackAnimationTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = cleanData.loadTracks("pacific.csv")
+
+    # test the example of the polyline format's documentation, and that storms are encoded separately
+    def test_encodePolylines(self):
+        latitude, longitude = [38.5, 40.7, 43.252, 10.0], [-120.2, -120.95, -126.453, -100.0]
+        polylines = encodePolylines(latitude, longitude, [0, 3, 3, 4], precision = 5)
+        self.assertEqual(polylines[:2], ['_p~iF~ps|U_ulLnnqC_mqNvxq`@', ''])
+        # the first position of every storm is stored whole, not as a change from the previous storm
+        self.assertEqual(polylines[2], encodePolylines([10.0], [-100.0], [0, 1], precision = 5)[0])
+        np.testing.assert_allclose(np.column_stack(decodePolyline(polylines[2], precision = 5)), [[10.0, -100.0]])
+
+    # test that decoding gives the quantized positions back, continuing past 180 across the dateline
+    def test_roundTrip(self):
+        latitude = np.array([12.346, 12.4, 12.6, 13.0, -5.0])
+        longitude = np.array([179.5, 179.96, -179.8, -179.0, 60.0])
+        first, second = encodePolylines(latitude, longitude, [0, 4, 5])
+
+        decodedLatitude, decodedLongitude = decodePolyline(first)
+        np.testing.assert_allclose(decodedLatitude, [12.35, 12.4, 12.6, 13.0])
+        np.testing.assert_allclose(decodedLongitude, [179.5, 179.96, 180.2, 181.0])
+        np.testing.assert_allclose(np.column_stack(decodePolyline(second)), [[-5.0, 60.0]])
+
+    # test that the compact tracks hold every resampled position and time of every storm
+    def test_stormTracks(self):
+        tracks = stormTracks(self.data, 6)
+        resampled = trackResample.resampleStorms(self.data, 6)
+        offsets = stormOffsets(resampled['ID'].to_numpy())
+
+        self.assertEqual(len(tracks['storms']), len(offsets) - 1)
+        for i in [0, 500, len(offsets) - 2]:
+            storm = resampled.iloc[offsets[i]:offsets[i + 1]]
+            label, first, category, polyline = tracks['storms'][i]
+            latitude, longitude = decodePolyline(polyline)
+            self.assertEqual(label.split()[0], storm['ID'].iloc[0])
+            self.assertEqual(category, storm['Category'].max())
+            np.testing.assert_allclose(latitude, storm['Latitude'], atol = 0.005 + 1e-9)
+            np.testing.assert_allclose((longitude + 180) % 360 - 180, storm['Longitude'], atol = 0.005 + 1e-9)
+            times = tracks['origin'] + (first + np.arange(len(latitude))) * tracks['step']
+            np.testing.assert_array_equal(times, storm['Datetime'].to_numpy().astype('datetime64[ms]').astype(np.int64))
+
+    # test that the browser decoder gives the same tracks as decodePolyline
+    @unittest.skipIf(shutil.which('node') is None, "node is not installed")
+    def test_decodeJs(self):
+        tracks = stormTracks(self.data[self.data['ID'].astype(str) < 'EP051960'], 3)
+        code = DECODE_JS + "console.log(JSON.stringify(decodeStormTracks(JSON.parse(require('fs').readFileSync(0, 'utf8')))));"
+        features = json.loads(subprocess.run(['node', '-e', code], input = json.dumps(tracks), capture_output = True,
+                                              text = True, check = True).stdout)['features']
+
+        self.assertEqual(len(features), len(tracks['storms']))
+        for feature, (label, first, category, polyline) in zip(features, tracks['storms']):
+            latitude, longitude = decodePolyline(polyline)
+            coordinates = np.array(feature['geometry']['coordinates']).reshape(-1, 2)
+            np.testing.assert_allclose(coordinates, np.column_stack([longitude, latitude]))
+            self.assertEqual(feature['properties']['times'][0], tracks['origin'] + first * tracks['step'])
+            self.assertEqual(feature['properties']['style']['color'], tracks['colors'][category])
+
+    # test that the map page carries the compact tracks and the decoder
+    def test_buildAnimatedMap(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'animation.html')
+            mapAnimation(self.data, path, open_browser = False)
+            with open(path) as f:
+                page = f.read()
+            self.assertIn('function decodeStormTracks', page)
+            self.assertIn(json.dumps(stormTracks(self.data), separators = (',', ':')), page)
+            self.assertEqual(page.count('"type":"Feature"'), 0)
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import os
+import glob
+import hashlib
+import tempfile
+import argparse
+import pandas as pd
+import CleanData as cleanData
+import StormRules as stormRules
+import StageProfiler as stageProfiler
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    # without pyarrow every load goes straight through the cleaning pipeline
+    pa = None
+    feather = None
+
+DEFAULT_CACHE_DIR = os.environ.get('TRACK_CACHE_DIR', '.track_cache')
+# source of every module whose code decides the cleaned frame: the pipeline itself, and the category
+# thresholds and sentinels it applies
+CLEANING_SOURCES = [cleanData.__file__, stormRules.__file__]
+
+
+def cacheKey(dataset_path):
+    # hash of the raw csv plus the source of the cleaning code, so changing either invalidates the entry
+    digest = hashlib.sha256()
+    with open(dataset_path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+    for code_path in CLEANING_SOURCES:
+        with open(code_path, 'rb') as code:
+            digest.update(code.read())
+    return digest.hexdigest()[:16]
+
+def cachePath(dataset_path, cache_dir = DEFAULT_CACHE_DIR):
+    # <name>-<resolved path hash>-<cacheKey>.feather, so csv files of the same name in different
+    # directories have entries of their own
+    name = os.path.splitext(os.path.basename(dataset_path))[0]
+    source = hashlib.sha256(os.path.realpath(dataset_path).encode()).hexdigest()[:8]
+    return os.path.join(cache_dir, name + '-' + source + '-' + cacheKey(dataset_path) + '.feather')
+
+def writeCache(data, path):
+    # uncompressed feather so later loads can memory-map it; written to a temporary file of its own and
+    # then renamed, so readers never see half a file and concurrent writers do not share one
+    os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+    table = pa.Table.from_pandas(data, preserve_index = True)
+    target = tempfile.NamedTemporaryFile(dir = os.path.dirname(path) or '.', suffix = '.tmp', delete = False)
+    target.close()
+    try:
+        feather.write_feather(table, target.name, compression = 'uncompressed')
+        os.replace(target.name, path)
+    except BaseException:
+        os.remove(target.name)
+        raise
+
+    # drop the stale entries of the same source file
+    prefix = path.rsplit('-', 1)[0]
+    for stale in glob.glob(glob.escape(prefix) + '-' + '?' * 16 + '.feather'):
+        if stale != path:
+            os.remove(stale)
+
+def readCache(path):
+    return feather.read_table(path, memory_map = True).to_pandas()
+
+@stageProfiler.profiled
+def loadCachedTracks(dataset_path, cache_dir = DEFAULT_CACHE_DIR, use_cache = True):
+    # cleaned tracks for dataset_path, from the cache when the csv and cleaning code are unchanged
+    if not use_cache or feather is None:
+        return cleanData.loadTracks(dataset_path)
+
+    path = cachePath(dataset_path, cache_dir)
+    if os.path.exists(path):
+        return readCache(path)
+
+    data = cleanData.loadTracks(dataset_path)
+    writeCache(data, path)
+    return data
+
+def clearCache(cache_dir = DEFAULT_CACHE_DIR):
+    # remove every cached file, returns how many were removed
+    removed = 0
+    for path in glob.glob(os.path.join(glob.escape(cache_dir), '*.feather')):
+        os.remove(path)
+        removed += 1
+    return removed
+
+def addCacheArguments(parser):
+    # shared command line switches for scripts that load tracks
+    parser.add_argument('--no-cache', dest = 'use_cache', action = 'store_false',
+                        help = 'clean the csv again instead of reading the track cache')
+    parser.add_argument('--clear-cache', action = 'store_true',
+                        help = 'remove all cached track files before running')
+    parser.add_argument('--cache-dir', default = DEFAULT_CACHE_DIR,
+                        help = 'directory of the track cache (default: %(default)s)')
+    return parser
+
+
+if __name__ == '__main__':
+    parser = addCacheArguments(argparse.ArgumentParser(description = 'Build or clear the cleaned track cache.'))
+    parser.add_argument('datasets', nargs = '*', help = 'best-track csv files to clean and cache')
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        print('removed ' + str(clearCache(args.cache_dir)) + ' cached files')
+    for dataset_path in args.datasets:
+        loadCachedTracks(dataset_path, args.cache_dir, args.use_cache)
+        print(dataset_path + ' -> ' + cachePath(dataset_path, args.cache_dir))
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+import CleanData as cleanData
+import TrackCache as trackCache
+
+
+class TrackCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp, 'cache')
+        # a small copy of pacific.csv, so the source can be changed without touching the fixture
+        self.dataset_path = os.path.join(self.tmp, 'tracks.csv')
+        with open('pacific.csv') as source, open(self.dataset_path, 'w') as target:
+            for i, line in zip(range(3000), source):
+                target.write(line)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    # test that a cached load returns the same frame, dtypes included, as a fresh clean
+    def test_cacheRoundTrip(self):
+        expected = cleanData.loadTracks(self.dataset_path)
+        first = trackCache.loadCachedTracks(self.dataset_path, self.cache_dir)
+        second = trackCache.loadCachedTracks(self.dataset_path, self.cache_dir)
+
+        assert os.path.exists(trackCache.cachePath(self.dataset_path, self.cache_dir))
+        pd.testing.assert_frame_equal(first, expected)
+        pd.testing.assert_frame_equal(second, expected)
+
+    # test that changing the source csv creates a new entry and removes the stale one
+    def test_cacheInvalidation(self):
+        trackCache.loadCachedTracks(self.dataset_path, self.cache_dir)
+        stale = trackCache.cachePath(self.dataset_path, self.cache_dir)
+
+        with open(self.dataset_path) as source:
+            lines = source.readlines()
+        with open(self.dataset_path, 'w') as target:
+            target.writelines(lines[:-100])
+
+        data = trackCache.loadCachedTracks(self.dataset_path, self.cache_dir)
+
+        assert not os.path.exists(stale)
+        assert os.listdir(self.cache_dir) == [os.path.basename(trackCache.cachePath(self.dataset_path, self.cache_dir))]
+        pd.testing.assert_frame_equal(data, cleanData.loadTracks(self.dataset_path))
+
+    # test that csv files of the same name in different directories keep their own entries
+    def test_sameNameSources(self):
+        other_path = os.path.join(self.tmp, 'other', 'tracks.csv')
+        os.makedirs(os.path.dirname(other_path))
+        with open(self.dataset_path) as source, open(other_path, 'w') as target:
+            target.writelines(source.readlines()[:-100])
+
+        trackCache.loadCachedTracks(self.dataset_path, self.cache_dir)
+        trackCache.loadCachedTracks(other_path, self.cache_dir)
+        self.assertTrue(os.path.exists(trackCache.cachePath(self.dataset_path, self.cache_dir)))
+        self.assertTrue(os.path.exists(trackCache.cachePath(other_path, self.cache_dir)))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    # test that a failed write leaves neither a temporary file nor an entry
+    def test_failedWrite(self):
+        path = trackCache.cachePath(self.dataset_path, self.cache_dir)
+        with mock.patch.object(trackCache.feather, 'write_feather', side_effect = OSError('disk full')):
+            with self.assertRaises(OSError):
+                trackCache.writeCache(cleanData.loadTracks(self.dataset_path), path)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    # test that changing a category threshold in StormRules misses the cache and replaces the entry
+    def test_rulesInvalidation(self):
+        sources = []
+        for code_path in trackCache.CLEANING_SOURCES:
+            shutil.copy(code_path, self.tmp)
+            sources.append(os.path.join(self.tmp, os.path.basename(code_path)))
+        rules_path = sources[trackCache.CLEANING_SOURCES.index(trackCache.stormRules.__file__)]
+
+        with mock.patch.object(trackCache, 'CLEANING_SOURCES', sources), \
+                mock.patch.object(cleanData, 'loadTracks', wraps = cleanData.loadTracks) as loadTracks:
+            trackCache.loadCachedTracks(self.dataset_path, self.cache_dir)
+            trackCache.loadCachedTracks(self.dataset_path, self.cache_dir)
+            stale = trackCache.cachePath(self.dataset_path, self.cache_dir)
+            self.assertEqual(loadTracks.call_count, 1)
+
+            with open(rules_path) as source:
+                rules = source.read()
+            with open(rules_path, 'w') as target:
+                target.write(rules.replace('(1, 62)', '(1, 63)', 1))
+
+            trackCache.loadCachedTracks(self.dataset_path, self.cache_dir)
+            self.assertEqual(loadTracks.call_count, 2)
+            self.assertNotEqual(trackCache.cachePath(self.dataset_path, self.cache_dir), stale)
+            self.assertFalse(os.path.exists(stale))
+
+    # test that bypassing the cache writes nothing and clearing it empties the directory
+    def test_cacheBypassAndClear(self):
+        trackCache.loadCachedTracks(self.dataset_path, self.cache_dir, use_cache = False)
+        assert not os.path.exists(self.cache_dir)
+
+        trackCache.loadCachedTracks(self.dataset_path, self.cache_dir)
+        assert trackCache.clearCache(self.cache_dir) == 1
+        assert os.listdir(self.cache_dir) == []
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# mean radius of the earth, in kilometers
+EARTH_RADIUS_KM = 6371.0088
+
+
+## great-circle distance between coordinates, in kilometers, works on whole arrays
+def haversineKm(lat1, long1, lat2, long2):
+    # convert coordinates to radian values
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    delta_lat = lat2 - lat1
+    delta_long = np.radians(long2) - np.radians(long1)
+
+    # central angle between the two points, scaled by the earth's radius
+    a = np.sin(delta_lat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(delta_long / 2)**2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def stormOffsets(ids):
+    # start position of every storm in an ID-sorted array, followed by the total length
+    ids = np.asarray(ids)
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if len(ids) else np.array([], dtype = int)
+    return np.append(starts, len(ids))
+
+def trackSegments(latitude, longitude, datetime, offsets):
+    # distance (km) and speed (km/h) of every consecutive pair of fixes within a storm
+    # fixes must be sorted by storm then datetime, with storm i in rows offsets[i]:offsets[i + 1]
+    # returns (distance, speed, segmentOffsets); storm i owns segments segmentOffsets[i]:segmentOffsets[i + 1]
+    latitude = np.asarray(latitude, dtype = float)
+    longitude = np.asarray(longitude, dtype = float)
+    datetime = np.asarray(datetime, dtype = 'datetime64[ns]')
+    offsets = np.asarray(offsets)
+
+    # pairs that straddle two storms end on the first fix of a storm
+    keep = np.ones(max(len(latitude) - 1, 0), dtype = bool)
+    keep[offsets[1:-1] - 1] = False
+
+    distance = haversineKm(latitude[:-1], longitude[:-1], latitude[1:], longitude[1:])[keep]
+    hours = (np.diff(datetime) / np.timedelta64(1, 's'))[keep] / 3600
+
+    # fixes reported twice at the same time have no defined speed
+    speed = np.full(len(distance), np.nan)
+    np.divide(distance, hours, out = speed, where = hours > 0)
+
+    # a storm with n fixes has n - 1 segments
+    segmentOffsets = offsets - np.arange(len(offsets))
+    return distance, speed, segmentOffsets
+
+def reduceSegments(values, segmentOffsets, ufunc):
+    # apply a reducing ufunc (np.add, np.fmax, ...) to every storm's segments, NaN for storms without any
+    counts = np.diff(segmentOffsets)
+    result = np.full(len(counts), np.nan)
+    nonEmpty = counts > 0
+    if nonEmpty.any():
+        result[nonEmpty] = ufunc.reduceat(values, segmentOffsets[:-1][nonEmpty])
+    return result
+
+def uniformGrid(datetime, offsets, step_hours, endpoints = False):
+    # times of a uniform grid, every step_hours on the clock (00, 06, 12, 18 UTC for 6 hours), that fall
+    # within each storm's first and last fix; returns (gridTimes, gridOffsets), with storm i in
+    # gridTimes[gridOffsets[i]:gridOffsets[i + 1]] (empty for storms shorter than one step between grid times)
+    # the part of a storm before its first and after its last grid time is not on the grid
+    # with endpoints = True the grid of every storm starts at its first fix instead, every step_hours from
+    # there, and ends at its last fix after a shorter final step if needed, so no part of a storm is left out
+    nanoseconds = np.asarray(datetime, dtype = 'datetime64[ns]').astype(np.int64)
+    offsets = np.asarray(offsets)
+    step = int(round(step_hours * 3600)) * 10**9
+    if step <= 0:
+        raise ValueError('step_hours must be at least one second, got ' + str(step_hours))
+    if len(offsets) < 2:
+        return np.array([], dtype = 'datetime64[ns]'), offsets.copy()
+
+    if endpoints:
+        first = nanoseconds[offsets[:-1]]
+        span = nanoseconds[offsets[1:] - 1] - first
+        counts = span // step + 1 + (span % step > 0)
+        gridOffsets = np.append(0, np.cumsum(counts))
+        position = np.arange(gridOffsets[-1]) - np.repeat(gridOffsets[:-1], counts)
+        gridTimes = np.repeat(first, counts) + np.minimum(position * step, np.repeat(span, counts))
+        return gridTimes.astype('datetime64[ns]'), gridOffsets
+
+    # first and last grid step of every storm, floor division rounds pre-1970 times down as well
+    first = -(-nanoseconds[offsets[:-1]] // step)
+    last = nanoseconds[offsets[1:] - 1] // step
+    counts = np.maximum(last - first + 1, 0)
+    gridOffsets = np.append(0, np.cumsum(counts))
+    position = np.arange(gridOffsets[-1]) - np.repeat(gridOffsets[:-1], counts)
+    gridTimes = (np.repeat(first, counts) + position) * step
+    return gridTimes.astype('datetime64[ns]'), gridOffsets
+
+def gridBrackets(datetime, offsets, gridTimes, gridOffsets):
+    # for every grid time, the fixes before (at or before it) and after it within the same storm, and the
+    # fraction of the time between them that has passed; fraction is 0 on a fix and for repeated fix times
+    seconds = np.asarray(datetime, dtype = 'datetime64[s]').astype(np.int64)
+    gridSeconds = np.asarray(gridTimes, dtype = 'datetime64[s]').astype(np.int64)
+    offsets = np.asarray(offsets)
+    if len(gridSeconds) == 0:
+        empty = np.array([], dtype = int)
+        return empty, empty, np.array([], dtype = float)
+
+    # one search over all storms: times are made increasing across storms by giving each storm its own span
+    origin = min(seconds.min(), gridSeconds.min())
+    span = max(seconds.max(), gridSeconds.max()) - origin + 1
+    storm = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    gridStorm = np.repeat(np.arange(len(gridOffsets) - 1), np.diff(gridOffsets))
+    before = np.searchsorted(storm * span + (seconds - origin), gridStorm * span + (gridSeconds - origin), side = 'right') - 1
+    after = np.minimum(before + 1, offsets[1:][gridStorm] - 1)
+
+    gap = seconds[after] - seconds[before]
+    fraction = np.zeros(len(before))
+    np.divide(gridSeconds - seconds[before], gap, out = fraction, where = gap > 0)
+    return before, after, fraction
+
+def greatCircleInterpolate(latitude, longitude, before, after, fraction):
+    # positions at the grid times, along the great circle between the fixes from gridBrackets; longitudes
+    # come back in [-180, 180], and a grid time on a fix takes that fix's position unchanged
+    latitude, longitude = np.asarray(latitude, dtype = float), np.asarray(longitude, dtype = float)
+    fraction = np.asarray(fraction, dtype = float)
+    gridLatitude, gridLongitude = latitude[before], longitude[before]
+    # on a 6-hour grid most grid times are fixes, so only the others go through the trigonometry
+    moving = fraction > 0
+    fraction = fraction[moving]
+
+    # unit vectors of the fixes, computed once per fix rather than once per grid time
+    lat, long = np.radians(latitude), np.radians(longitude)
+    unit = np.stack([np.cos(lat) * np.cos(long), np.cos(lat) * np.sin(long), np.sin(lat)])
+    start, end = unit[:, np.asarray(before)[moving]], unit[:, np.asarray(after)[moving]]
+
+    # spherical linear interpolation of the unit vectors, with the angle between them from their chord;
+    # points too close for a stable sine fall back to the chord
+    angle = 2 * np.arcsin(np.minimum(np.sqrt(np.sum((end - start)**2, axis = 0)) / 2, 1))
+    sine = np.sin(angle)
+    close = sine < 1e-12
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        startWeight = np.where(close, 1 - fraction, np.sin((1 - fraction) * angle) / sine)
+        endWeight = np.where(close, fraction, np.sin(fraction * angle) / sine)
+    point = startWeight * start + endWeight * end
+
+    gridLatitude[moving] = np.degrees(np.arctan2(point[2], np.hypot(point[0], point[1])))
+    gridLongitude[moving] = np.degrees(np.arctan2(point[1], point[0]))
+    return gridLatitude, gridLongitude
+
+def linearInterpolate(values, before, after, fraction):
+    # values at the grid times, between the fixes from gridBrackets; a grid time on a fix takes that fix's
+    # value, and is NaN only if it is missing there
+    values = np.asarray(values, dtype = float)
+    low, high = values[before], values[after]
+    return np.where(fraction == 0, low, low + fraction * (high - low))
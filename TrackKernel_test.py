@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+from TrackKernel import *
+
+
+class TrackKernelTest(unittest.TestCase):
+
+    # test that one degree of latitude is roughly 111 km
+    def test_haversineKm(self):
+        self.assertAlmostEqual(haversineKm(0.0, 0.0, 1.0, 0.0), 111.195, places = 2)
+        self.assertAlmostEqual(haversineKm(25.0, -80.0, 25.0, -80.0), 0.0)
+
+    # test that storm offsets mark where each ID starts
+    def test_stormOffsets(self):
+        offsets = stormOffsets(['A', 'A', 'B', 'C', 'C', 'C'])
+        self.assertEqual(offsets.tolist(), [0, 2, 3, 6])
+
+    # test that segments never straddle two storms and speeds use the full time gap
+    def test_trackSegments(self):
+        latitude = [0.0, 1.0, 10.0, 20.0, 21.0, 23.0]
+        longitude = [0.0, 0.0, 0.0, 50.0, 50.0, 50.0]
+        datetime = np.array(['2000-01-01T00', '2000-01-01T06', '2000-01-01T00',
+                             '2000-01-01T00', '2000-01-02T06', '2000-01-02T12'], dtype = 'datetime64[ns]')
+        offsets = stormOffsets(['A', 'A', 'B', 'C', 'C', 'C'])
+
+        distance, speed, segmentOffsets = trackSegments(latitude, longitude, datetime, offsets)
+
+        self.assertEqual(segmentOffsets.tolist(), [0, 1, 1, 3])
+        np.testing.assert_allclose(distance, [111.195, 111.195, 222.390], rtol = 1e-4)
+        # the first gap of storm C is 30 hours, the second 6
+        np.testing.assert_allclose(speed, [111.195 / 6, 111.195 / 30, 222.390 / 6], rtol = 1e-4)
+
+    # test that per-storm reductions leave storms without segments as NaN
+    def test_reduceSegments(self):
+        values = np.array([1.0, 2.0, 3.0])
+        segmentOffsets = np.array([0, 1, 1, 3])
+
+        np.testing.assert_array_equal(reduceSegments(values, segmentOffsets, np.add), [1.0, np.nan, 5.0])
+        np.testing.assert_array_equal(reduceSegments(values, segmentOffsets, np.fmax), [1.0, np.nan, 3.0])
+
+    # test that grid times fall on the clock every step, within each storm, and that short storms get none
+    def test_uniformGrid(self):
+        datetime = np.array(['2000-01-01T05', '2000-01-01T13', '2000-01-01T19',
+                             '1960-06-01T01', '1960-06-01T04',
+                             '1960-06-02T00'], dtype = 'datetime64[ns]')
+        gridTimes, gridOffsets = uniformGrid(datetime, stormOffsets(['A', 'A', 'A', 'B', 'B', 'C']), 6)
+
+        self.assertEqual(gridOffsets.tolist(), [0, 3, 3, 4])
+        self.assertEqual(gridTimes.tolist(), np.array(['2000-01-01T06', '2000-01-01T12', '2000-01-01T18', '1960-06-02T00'],
+                                                      dtype = 'datetime64[ns]').tolist())
+        self.assertEqual(len(uniformGrid(datetime, stormOffsets(['A', 'A', 'A', 'B', 'B', 'C']), 1)[0]), 15 + 4 + 1)
+        for step_hours in [0, -6, 1e-5]:
+            with self.assertRaises(ValueError):
+                uniformGrid(datetime, stormOffsets(['A', 'A', 'A', 'B', 'B', 'C']), step_hours)
+
+    # test that a grid with endpoints starts at every storm's first fix and ends at its last
+    def test_uniformGridEndpoints(self):
+        datetime = np.array(['2000-01-01T05', '2000-01-01T13', '2000-01-01T19',
+                             '1960-06-01T01', '1960-06-01T04',
+                             '1960-06-02T00'], dtype = 'datetime64[ns]')
+        gridTimes, gridOffsets = uniformGrid(datetime, stormOffsets(['A', 'A', 'A', 'B', 'B', 'C']), 6, endpoints = True)
+
+        self.assertEqual(gridOffsets.tolist(), [0, 4, 6, 7])
+        self.assertEqual(gridTimes.tolist(), np.array(['2000-01-01T05', '2000-01-01T11', '2000-01-01T17', '2000-01-01T19',
+                                                       '1960-06-01T01', '1960-06-01T04', '1960-06-02T00'],
+                                                      dtype = 'datetime64[ns]').tolist())
+        # a span of whole steps gets no extra final step
+        gridTimes, gridOffsets = uniformGrid(datetime[[0, 2]], [0, 2], 7, endpoints = True)
+        self.assertEqual(gridOffsets.tolist(), [0, 3])
+        gridTimes, gridOffsets = uniformGrid(datetime[[0, 2]], [0, 2], 14, endpoints = True)
+        self.assertEqual(gridTimes.tolist(), datetime[[0, 2]].tolist())
+
+    # test that every grid time is bracketed by fixes of its own storm
+    def test_gridBrackets(self):
+        datetime = np.array(['2000-01-01T00', '2000-01-01T06', '2000-01-01T08',
+                             '2000-01-01T00', '2000-01-01T12'], dtype = 'datetime64[ns]')
+        offsets = stormOffsets(['A', 'A', 'A', 'B', 'B'])
+        gridTimes, gridOffsets = uniformGrid(datetime, offsets, 3)
+        before, after, fraction = gridBrackets(datetime, offsets, gridTimes, gridOffsets)
+
+        self.assertEqual(before.tolist(), [0, 0, 1, 3, 3, 3, 3, 4])
+        self.assertEqual(after.tolist(), [1, 1, 2, 4, 4, 4, 4, 4])
+        np.testing.assert_allclose(fraction, [0, 0.5, 0, 0, 0.25, 0.5, 0.75, 0])
+
+    # test that interpolated points lie on the great circle, across the dateline as well
+    def test_greatCircleInterpolate(self):
+        fixLatitude = [0.0, 0.0, 10.0, 10.0, 30.0, 40.0]
+        fixLongitude = [179.0, -179.0, -80.0, -80.0, -100.0, -90.0]
+        latitude, longitude = greatCircleInterpolate(fixLatitude, fixLongitude, [0, 2, 4, 4], [1, 3, 5, 5], [0.5, 0.5, 0.25, 0.0])
+        np.testing.assert_allclose(latitude[:2], [0.0, 10.0], atol = 1e-9)
+        self.assertAlmostEqual(abs(longitude[0]), 180.0)
+        self.assertAlmostEqual(longitude[1], -80.0)
+        # a quarter of the way along is a quarter of the distance from the start, and on the path
+        whole = haversineKm(30.0, -100.0, 40.0, -90.0)
+        self.assertAlmostEqual(haversineKm(30.0, -100.0, latitude[2], longitude[2]), whole / 4, places = 6)
+        self.assertAlmostEqual(haversineKm(latitude[2], longitude[2], 40.0, -90.0), 3 * whole / 4, places = 6)
+        self.assertEqual((latitude[3], longitude[3]), (30.0, -100.0))
+
+    # test that linear interpolation keeps the reading of a fix and spreads missing readings only between fixes
+    def test_linearInterpolate(self):
+        values = np.array([10.0, 20.0, np.nan])
+        result = linearInterpolate(values, np.array([0, 0, 1, 1]), np.array([1, 1, 2, 2]), np.array([0.0, 0.25, 0.0, 0.5]))
+        np.testing.assert_array_equal(result, [10.0, 12.5, 20.0, np.nan])
+
+
+if __name__ == '__main__':
+    unittest.main()
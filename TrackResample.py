@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import numpy as np
+import pandas as pd
+import TrackCache as trackCache
+import StageProfiler as stageProfiler
+import StormRules as stormRules
+from TrackKernel import stormOffsets, uniformGrid, gridBrackets, greatCircleInterpolate, linearInterpolate
+
+# grid step used when none is given, the synoptic step of most best-track fixes
+DEFAULT_STEP_HOURS = 6
+# readings interpolated linearly between fixes
+LINEAR_COLUMNS = ['Maximum Wind', 'Minimum Pressure']
+# columns carried over from the fix at or before each grid time
+CARRIED_COLUMNS = ['ID', 'Name', 'Status']
+
+
+def stepHours(text):
+    # argparse type of the --step-hours switches
+    value = float(text)
+    if not value * 3600 >= 1:
+        raise argparse.ArgumentTypeError('step must be positive (at least one second), got ' + text)
+    return value
+
+@stageProfiler.profiled
+def resampleStorms(data, step_hours = DEFAULT_STEP_HOURS):
+    # every storm of a cleaned track frame on a uniform time grid: one row per grid time (every step_hours on
+    # the clock) between its first and last fix, in one pass over all storms
+    # positions follow the great circle between the fixes around each grid time, wind and pressure are
+    # linear between them, and the category is recomputed from the interpolated wind and the carried status
+    # 'Interpolated' is False for grid times that fall on a fix
+    data = data.sort_values(by = ['ID', 'Datetime'], kind = 'mergesort').reset_index(drop = True)
+    offsets = stormOffsets(data['ID'].to_numpy())
+    datetime = data['Datetime'].to_numpy()
+    gridTimes, gridOffsets = uniformGrid(datetime, offsets, step_hours)
+    before, after, fraction = gridBrackets(datetime, offsets, gridTimes, gridOffsets)
+
+    resampled = data[CARRIED_COLUMNS].iloc[before].reset_index(drop = True)
+    resampled['Datetime'] = gridTimes
+    resampled['Latitude'], resampled['Longitude'] = greatCircleInterpolate(data['Latitude'], data['Longitude'],
+                                                                           before, after, fraction)
+    for column in LINEAR_COLUMNS:
+        values = linearInterpolate(stormRules.floatValues(data[column]), before, after, fraction)
+        # missing readings stay <NA>, as in the cleaned frame
+        resampled[column] = pd.arrays.FloatingArray(values, np.isnan(values))
+    resampled['Category'] = stormRules.categoryOf(resampled['Maximum Wind'], resampled['Status'])
+    resampled['Interpolated'] = fraction > 0
+    return resampled
+
+
+if __name__ == '__main__':
+    parser = trackCache.addCacheArguments(argparse.ArgumentParser(description = 'Resample every storm onto a uniform time grid.'))
+    parser.add_argument('dataset', nargs = '?', default = 'atlantic.csv', help = 'best-track csv file (default: %(default)s)')
+    parser.add_argument('--step-hours', type = stepHours, default = DEFAULT_STEP_HOURS, help = 'grid step (default: %(default)s)')
+    parser.add_argument('--out', help = 'write the resampled tracks to this parquet file')
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        trackCache.clearCache(args.cache_dir)
+    tracks = resampleStorms(trackCache.loadCachedTracks(args.dataset, args.cache_dir, args.use_cache), args.step_hours)
+    print(str(tracks['ID'].nunique()) + " storms, " + str(len(tracks)) + " grid times, " + \
+          str(int(tracks['Interpolated'].sum())) + " interpolated")
+    if args.out:
+        tracks.to_parquet(args.out, index = False)
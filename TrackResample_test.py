@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import unittest
+import numpy as np
+import pandas as pd
+import CleanData as cleanData
+import AggregateData as aggregateData
+from TrackKernel import haversineKm
+from TrackResample import *
+from ReferenceLoops import resampleStormsLoop
+
+
+class TrackResampleTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = cleanData.loadTracks("pacific.csv")
+
+    # test that the one-pass resampling gives the grid and readings of the per-storm loop
+    def test_resampleStormsMatchesLoop(self):
+        for step_hours in [1, 6]:
+            resampled = resampleStorms(self.data, step_hours)
+            expected = resampleStormsLoop(self.data, step_hours)
+
+            self.assertEqual(resampled['ID'].astype(str).tolist(), expected['ID'].astype(str).tolist())
+            self.assertTrue((resampled['Datetime'].to_numpy() == expected['Datetime'].to_numpy()).all())
+            # away from the dateline, where linear longitudes are meaningful, the two paths stay a few km apart
+            same = resampled['Longitude'].abs().to_numpy() < 170
+            apart = haversineKm(resampled['Latitude'].to_numpy()[same], resampled['Longitude'].to_numpy()[same],
+                                expected['Latitude'].to_numpy()[same], expected['Longitude'].to_numpy()[same])
+            self.assertLess(apart.max(), 10)
+            np.testing.assert_allclose(resampled['Maximum Wind'].to_numpy(dtype = float, na_value = np.nan),
+                                       expected['Maximum Wind'].to_numpy(), equal_nan = True)
+
+    # test that grid times on a fix keep its readings, and categories follow the interpolated wind
+    def test_resampleStormsFixes(self):
+        resampled = resampleStorms(self.data, 6)
+        fixes = resampled[~resampled['Interpolated']].merge(self.data.drop_duplicates(['ID', 'Datetime'], keep = 'last'),
+                                                            on = ['ID', 'Datetime'], suffixes = ('', 'Fix'))
+
+        self.assertEqual(len(fixes), (~resampled['Interpolated']).sum())
+        for column in ['Latitude', 'Longitude', 'Maximum Wind', 'Minimum Pressure', 'Category']:
+            np.testing.assert_array_equal(fixes[column].to_numpy(dtype = float, na_value = np.nan),
+                                          fixes[column + 'Fix'].to_numpy(dtype = float, na_value = np.nan))
+        self.assertLessEqual(resampled.groupby('ID', observed = True)['Category'].max().max(), 5)
+
+    # test that speeds from the resampled track agree with the fixes for storms already on the 6-hour grid,
+    # and are never above the fastest segment between the fixes otherwise
+    def test_aggregateResampled(self):
+        raw = aggregateData.aggregateStorms(self.data)
+        resampled = aggregateData.aggregateStorms(self.data, step_hours = 6)
+        onGrid = lambda t: (t.dt.hour % 6 == 0).all() and (t.dt.minute == 0).all() and (t.diff().iloc[1:] == pd.Timedelta(hours = 6)).all()
+        synoptic = raw['ID'].map(self.data.sort_values('Datetime').groupby('ID', observed = True)['Datetime'].agg(onGrid)).to_numpy(dtype = bool)
+
+        pd.testing.assert_frame_equal(resampled[synoptic], raw[synoptic])
+        self.assertTrue((resampled['maxLandSpeed'][~synoptic] <= raw['maxLandSpeed'][~synoptic] + 1e-9).all())
+        pd.testing.assert_series_equal(resampled['netDistanceKm'], raw['netDistanceKm'])
+
+    # test that the resampled distances cover the whole track: the total is never below the net distance,
+    # and every storm with fixes at two times has speeds
+    def test_aggregateWholeTrack(self):
+        raw = aggregateData.aggregateStorms(self.data)
+        for step_hours in [1, 6, 24]:
+            resampled = aggregateData.aggregateStorms(self.data, step_hours = step_hours)
+            self.assertTrue((resampled['totalDistanceKm'] >= resampled['netDistanceKm'] - 1e-6).all())
+            pd.testing.assert_series_equal(resampled['maxLandSpeed'].isna(), raw['maxLandSpeed'].isna())
+
+    # test that a storm shorter than one step between grid times has no rows
+    def test_shortStorm(self):
+        data = self.data[self.data['ID'] == self.data['ID'].iloc[0]].iloc[:2].copy()
+        data['Datetime'] = pd.to_datetime(['2000-01-01 01:00', '2000-01-01 05:00'])
+        self.assertEqual(len(resampleStorms(data, 6)), 0)
+        hourly = resampleStorms(data, 1)
+        self.assertEqual(len(hourly), 5)
+        self.assertAlmostEqual(haversineKm(hourly['Latitude'].iloc[0], hourly['Longitude'].iloc[0],
+                                           hourly['Latitude'].iloc[-1], hourly['Longitude'].iloc[-1]),
+                               haversineKm(*data[['Latitude', 'Longitude']].to_numpy(dtype = float).ravel()[[0, 1, 2, 3]]), places = 3)
+
+
+    # test that a step that is not positive fails instead of giving a table of NaN and inf
+    def test_invalidStep(self):
+        for step_hours in [0, -1]:
+            with self.assertRaises(ValueError):
+                resampleStorms(self.data, step_hours)
+            with self.assertRaises(ValueError):
+                aggregateData.aggregateStorms(self.data, step_hours)
+        self.assertEqual(stepHours('1.5'), 1.5)
+        for text in ['0', '-6', 'nan']:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                stepHours(text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,175 +5,294 @@ Names: Steph Verbout, Mark Folashade, Lindsey Shavers, Khoi Tran
 Computing IDs: sv8jy, mf4us, lns4pr, kt2np
 """
 
+import os
+import functools
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
-from proj1 import atlantic_df, atlantic_df_aggr
+from matplotlib.lines import Line2D
+from AggregateData import aggregateStorms
 import HeatMap as hm
+import StormRules as stormRules
+import StormCube as stormCube
+import TrackAnimation as trackAnimation
 
-# view min and max longitude and latitude points
-# use these figures to download a map from openstreetmap.org
-# visualize a map for top 95th percentile longest duration storms
-top95duration = atlantic_df_aggr[atlantic_df_aggr.duration >= \
-                                 atlantic_df_aggr.duration.quantile(0.95)].sort_values(by = ['duration'], ascending = False)
-top95duration = pd.merge(atlantic_df[atlantic_df.ID.isin(top95duration.ID.tolist())], 
-                         top95duration, on = ['ID', 'Name'])
-top95duration['categoryStr'] = ['Category ' + str(cat)[0] for cat in top95duration.Category]
-
-# boundaries of the scatterplot to fall within the map
-boundaries = (atlantic_df.Longitude.min(), atlantic_df.Longitude.max(), \
-              atlantic_df.Latitude.min(), atlantic_df.Latitude.max())
+# map downloaded from openstreetmap.org, drawn under the scatterplots
+BASEMAP_PATH = 'map.png'
 
 # lists for coloring scatterpoints based on hurricane Category
-colors0 = [mcolors.CSS4_COLORS['midnightblue'], mcolors.CSS4_COLORS['indigo'], \
-           mcolors.CSS4_COLORS['purple'], mcolors.CSS4_COLORS['maroon'], \
-           mcolors.CSS4_COLORS['orangered'], mcolors.CSS4_COLORS['orange']]
-categoriesHurricane = ['Category 0', 'Category 1', \
-                       'Category 2', 'Category 3', \
-                       'Category 4', 'Category 5']
+colors0 = [mcolors.CSS4_COLORS[name] for name in stormRules.CATEGORY_COLORS]
+categoriesHurricane = stormRules.CATEGORY_LABELS
 # dictionary for colors
-c0 = dict(zip(categoriesHurricane, colors0))     
-
-# plotting
-hurricane_map = plt.imread('map.png')
-fig0, ax = plt.subplots(figsize = (8, 8))
-categoriesPlot = top95duration.groupby('categoryStr')
-
-for cat, category in categoriesPlot:
-    category.plot(ax = ax, kind = 'scatter',
-                  x = 'Longitude', y = 'Latitude',
-                  label = cat, color = c0[cat], 
-                  alpha = 0.375, s = 5)
-ax.set_title('Plotting The 95th Percentile of Longest-Lasting Hurricanes in the Atlantic Ocean')
-# axis limits for plot set to min and max figures for latitude and longitude
-ax.set_xlim(boundaries[0], boundaries[1])
-ax.set_ylim(boundaries[2], boundaries[3])
-ax.grid(linestyle = ':', linewidth = 1.25, color = 'grey')
-plt.xlabel("Longitude")
-plt.ylabel("Latitude")
-ax.imshow(hurricane_map, zorder = 0, 
-          extent = boundaries, aspect = 'auto')
-#fig0.savefig('95pctDurationHurricanes.png')
-
-# visualized a map for bottom 5th percentile duration storms
-bottom5duration = atlantic_df_aggr[atlantic_df_aggr.duration <= \
-                                 atlantic_df_aggr.duration.quantile(0.05)].sort_values(by = ['duration'], ascending = False)
-bottom5duration = pd.merge(atlantic_df[atlantic_df.ID.isin(bottom5duration.ID.tolist())], 
-                           bottom5duration, on = ['ID', 'Name'])
-
-fig1, ax = plt.subplots(figsize = (8, 8))
-ax.scatter(bottom5duration.Longitude,
-           bottom5duration.Latitude,
-           zorder = 1, 
-           s = bottom5duration.duration / 6, # adjust sizing to keep it relatively consistent with the top 95% map
-           alpha = 0.50,
-           # all hurricanes here are Category 0
-           c = mcolors.CSS4_COLORS['midnightblue'])
-ax.set_title('Plotting The 5th Percentile of Shortest Hurricanes in the Atlantic Ocean')
-# axis limits for plot set to min and max figures for latitude and longitude
-ax.set_xlim(boundaries[0], boundaries[1])
-ax.set_ylim(boundaries[2], boundaries[3])
-ax.grid(linestyle = ':', linewidth = 1.25, color = 'grey')
-plt.xlabel("Longitude")
-plt.ylabel("Latitude")
-ax.imshow(hurricane_map, zorder = 0, 
-          extent = boundaries, aspect = 'auto')
-#fig1.savefig('5pctDurationHurricanes.png')
-
-## histogram
-fig2, ax = plt.subplots(figsize = (8, 8))
-bins = (1, 2, 3, 4, 5, 6)
-ax.hist(atlantic_df_aggr.maxCategory[atlantic_df_aggr['maxCategory'] > 0], \
-        bins = bins, align = 'left', \
-        rwidth = 0.8, color = 'c')
-ax.set_xticks(bins[:-1])
-plt.title("Histogram of Hurricanes by Category 1950-2015") 
-plt.xlabel("Category")
-plt.ylabel("Frequency")
-plt.show()
-#fig2.savefig('hurricaneCategoryHistogram.png')
-
-## histogram, hurricanes by Category per year
-fig3, ax = plt.subplots(figsize = (32, 8))
-bins1 = np.linspace(1950, 2016, 67)
-# data is lists of year values, per category
-categoryYearData = [pd.DatetimeIndex(atlantic_df_aggr.initialDate[atlantic_df_aggr.maxCategory == 0]).year.tolist(), \
-                    pd.DatetimeIndex(atlantic_df_aggr.initialDate[atlantic_df_aggr.maxCategory == 1]).year.tolist(), \
-                    pd.DatetimeIndex(atlantic_df_aggr.initialDate[atlantic_df_aggr.maxCategory == 2]).year.tolist(), \
-                    pd.DatetimeIndex(atlantic_df_aggr.initialDate[atlantic_df_aggr.maxCategory == 3]).year.tolist(), \
-                    pd.DatetimeIndex(atlantic_df_aggr.initialDate[atlantic_df_aggr.maxCategory == 4]).year.tolist(), \
-                    pd.DatetimeIndex(atlantic_df_aggr.initialDate[atlantic_df_aggr.maxCategory == 5]).year.tolist()]
-    
-# plotting
-ax.hist(categoryYearData, bins = bins1, 
-        label = ['Category 0', 'Category 1', \
-                 'Category 2', 'Category 3', \
-                 'Category 4', 'Category 5'], \
-        align = 'left', rwidth = 10)
-ax.set_xticks(np.arange(1950, 2016, step = 1))
-ax.set_yticks(np.arange(0, 21, step = 1))
-plt.xlim([1949, 2016])
-plt.title("Histogram of Hurricanes by Category and Year") 
-plt.xlabel("Year")
-plt.ylabel("Frequency")
-plt.legend(loc = 'upper right')
-plt.show()
-#fig3.savefig('hurricaneCategoryByYearHistogram.png')
-
-## bar plot, storm duration per category
-categoryDurationData0 = [atlantic_df_aggr.duration[atlantic_df_aggr.maxCategory == 0].tolist(), \
-                         atlantic_df_aggr.duration[atlantic_df_aggr.maxCategory == 1].tolist(), \
-                         atlantic_df_aggr.duration[atlantic_df_aggr.maxCategory == 2].tolist(), \
-                         atlantic_df_aggr.duration[atlantic_df_aggr.maxCategory == 3].tolist(), \
-                         atlantic_df_aggr.duration[atlantic_df_aggr.maxCategory == 4].tolist(), \
-                         atlantic_df_aggr.duration[atlantic_df_aggr.maxCategory == 5].tolist()]
-
-categoryDurationData1 = pd.DataFrame([list(map(np.min, categoryDurationData0)), 
-                                      list(map(np.mean, categoryDurationData0)), 
-                                      list(map(np.median, categoryDurationData0)), 
-                                      list(map(np.max, categoryDurationData0))], \
-                                      columns = [0, 1, 2, 3, 4, 5], \
-                                      index = ['Min', 'Mean', 'Median', 'Max']) 
-
-categoryDurationData2 = pd.DataFrame(categoryDurationData0).transpose()    
-
-# plotting
-fig4, axes = plt.subplots(2, 3, figsize = (16, 8))
-#fig4.suptitle('Storm Duration (hours) by Category', size = 'large')
-
-# set a universal y-limit equal to the largest number in the dataset, rounded to the nearest hundred, plus 50
-yLimit = round(atlantic_df_aggr.duration.max(),  -2) + 50
-for idx, (col, ax) in enumerate(zip(categoryDurationData2.columns, axes.flatten())):
-    ax.bar(categoryDurationData2.index, categoryDurationData2[col])
-    ax.set_ylim(0, yLimit)
-    ax.set_yticks(np.arange(0, yLimit, step = 50))
-    ax.text(0, yLimit - 200, 
-            'Summary Stats:\n' + \
-            str(categoryDurationData2[col].count()) + ' Storms\n' + \
-            str(categoryDurationData1[col].loc['Min']) + ' hours minimum\n' + \
-            str(categoryDurationData1[col].loc['Max']) + ' hours maximum\n' + \
-            str(categoryDurationData1[col].loc['Median']) + ' hours median\n' + \
-            str(round(categoryDurationData1[col].loc['Mean'], 2)) + ' hours mean\n', \
-            size = 'x-small')
-    ax.set_ylabel('Duration (hrs)', \
-                  size = 'small')
-    ax.set_title('Category ' + str(col))
-    ax.set_xticks([])
-    plt.subplots_adjust(wspace = 0.25, hspace = 0.25)
-plt.show()
-fig4.savefig('hurricaneDurationByCategoryHistogram.png')
+c0 = dict(zip(categoriesHurricane, colors0))
+# the same colors as an RGBA table indexed by category, so points are colored without parsing color names
+rgba0 = mcolors.to_rgba_array(colors0)
+# markers of the duration maps are drawn without an edge, which is much cheaper with one color per point;
+# an area of 14 keeps the footprint of the former size-5 marker with its 1.5 pt edge
+POINT_SIZE = 14
+
+
+def loadVisualizationData(dataset_path = 'atlantic.csv'):
+    # clean and aggregate the dataset once, every figure below reuses it
+    atlantic_df = hm.loadData(dataset_path)
+    atlantic_df_aggr = aggregateStorms(atlantic_df)
+    return atlantic_df, atlantic_df_aggr
+
+def mapBoundaries(atlantic_df):
+    # view min and max longitude and latitude points
+    # use these figures to download a map from openstreetmap.org
+    # boundaries of the scatterplot to fall within the map
+    return (atlantic_df.Longitude.min(), atlantic_df.Longitude.max(), \
+            atlantic_df.Latitude.min(), atlantic_df.Latitude.max())
+
+@functools.lru_cache(maxsize = None)
+def loadBasemap(map_path = BASEMAP_PATH):
+    # map.png is decoded once per process and shared (read-only) by every map figure
+    hurricane_map = plt.imread(map_path)
+    hurricane_map.setflags(write = False)
+    return hurricane_map
+
+def durationMapAxes(atlantic_df, title):
+    # empty map figure: basemap, axis limits, grid and labels shared by the duration maps
+    boundaries = mapBoundaries(atlantic_df)
+    fig, ax = plt.subplots(figsize = (8, 8))
+    ax.set_title(title)
+    # axis limits for plot set to min and max figures for latitude and longitude
+    ax.set_xlim(boundaries[0], boundaries[1])
+    ax.set_ylim(boundaries[2], boundaries[3])
+    ax.grid(linestyle = ':', linewidth = 1.25, color = 'grey')
+    ax.set_xlabel("Longitude")
+    ax.set_ylabel("Latitude")
+    ax.imshow(loadBasemap(), zorder = 0,
+              extent = boundaries, aspect = 'auto')
+    return fig, ax
+
+def stormDurationPoints(atlantic_df, atlantic_df_aggr):
+    # longitude, latitude, storm duration and category of every fix, ordered by category
+    # so that a single scatter call draws the stronger categories on top, as the per-category plots did
+    codes, ids = pd.factorize(atlantic_df['ID'])
+    duration = atlantic_df_aggr.set_index('ID')['duration'].reindex(np.asarray(ids, dtype = object)).to_numpy()[codes]
+    category = atlantic_df['Category'].to_numpy(dtype = int)
+    order = np.argsort(category, kind = 'stable')
+    return (atlantic_df['Longitude'].to_numpy(dtype = float)[order], atlantic_df['Latitude'].to_numpy(dtype = float)[order],
+            duration[order], category[order])
+
+def categoryLegend(ax, categories):
+    # one legend entry per category drawn, in the colors of c0
+    handles = [Line2D([], [], linestyle = '', marker = 'o', markersize = 3, alpha = 0.375,
+                      color = colors0[cat], label = categoriesHurricane[cat]) for cat in categories]
+    ax.legend(handles = handles, loc = 'upper right')
+
+def ordinal(n):
+    return str(n) + ('th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th'))
+
+def renderDurationPercentiles(atlantic_df, atlantic_df_aggr, percentiles, out_dir = '.'):
+    # maps of the storms at or above each duration percentile (e.g. 5, 10, ..., 95), written as
+    # <p>pctDurationHurricanes.png, like plotTopDuration(..., p), with a single scatter collection whose
+    # offsets and colors change between thresholds
+    # the figure below the points (basemap, axes background) is rendered once and restored for every map;
+    # the points, then the axes, title and legend that plotTopDuration draws above them, are drawn on it
+    longitude, latitude, duration, category = stormDurationPoints(atlantic_df, atlantic_df_aggr)
+    thresholds = atlantic_df_aggr.duration.quantile(np.asarray(percentiles) / 100).to_numpy()
+
+    fig, ax = durationMapAxes(atlantic_df, '')
+    points = ax.scatter([], [], zorder = 1, alpha = 0.375, s = POINT_SIZE, linewidths = 0, rasterized = True)
+    above = [ax.xaxis, ax.yaxis] + list(ax.spines.values()) + [ax.title]
+    for artist in [points] + above:
+        artist.set_visible(False)
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+    for artist in [points] + above:
+        artist.set_visible(True)
+
+    paths = []
+    for percentile, threshold in zip(percentiles, thresholds):
+        keep = duration >= threshold
+        points.set_offsets(np.column_stack([longitude[keep], latitude[keep]]))
+        points.set_facecolor(rgba0[category[keep]])
+        # set_facecolor takes the collection's alpha only when it is set again
+        points.set_alpha(0.375)
+        ax.set_title('Plotting The ' + ordinal(percentile) + ' Percentile of Longest-Lasting Hurricanes in the Atlantic Ocean')
+        categoryLegend(ax, np.unique(category[keep]))
+
+        fig.canvas.restore_region(background)
+        for artist in [points] + above + [ax.get_legend()]:
+            ax.draw_artist(artist)
+        paths.append(os.path.join(out_dir, str(percentile) + 'pctDurationHurricanes.png'))
+        # zlib level 3 instead of 6: half the encoding time for files about 8% larger
+        plt.imsave(paths[-1], np.asarray(fig.canvas.buffer_rgba()), pil_kwargs = {'compress_level': 3})
+    plt.close(fig)
+    return paths
+
+def plotTopDuration(atlantic_df, atlantic_df_aggr, percentile):
+    # visualize a map for the storms at or above a duration percentile
+    longitude, latitude, duration, category = stormDurationPoints(atlantic_df, atlantic_df_aggr)
+    keep = duration >= atlantic_df_aggr.duration.quantile(percentile / 100)
+
+    # plotting, all categories in one rasterized scatter layer
+    fig0, ax = durationMapAxes(atlantic_df, 'Plotting The ' + ordinal(percentile) + ' Percentile of Longest-Lasting Hurricanes in the Atlantic Ocean')
+    ax.scatter(longitude[keep], latitude[keep],
+               zorder = 1, alpha = 0.375, s = POINT_SIZE, linewidths = 0,
+               c = rgba0[category[keep]], rasterized = True)
+    categoryLegend(ax, np.unique(category[keep]))
+    return fig0
+
+def plotTop95Duration(atlantic_df, atlantic_df_aggr):
+    # visualize a map for top 95th percentile longest duration storms
+    return plotTopDuration(atlantic_df, atlantic_df_aggr, 95)
+
+def plotBottom5Duration(atlantic_df, atlantic_df_aggr):
+    # visualized a map for bottom 5th percentile duration storms
+    longitude, latitude, duration, category = stormDurationPoints(atlantic_df, atlantic_df_aggr)
+    keep = duration <= atlantic_df_aggr.duration.quantile(0.05)
+
+    fig1, ax = durationMapAxes(atlantic_df, 'Plotting The 5th Percentile of Shortest Hurricanes in the Atlantic Ocean')
+    ax.scatter(longitude[keep],
+               latitude[keep],
+               zorder = 1,
+               s = duration[keep] / 6, # adjust sizing to keep it relatively consistent with the top 95% map
+               alpha = 0.50,
+               # all hurricanes here are Category 0
+               c = mcolors.CSS4_COLORS['midnightblue'],
+               rasterized = True)
+    return fig1
+
+def plotCategoryHistogram(atlantic_df, atlantic_df_aggr):
+    ## histogram
+    fig2, ax = plt.subplots(figsize = (8, 8))
+    bins = stormRules.CATEGORIES[1:] + [stormRules.CATEGORIES[-1] + 1]
+    # storms per category from the summary cube, drawn as a histogram weighted by the counts
+    counts = stormCube.cubeTotals(stormCube.cachedCube(atlantic_df_aggr), ['maxCategory'])
+    counts = counts[counts.index > 0]
+    ax.hist(counts.index, weights = counts.to_numpy(), \
+            bins = bins, align = 'left', \
+            rwidth = 0.8, color = 'c')
+    ax.set_xticks(bins[:-1])
+    ax.set_title("Histogram of Hurricanes by Category 1950-2015")
+    ax.set_xlabel("Category")
+    ax.set_ylabel("Frequency")
+    return fig2
+
+def plotCategoryByYear(atlantic_df, atlantic_df_aggr):
+    ## histogram, hurricanes by Category per year
+    fig3, ax = plt.subplots(figsize = (32, 8))
+    bins1 = np.linspace(1950, 2016, 67)
+    # storms per year and category from the summary cube: one (years, counts) pair per category
+    counts = stormCube.cubeTotals(stormCube.cachedCube(atlantic_df_aggr), ['maxCategory', 'year'])
+    categoryYears = [counts.loc[cat] if cat in counts.index else counts.iloc[:0] for cat in stormRules.CATEGORIES]
+
+    # plotting
+    ax.hist([years.index for years in categoryYears], bins = bins1,
+            weights = [years.to_numpy() for years in categoryYears],
+            label = stormRules.CATEGORY_LABELS, \
+            align = 'left', rwidth = 10)
+    ax.set_xticks(np.arange(1950, 2016, step = 1))
+    ax.set_yticks(np.arange(0, 21, step = 1))
+    ax.set_xlim([1949, 2016])
+    ax.set_title("Histogram of Hurricanes by Category and Year")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Frequency")
+    ax.legend(loc = 'upper right')
+    return fig3
+
+def plotDurationByCategory(atlantic_df, atlantic_df_aggr):
+    ## bar plot, storm duration per category
+    # storm counts, mean and standard deviation per category from the summary cube; the cube holds no single
+    # storms, so the bars (one per storm, in the order of the table) and the minimum, maximum and median
+    # come from the durations, split by category after one stable sort
+    summary = stormCube.summarizeCube(stormCube.cachedCube(atlantic_df_aggr), ['maxCategory']).reindex(stormRules.CATEGORIES)
+    counts = summary['storms'].fillna(0).astype(int).to_numpy()
+    order = np.argsort(atlantic_df_aggr['maxCategory'].to_numpy(), kind = 'stable')
+    durations = dict(zip(stormRules.CATEGORIES, np.split(atlantic_df_aggr['duration'].to_numpy()[order], np.cumsum(counts)[:-1])))
+    summary['durationMin'] = [values.min() if len(values) else np.nan for values in durations.values()]
+    summary['durationMax'] = [values.max() if len(values) else np.nan for values in durations.values()]
+    summary['durationMedian'] = [np.median(values) if len(values) else np.nan for values in durations.values()]
+
+    # plotting
+    fig4, axes = plt.subplots(2, 3, figsize = (16, 8))
+    #fig4.suptitle('Storm Duration (hours) by Category', size = 'large')
+
+    # set a universal y-limit equal to the largest number in the dataset, rounded to the nearest hundred, plus 50
+    yLimit = round(summary['durationMax'].max(),  -2) + 50
+    longest = max(len(values) for values in durations.values())
+    for idx, (col, ax) in enumerate(zip(stormRules.CATEGORIES, axes.flatten())):
+        # every panel spans the longest category, as the NaN-padded columns of the original table did
+        ax.bar(np.arange(longest), np.pad(durations[col], (0, longest - len(durations[col])), constant_values = np.nan))
+        ax.set_ylim(0, yLimit)
+        ax.set_yticks(np.arange(0, yLimit, step = 50))
+        ax.text(0, yLimit - 200,
+                'Summary Stats:\n' + \
+                str(counts[idx]) + ' Storms\n' + \
+                str(summary['durationMin'].loc[col]) + ' hours minimum\n' + \
+                str(summary['durationMax'].loc[col]) + ' hours maximum\n' + \
+                str(summary['durationMedian'].loc[col]) + ' hours median\n' + \
+                str(round(summary['durationMean'].loc[col], 2)) + ' hours mean\n' + \
+                str(round(summary['durationStd'].loc[col], 2)) + ' hours standard deviation\n', \
+                size = 'x-small')
+        ax.set_ylabel('Duration (hrs)', \
+                      size = 'small')
+        ax.set_title('Category ' + str(col))
+        ax.set_xticks([])
+    fig4.subplots_adjust(wspace = 0.25, hspace = 0.25)
+    return fig4
 
 ## HeatMap
-df_heatmap = hm.loadData()
-
-# Landfall HeatMap
-df_landfall = hm.hurricaneLandFall(df_heatmap)
-hm.mapHurricane(df_landfall, "landfall.html")
-
-# No Landfall HeatMap
-df_no_landfall = hm.hurricaneNoLandFall(df_heatmap)
-hm.mapHurricane(df_no_landfall, "no_landfall.html")
-    
-    
-    
\ No newline at end of file
+def mapLandfall(atlantic_df, atlantic_df_aggr):
+    # Landfall HeatMap
+    return hm.buildHeatMap(hm.hurricaneLandFall(atlantic_df))
+
+def mapNoLandfall(atlantic_df, atlantic_df_aggr):
+    # No Landfall HeatMap
+    return hm.buildHeatMap(hm.hurricaneNoLandFall(atlantic_df))
+
+## Animated tracks
+def mapTrackAnimation(atlantic_df, atlantic_df_aggr):
+    # every storm's track on a time slider
+    return trackAnimation.buildAnimatedMap(atlantic_df)
+
+# every artifact of the report, by file name; each function takes the cleaned tracks and their aggregates
+artifacts = {'95pctDurationHurricanes.png': plotTop95Duration,
+             '5pctDurationHurricanes.png': plotBottom5Duration,
+             'hurricaneCategoryHistogram.png': plotCategoryHistogram,
+             'hurricaneCategoryByYearHistogram.png': plotCategoryByYear,
+             'hurricaneDurationByCategoryHistogram.png': plotDurationByCategory,
+             'landfall.html': mapLandfall,
+             'no_landfall.html': mapNoLandfall,
+             'track_animation.html': mapTrackAnimation}
+
+def saveArtifact(artifact, path):
+    # matplotlib figures are written and closed, folium maps saved as html
+    if hasattr(artifact, 'savefig'):
+        artifact.savefig(path)
+        plt.close(artifact)
+    else:
+        artifact.save(path)
+
+
+if __name__ == '__main__':
+    atlantic_df, atlantic_df_aggr = loadVisualizationData('atlantic.csv')
+
+    fig0 = plotTop95Duration(atlantic_df, atlantic_df_aggr)
+    #fig0.savefig('95pctDurationHurricanes.png')
+    fig1 = plotBottom5Duration(atlantic_df, atlantic_df_aggr)
+    #fig1.savefig('5pctDurationHurricanes.png')
+    fig2 = plotCategoryHistogram(atlantic_df, atlantic_df_aggr)
+    plt.show()
+    #fig2.savefig('hurricaneCategoryHistogram.png')
+    fig3 = plotCategoryByYear(atlantic_df, atlantic_df_aggr)
+    plt.show()
+    #fig3.savefig('hurricaneCategoryByYearHistogram.png')
+    fig4 = plotDurationByCategory(atlantic_df, atlantic_df_aggr)
+    plt.show()
+    fig4.savefig('hurricaneDurationByCategoryHistogram.png')
+
+    df_heatmap = atlantic_df
+
+    # Landfall HeatMap
+    df_landfall = hm.hurricaneLandFall(df_heatmap)
+    hm.mapHurricane(df_landfall, "landfall.html")
+
+    # No Landfall HeatMap
+    df_no_landfall = hm.hurricaneNoLandFall(df_heatmap)
+    hm.mapHurricane(df_no_landfall, "no_landfall.html")
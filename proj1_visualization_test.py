@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import proj1_visualization as viz
+
+
+class VisualizationTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df, cls.aggr = viz.loadVisualizationData('pacific.csv')
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    # test that the basemap is decoded once and cannot be modified by a figure
+    def test_loadBasemap(self):
+        basemap = viz.loadBasemap()
+        self.assertIs(viz.loadBasemap(), basemap)
+        self.assertFalse(basemap.flags.writeable)
+        np.testing.assert_array_equal(basemap, plt.imread(viz.BASEMAP_PATH))
+
+    # test that every fix gets the duration of its storm and that the points are ordered by category
+    def test_stormDurationPoints(self):
+        longitude, latitude, duration, category = viz.stormDurationPoints(self.df, self.aggr)
+        merged = pd.merge(self.df[['ID', 'Longitude', 'Category']].assign(ID = self.df['ID'].astype(str)),
+                          self.aggr[['ID', 'duration']], on = 'ID', how = 'left')
+        order = np.argsort(merged['Category'].to_numpy(), kind = 'stable')
+        np.testing.assert_array_equal(duration, merged['duration'].to_numpy()[order])
+        np.testing.assert_array_equal(longitude, merged['Longitude'].to_numpy(dtype = float)[order])
+        self.assertTrue((np.diff(category) >= 0).all())
+
+    # test that the maps of several thresholds match the maps drawn one at a time
+    def test_renderDurationPercentiles(self):
+        paths = viz.renderDurationPercentiles(self.df, self.aggr, [50, 95], self.tmp)
+        self.assertEqual([path[len(self.tmp) + 1:] for path in paths], ['50pctDurationHurricanes.png', '95pctDurationHurricanes.png'])
+        for percentile, path in zip([50, 95], paths):
+            fig = viz.plotTopDuration(self.df, self.aggr, percentile)
+            fig.savefig(self.tmp + '/reference.png')
+            plt.close(fig)
+            difference = np.abs(plt.imread(path)[..., :3] - plt.imread(self.tmp + '/reference.png')[..., :3])
+            # markers are snapped to pixels differently, but the same points are drawn
+            self.assertLess(difference.mean(), 2 / 255)
+
+    # test that ordinal suffixes are right for percentiles
+    def test_ordinal(self):
+        self.assertEqual([viz.ordinal(n) for n in [1, 2, 3, 5, 11, 12, 13, 21, 95]],
+                         ['1st', '2nd', '3rd', '5th', '11th', '12th', '13th', '21st', '95th'])
+
+
+if __name__ == '__main__':
+    unittest.main()